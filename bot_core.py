@@ -0,0 +1,1704 @@
+# -*- coding: utf-8 -*-
+"""
+Núcleo do bot: navegador, trends, IA Gemini, postagem e o ciclo agendado.
+
+É usado tanto pelo daemon sem interface (bot.py) quanto pela interface Tk
+(bot_ui.py). O Selenium e o webdriver_manager são importados apenas dentro
+das funções que realmente abrem ou controlam um navegador, e o Tk nunca é
+importado aqui, de modo que o daemon sobe rápido e sem dependências gráficas.
+"""
+
+import csv
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+
+import requests
+from dotenv import load_dotenv
+
+from tweet_backlog import BACKLOG_MAX_AGE_SECONDS, TweetBacklog, BacklogProducer
+from posters import ApiPoster, PostOutcomeUnknown, PostRejected, SeleniumPoster, build_poster
+from trend_sources import TrendMerger, build_default_sources
+from network_trends import enable_performance_logging, drain_network_events, capture_explore_trends
+from selector_registry import SelectorRegistry
+from post_confirmation import wait_for_post_confirmation
+from browser_host import is_browser_alive
+from resource_watchdog import ResourceWatchdog
+from deadline import Deadline, DeadlineExceeded, budget, deadline_sleep
+from circuit_breaker import CircuitOpenError, RequestRejected, trends_breaker, compose_breaker, gemini_breaker
+from cycle_profiler import CycleProfiler, PROFILE_CYCLES
+from log_pipeline import lazy_json, lazy_text
+from config_store import ConfigStore
+from trend_harvester import TREND_LOCALES, harvest_trends, interleave, parse_locale_views
+from content_index import ContentIndex
+from trend_selector import TrendSelector
+from profile_mirror import PROFILE_MIRROR, ProfileMirror
+from cycle_journal import CycleJournal
+from stage_runner import RetryPolicy, stage_runner
+
+# Carrega variáveis do arquivo .env
+load_dotenv()
+
+# --- CONFIGURAÇÕES GLOBAIS ---
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL_ID = "gemini-1.5-flash-latest"
+# A URL base pode apontar para um servidor local (ex.: replay de cassete, ver cassette.py).
+GEMINI_API_BASE_URL = os.getenv("GEMINI_API_BASE_URL", "https://generativelanguage.googleapis.com")
+GEMINI_API_URL = f"{GEMINI_API_BASE_URL}/v1beta/models/{GEMINI_MODEL_ID}:generateContent?key={GEMINI_API_KEY}"
+# Motivos de término que indicam conteúdo recusado pelo Gemini (problema da trend/prompt, não da API)
+GEMINI_BLOCK_REASONS = {"SAFETY", "BLOCKLIST", "PROHIBITED_CONTENT", "SPII", "RECITATION", "OTHER"}
+
+raw_profile_path = os.getenv("CHROME_PROFILE_PATH")
+PROFILE_PATH = os.path.abspath(os.path.expanduser(raw_profile_path)) if raw_profile_path else None
+
+TWITTER_BASE_URL = os.getenv("TWITTER_BASE_URL", "https://x.com")
+TWITTER_TRENDS_URL = f"{TWITTER_BASE_URL}/explore/tabs/trending"
+TWITTER_HOME_URL_FOR_TWEET_BUTTON = f"{TWITTER_BASE_URL}/home"
+TWITTER_COMPOSE_URL = f"{TWITTER_BASE_URL}/compose/post"
+MAX_TWEET_CHARACTERS = 260
+SCREENSHOT_DIR = "screenshots_twitter_bot"
+SCREENSHOT_KEEP = int(os.getenv("SCREENSHOT_KEEP", "200")) # Screenshots mantidos em disco (os mais antigos são apagados)
+STATS_HISTORY_LIMIT = int(os.getenv("STATS_HISTORY_LIMIT", "5000")) # Entradas do histórico de trends mantidas em memória
+RESOURCE_SAMPLES_LIMIT = 500 # Amostras de uso de recursos do navegador mantidas em memória
+CONFIG_FILE = "bot_config.json"
+DEFAULT_INTERVAL_MINUTES = 90
+MIN_INTERVAL_MINUTES = 5
+CYCLE_DEADLINE_SECONDS = int(os.getenv("CYCLE_DEADLINE_SECONDS", "600")) # Duração máxima de um ciclo (sobrescrevível por 'cycle_deadline_seconds' no config)
+CYCLE_INTERVAL_MARGIN_SECONDS = 60 # O orçamento do ciclo termina pelo menos isso antes do próximo horário agendado
+# Modo lote: vários posts numa única sessão do navegador (sobrescrevíveis por 'batch_*' no config)
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "5"))
+BATCH_SPACING_SECONDS = float(os.getenv("BATCH_SPACING_SECONDS", "30")) # Pausa entre os posts de um lote
+BATCH_ITEM_DEADLINE_SECONDS = int(os.getenv("BATCH_ITEM_DEADLINE_SECONDS", "120")) # Tempo máximo de cada post do lote
+# Trends postadas há menos que isso não são usadas de novo (sobrescrevível por 'trend_cooldown_hours' no config)
+TREND_COOLDOWN_HOURS = float(os.getenv("TREND_COOLDOWN_HOURS", "6"))
+GENERATION_ATTEMPTS = 3 # Trends tentadas no ciclo quando o texto gerado sai parecido com um anterior
+RESUME_TRENDS_MAX_AGE_SECONDS = 30 * 60 # Trends de um ciclo interrompido ainda reaproveitadas na retomada
+# Endereço de um Chrome mantido pelo browser_host.py (ex.: 127.0.0.1:9222). Se definido e ativo,
+# o bot se conecta a ele em vez de lançar um navegador novo a cada ciclo.
+BROWSER_DEBUGGER_ADDRESS = os.getenv("BROWSER_DEBUGGER_ADDRESS")
+
+logger = logging.getLogger(__name__)
+
+# Registro de seletores: espera todos os candidatos ao mesmo tempo e aprende qual funciona melhor
+selector_registry = SelectorRegistry()
+# Watchdog: acompanha os processos de cada navegador, mede memória/CPU e mata órfãos
+resource_watchdog = ResourceWatchdog()
+# Configuração (bot_config.json) em memória; recarregada só quando o arquivo muda.
+config_store = ConfigStore(CONFIG_FILE, {'interval': DEFAULT_INTERVAL_MINUTES, 'custom_prompt': ''})
+# Observadores de páginas, chamados com (evento, driver, url): 'navigate' antes de abrir uma URL e
+# 'snapshot' quando a página já tem o conteúdo usado pelo bot (usado pela gravação de cassetes).
+page_observers = []
+
+
+class ContentBlocked(RequestRejected):
+    """O Gemini recusou gerar conteúdo para a trend (prompt ou resposta bloqueados)."""
+    def __init__(self, trend, reason):
+        self.trend = trend
+        self.reason = reason
+        super().__init__(f"conteúdo bloqueado pelo Gemini para '{trend}' ({reason})")
+
+
+class PostSubmitted(PostOutcomeUnknown):
+    """A postagem falhou depois do clique em publicar: o post pode ter saído, então nunca é tentada de novo."""
+
+
+# Novas tentativas das etapas do navegador na mesma sessão (ver stage_runner.py). Trends vazias também são
+# tentadas de novo; a postagem, só enquanto o clique em publicar não aconteceu.
+TRENDS_RETRY_POLICY = RetryPolicy(retry_empty=True)
+POST_RETRY_POLICY = RetryPolicy(give_up_on=(PostOutcomeUnknown, PostRejected))
+# Modais e overlays fechados na recuperação entre tentativas (descartando, nunca confirmando, o que pedirem)
+RECOVERY_DISMISS_SELECTORS = [
+    "//div[@role='dialog']//*[@data-testid='app-bar-close']",
+    "//button[@data-testid='confirmationSheetCancel']",
+    "//div[@data-testid='mask']",
+]
+
+
+def check_configuration():
+    """
+    Valida a configuração do .env antes de iniciar o bot.
+
+    Returns:
+        str or None: Mensagem de erro crítico (o bot não pode rodar), ou None se estiver tudo certo.
+    """
+    global PROFILE_PATH
+    os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+    if not GEMINI_API_KEY:
+        logger.critical("CRÍTICO: GEMINI_API_KEY não encontrada no .env!")
+        return "GEMINI_API_KEY não encontrada no .env!"
+    if not PROFILE_PATH or not os.path.isdir(PROFILE_PATH):
+        logger.warning(f"Caminho do perfil do Chrome não encontrado ou inválido. Usando perfil temporário. Caminho fornecido: {PROFILE_PATH}")
+        PROFILE_PATH = None
+    return None
+
+def load_config():
+    """Cópia da configuração atual (para editar e passar a save_config). Para ler uma chave, use config_store.get."""
+    return config_store.snapshot()
+
+def save_config(config):
+    config_store.replace(config)
+
+
+class BotStats:
+    def __init__(self):
+        self.total_tweets = 0
+        self.successful_tweets = 0
+        self.failed_tweets = 0
+        self.start_time = None
+        self.last_tweet_time = None
+        self.trends_used = []
+        self.resource_samples = deque(maxlen=RESOURCE_SAMPLES_LIMIT) # Uso de recursos do navegador por ciclo
+    
+    def add_tweet_attempt(self, success=True, trend_used=None, error=None, profile=None, cycle_id=None):
+        """
+        Adiciona uma tentativa de tweet às estatísticas.
+        """
+        self.total_tweets += 1
+        
+        if success:
+            self.successful_tweets += 1
+            self.last_tweet_time = datetime.now()
+            logger.info(f"Sucesso registrado. Total sucessos: {self.successful_tweets}")
+        else:
+            self.failed_tweets += 1
+            logger.info(f"Falha registrada. Total falhas: {self.failed_tweets}")
+        
+        if trend_used:
+            entry = {
+                'trend': trend_used,
+                'timestamp': datetime.now(),
+                'success': success,
+                'error': error,
+                'cycle_id': cycle_id, # Correlaciona a entrada com as linhas do log do ciclo
+                'profile': profile # Caminho base do perfil do ciclo (ver cycle_profiler.py), se perfilado
+            }
+            self.trends_used.append(entry)
+            if len(self.trends_used) > STATS_HISTORY_LIMIT:
+                del self.trends_used[:-STATS_HISTORY_LIMIT]
+            logger.debug(f"Trend registrada: {trend_used} - {'Sucesso' if success else 'Falha'}")
+    
+    def recent_trends(self, window_seconds):
+        """
+        Trends postadas com sucesso nos últimos `window_seconds` (em minúsculas, para comparar).
+        """
+        since = datetime.now() - timedelta(seconds=window_seconds)
+        return {e['trend'].casefold() for e in self.trends_used if e['success'] and e['timestamp'] >= since}
+    
+    def add_resource_sample(self, sample):
+        """
+        Registra o uso de memória/CPU do navegador medido no ciclo.
+        """
+        if sample:
+            self.resource_samples.append(dict(sample, timestamp=datetime.now()))
+    
+    def get_success_rate(self):
+        """
+        Calcula e retorna a taxa de sucesso.
+        """
+        if self.total_tweets == 0:
+            return 0.0
+        
+        rate = (self.successful_tweets / self.total_tweets) * 100
+        return rate
+    
+    def export_to_csv(self, filename):
+        """
+        Exporta as estatísticas para um arquivo CSV.
+        """
+        try:
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['Trend', 'Timestamp', 'Success', 'Error', 'Profile', 'Cycle ID'])
+                
+                for entry in self.trends_used:
+                    writer.writerow([
+                        entry['trend'],
+                        entry['timestamp'].strftime('%d/%m/%Y %H:%M:%S'),
+                        entry['success'],
+                        entry.get('error') or '',
+                        entry.get('profile') or '',
+                        entry.get('cycle_id') or ''
+                    ])
+            
+            logger.info(f"Estatísticas exportadas para: {filename}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erro ao exportar estatísticas: {e}")
+            return False
+    
+    def get_summary(self):
+        """
+        Retorna um resumo das estatísticas.
+        """
+        return {
+            'total_tweets': self.total_tweets,
+            'successful_tweets': self.successful_tweets,
+            'failed_tweets': self.failed_tweets,
+            'success_rate': self.get_success_rate(),
+            'uptime': str(datetime.now() - self.start_time).split('.')[0] if self.start_time else "N/A",
+            'last_tweet_time': self.last_tweet_time.strftime('%H:%M:%S') if self.last_tweet_time else "N/A",
+            'last_browser_rss_mb': self.resource_samples[-1]['rss_mb'] if self.resource_samples else None,
+            'peak_browser_rss_mb': max((r['rss_mb'] for r in self.resource_samples), default=None)
+        }
+
+_chromedriver_path = None
+_profile_mirror = None
+
+def get_chromedriver_path():
+    """
+    Resolve o ChromeDriver uma única vez por processo (o webdriver_manager consulta a rede a cada install()).
+    """
+    global _chromedriver_path
+    if _chromedriver_path is None:
+        from webdriver_manager.chrome import ChromeDriverManager
+        _chromedriver_path = ChromeDriverManager().install()
+    return _chromedriver_path
+
+def attach_to_browser_host(address):
+    """
+    Conecta ao Chrome do browser-host e abre uma aba própria para este ciclo.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    options = Options()
+    options.add_experimental_option("debuggerAddress", address)
+    enable_performance_logging(options)
+    driver = webdriver.Chrome(service=Service(get_chromedriver_path()), options=options)
+    # Cada ciclo trabalha na sua aba, para que vários bots possam compartilhar o mesmo navegador.
+    driver.switch_to.new_window('tab')
+    driver.attached_to_browser_host = True
+    logger.info(f"✓ Conectado ao browser-host em {address}")
+    return driver
+
+def get_profile_mirror(profile_path):
+    """
+    Gerenciador do espelho em memória do perfil (PROFILE_MIRROR=1), criado no primeiro uso.
+    """
+    global _profile_mirror
+    if _profile_mirror is None or _profile_mirror.source_path != profile_path:
+        _profile_mirror = ProfileMirror(profile_path)
+    return _profile_mirror
+
+def init_driver(profile_path_arg):
+    """
+    Conecta ao browser-host, se configurado e ativo; senão lança um Chrome próprio.
+    """
+    if BROWSER_DEBUGGER_ADDRESS:
+        if is_browser_alive(BROWSER_DEBUGGER_ADDRESS):
+            try:
+                return attach_to_browser_host(BROWSER_DEBUGGER_ADDRESS)
+            except Exception as e:
+                logger.warning(f"Falha ao conectar ao browser-host ({e}); lançando navegador próprio")
+        else:
+            logger.warning(f"Browser-host em {BROWSER_DEBUGGER_ADDRESS} não responde; lançando navegador próprio")
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    options = Options()
+    mirror, mirror_dir = None, None
+    if profile_path_arg and PROFILE_MIRROR:
+        # Roda sobre uma cópia do perfil em memória, com o cache estático num diretório em disco limitado
+        mirror = get_profile_mirror(profile_path_arg)
+        mirror_dir = mirror.acquire()
+        for argument in mirror.chrome_arguments(): options.add_argument(argument)
+    if profile_path_arg: options.add_argument(f"user-data-dir={mirror_dir or profile_path_arg}")
+    options.add_argument("--lang=pt-BR"); options.add_argument("--start-maximized")
+    options.add_argument("--disable-notifications"); options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox"); options.add_argument("--disable-dev-shm-usage")
+    enable_performance_logging(options) # Permite ler as respostas de rede (trends) via CDP
+    try:
+        service = Service(get_chromedriver_path()); driver = webdriver.Chrome(service=service, options=options)
+    except Exception as e:
+        logger.error(f"Falha ao inicializar o WebDriver: {e}", exc_info=True)
+        if mirror: mirror.release(mirror_dir, sync=False)
+        raise
+    driver.profile_mirror = (mirror, mirror_dir) if mirror else None
+    return driver
+
+def release_driver(driver):
+    """
+    Encerra a sessão do WebDriver e os processos que sobrarem. Conectado ao browser-host, fecha só a aba do
+    ciclo e mantém o navegador vivo.
+    """
+    if getattr(driver, 'attached_to_browser_host', False):
+        try: driver.close()
+        except Exception as e: logger.warning(f"Erro ao fechar a aba do browser-host: {e}")
+    try:
+        driver.quit()
+    finally:
+        # Mesmo se o quit() falhar (driver travado ou morto): encerra o que sobrou da árvore de processos e só
+        # então devolve o espelho, senão ele vaza no tmpfs, a sessão não volta e a reserva do cache fica presa.
+        resource_watchdog.release_driver(driver)
+        profile_mirror = getattr(driver, 'profile_mirror', None)
+        if profile_mirror:
+            # Com o Chrome já fechado, leva cookies/sessão de volta para a cópia dourada e apaga o espelho
+            mirror, mirror_dir = profile_mirror
+            try:
+                mirror.release(mirror_dir)
+            except Exception as e:
+                logger.warning(f"Erro ao devolver o espelho do perfil {mirror_dir}: {e}")
+
+def get_tweet_content_from_gemini(trend_topic, custom_prompt=None):
+    """
+    Versão melhorada da função para obter conteúdo da IA Gemini.
+    """
+    logger.info(f"Solicitando conteúdo da IA Gemini para trend: '{trend_topic}'")
+    
+    headers = {"Content-Type": "application/json"}
+    
+    # Usa prompt personalizado se fornecido, senão usa o padrão
+    if custom_prompt and custom_prompt.strip():
+        prompt = custom_prompt.replace("{trend}", trend_topic)
+        logger.info("Usando prompt personalizado")
+    else:
+        prompt = (f"'{trend_topic}' está em alta. Crie um tweet curto e engajador "
+                 f"(máximo de {MAX_TWEET_CHARACTERS - 45} caracteres) com uma curiosidade "
+                 f"sobre o tema. Inclua 1 hashtag relevante. Tom informativo. "
+                 f"Não use datas, saudações, links ou []. Responda APENAS com o texto do tweet.")
+        logger.info("Usando prompt padrão")
+    
+    data_payload = {
+        "contents": [{"parts": [{"text": prompt}]}],
+        "generationConfig": {
+            "temperature": 0.5,
+            "maxOutputTokens": 100,
+            "topP": 0.8,
+            "topK": 10
+        }
+    }
+    
+    try:
+        logger.info("Enviando requisição para API Gemini...")
+        logger.debug("Payload da requisição Gemini: %s", lazy_json(data_payload))
+        response = requests.post(
+            GEMINI_API_URL,
+            headers=headers,
+            json=data_payload,
+            timeout=budget(45)
+        )
+        
+        logger.info(f"Status da resposta: {response.status_code}")
+        logger.debug("Resposta da API Gemini: %s", lazy_text(response.text))
+        
+        response.raise_for_status()
+        data = response.json()
+        
+        # Prompt ou resposta bloqueados: a API funcionou, mas recusou esta trend
+        first = (data.get("candidates") or [{}])[0]
+        block_reason = data.get("promptFeedback", {}).get("blockReason")
+        if not block_reason and not first.get("content", {}).get("parts") and first.get("finishReason") in GEMINI_BLOCK_REASONS:
+            block_reason = first["finishReason"]
+        if block_reason:
+            logger.warning(f"Gemini recusou o conteúdo para '{trend_topic}': {block_reason}")
+            raise ContentBlocked(trend_topic, block_reason)
+        
+        # Verifica se a resposta tem o formato esperado
+        if not data.get("candidates"):
+            logger.error("Resposta da API sem candidates")
+            return None
+            
+        candidate = data["candidates"][0]
+        if not candidate.get("content", {}).get("parts"):
+            logger.error("Resposta da API sem content/parts")
+            return None
+        
+        generated_text = candidate["content"]["parts"][0]["text"].strip()
+        
+        if not generated_text:
+            logger.error("Texto gerado está vazio")
+            return None
+        
+        logger.info(f"✓ Conteúdo gerado com sucesso: '{generated_text[:50]}...'")
+        return generated_text
+        
+    except requests.exceptions.Timeout:
+        logger.error("Timeout na requisição para API Gemini")
+        return None
+    except requests.exceptions.HTTPError as e:
+        logger.error(f"Erro HTTP na API Gemini: {e}")
+        try:
+            error_data = response.json()
+            logger.error(f"Detalhes do erro: {error_data}")
+        except:
+            pass
+        return None
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Erro de rede na API Gemini: {e}")
+        return None
+    except ContentBlocked:
+        raise
+    except Exception as e:
+        logger.error(f"Erro inesperado na API Gemini: {e}", exc_info=True)
+        return None
+
+def prune_screenshots(keep=None):
+    """
+    Apaga os screenshots mais antigos, mantendo os `keep` mais recentes (padrão: SCREENSHOT_KEEP).
+    """
+    keep = SCREENSHOT_KEEP if keep is None else keep
+    try:
+        entries = [e for e in os.scandir(SCREENSHOT_DIR) if e.is_file() and e.name.endswith('.png')]
+    except FileNotFoundError:
+        return 0
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    removed = 0
+    for entry in entries[keep:]:
+        try: os.remove(entry.path); removed += 1
+        except OSError as e: logger.debug(f"Não foi possível apagar {entry.path}: {e}")
+    return removed
+
+def notify_page_observers(event, driver, url):
+    for observer in list(page_observers):
+        try: observer(event, driver, url)
+        except Exception as e: logger.debug(f"Erro em observador de página: {e}")
+
+def navigate(driver, url):
+    """
+    Abre a URL limitando o carregamento da página ao tempo restante do ciclo.
+    """
+    notify_page_observers('navigate', driver, url)
+    driver.set_page_load_timeout(budget(60))
+    driver.get(url)
+
+def recover_page(driver):
+    """
+    Recuperação leve entre tentativas de uma etapa, na mesma sessão: interrompe o carregamento, fecha modais e
+    overlays que interceptam cliques (a tentativa seguinte navega de novo até a página da etapa).
+    Levanta exceção se a sessão não responde mais, porque então não adianta tentar de novo nela.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    url = driver.current_url # Sessão morta (navegador fechado, aba perdida) levanta aqui
+    try:
+        driver.execute_script("window.stop();")
+        driver.switch_to.active_element.send_keys(Keys.ESCAPE)
+    except Exception as e:
+        logger.debug(f"Recuperação: erro ao interromper a página ou enviar Esc: {e}")
+    dismissed = 0
+    for xpath in RECOVERY_DISMISS_SELECTORS:
+        for element in driver.find_elements(By.XPATH, xpath):
+            try:
+                if element.is_displayed():
+                    element.click(); dismissed += 1
+            except Exception as e:
+                logger.debug(f"Recuperação: não foi possível fechar {xpath}: {e}")
+    logger.info(f"Recuperação da página {url}: {dismissed} modal(is)/overlay(s) fechado(s)")
+
+def select_trends_from_twitter(driver):
+    """
+    Seleciona trends do Twitter; falhas e listas vazias são tentadas de novo na mesma sessão (ver TRENDS_RETRY_POLICY).
+
+    Returns:
+        list: Trends encontradas ([] se nenhuma tentativa encontrou trends).
+    Raises:
+        Exception: O erro da última tentativa, se todas falharam com erro.
+    """
+    return stage_runner.run('trends', lambda: select_trends_once(driver), TRENDS_RETRY_POLICY,
+                            recover=lambda error: recover_page(driver))
+
+def select_trends_once(driver):
+    """
+    Uma tentativa de seleção das trends, com múltiplos seletores. Erros são levantados (com screenshot) para a política de novas tentativas.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+    logger.info(f"Acessando a página de trends: {TWITTER_TRENDS_URL}")
+    
+    try:
+        # Navega para a página de trends, descartando eventos de rede de navegações anteriores
+        drain_network_events(driver)
+        navigate(driver, TWITTER_TRENDS_URL)
+        
+        # Caminho rápido: lê as trends do JSON que a própria página baixou, sem esperar a renderização
+        network_trends = capture_explore_trends(driver, timeout=15)
+        if network_trends:
+            trends = [t['name'] for t in network_trends][:20]
+            logger.info(f"Trends obtidas pela rede ({len(trends)}): " + ", ".join(
+                f"{t['rank'] or '-'}. {t['name']} ({t['post_count'] or '?'} posts)" for t in network_trends[:10]))
+            notify_page_observers('snapshot', driver, TWITTER_TRENDS_URL)
+            return trends
+        logger.info("Trends não capturadas pela rede, usando as estratégias de DOM...")
+        
+        # Aguarda a página carregar
+        wait = WebDriverWait(driver, budget(30))
+        
+        # Aguarda um elemento que indica que a página carregou
+        wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        
+        trends = []
+        
+        # Múltiplas estratégias para encontrar trends
+        strategies = [
+            # Estratégia 1: Usando data-testid
+            {
+                'name': 'data-testid',
+                'container': "//section[@aria-labelledby]",
+                'elements': ".//div[@data-testid='trend']//span"
+            },
+            # Estratégia 2: Procurando por texto que começa com #
+            {
+                'name': 'hashtag_spans',
+                'container': "//main",
+                'elements': ".//span[starts-with(text(), '#')]"
+            },
+            # Estratégia 3: Procurando em divs de trend
+            {
+                'name': 'trend_divs',
+                'container': "//div[contains(@aria-label, 'Timeline')]",
+                'elements': ".//div[contains(@class, 'trend') or contains(@data-testid, 'trend')]//span"
+            },
+            # Estratégia 4: Procura mais ampla por spans com #
+            {
+                'name': 'all_hashtags',
+                'container': "//body",
+                'elements': ".//span[contains(text(), '#')]"
+            }
+        ]
+        
+        # Em vez de uma pausa fixa e de um timeout por estratégia, espera até que os elementos
+        # de QUALQUER estratégia apareçam (container + elementos num único XPath).
+        race_started = time.monotonic()
+        try:
+            selector_registry.wait_for_any(
+                driver, 'trend_elements',
+                [s['container'] + s['elements'][1:] for s in strategies],
+                condition='present', timeout=30
+            )
+            logger.info("Página de trends carregada, procurando por trends...")
+        except TimeoutException:
+            logger.warning("Nenhum elemento de trend apareceu a tempo; tentando as estratégias mesmo assim")
+        
+        # Tenta as estratégias na ordem aprendida (as que mais funcionaram primeiro)
+        strategies_by_name = {s['name']: s for s in strategies}
+        for strategy_name in selector_registry.ordered('trend_strategies', list(strategies_by_name)):
+            strategy = strategies_by_name[strategy_name]
+            try:
+                logger.info(f"Tentando estratégia: {strategy['name']}")
+                
+                # O conteúdo já carregou: procura o container sem nova espera
+                containers = driver.find_elements(By.XPATH, strategy['container'])
+                if not containers:
+                    logger.warning(f"Container não encontrado para estratégia {strategy['name']}")
+                    selector_registry.record_miss('trend_strategies', strategy['name'])
+                    continue
+                container = containers[0]
+                
+                # Procura pelos elementos dentro do container
+                elements = container.find_elements(By.XPATH, strategy['elements'])
+                logger.info(f"Encontrados {len(elements)} elementos na estratégia {strategy['name']}")
+                
+                # Extrai o texto dos elementos
+                strategy_trends = []
+                for element in elements:
+                    try:
+                        text = element.text.strip()
+                        if text and text.startswith('#') and len(text) > 1:
+                            # Remove caracteres especiais e espaços extras
+                            clean_text = text.split()[0]  # Pega apenas a primeira palavra
+                            if len(clean_text) > 1 and clean_text not in strategy_trends:
+                                strategy_trends.append(clean_text)
+                    except Exception as e:
+                        continue
+                
+                if strategy_trends:
+                    logger.info(f"Estratégia {strategy['name']} encontrou {len(strategy_trends)} trends")
+                    selector_registry.record_hit('trend_strategies', strategy['name'], time.monotonic() - race_started)
+                    trends.extend(strategy_trends)
+                    break  # Se encontrou trends, para aqui
+                selector_registry.record_miss('trend_strategies', strategy['name'])
+                    
+            except Exception as e:
+                logger.warning(f"Erro na estratégia {strategy['name']}: {e}")
+                selector_registry.record_miss('trend_strategies', strategy['name'])
+                continue
+        
+        # Remove duplicatas mantendo a ordem
+        unique_trends = []
+        seen = set()
+        for trend in trends:
+            if trend not in seen:
+                unique_trends.append(trend)
+                seen.add(trend)
+        
+        trends = unique_trends[:20]  # Limita a 20 trends
+        
+        if trends:
+            logger.info(f"Trends encontradas ({len(trends)}): {trends[:10]}...")  # Mostra apenas as 10 primeiras no log
+            notify_page_observers('snapshot', driver, TWITTER_TRENDS_URL)
+            
+            # Salva screenshot de sucesso
+            success_screenshot = os.path.join(SCREENSHOT_DIR, f"trends_success_{int(time.time())}.png")
+            driver.save_screenshot(success_screenshot)
+            
+        else:
+            logger.warning("Nenhuma trend foi encontrada com nenhuma das estratégias")
+            
+            # Tira screenshot para debug
+            error_screenshot = os.path.join(SCREENSHOT_DIR, f"no_trends_{int(time.time())}.png")
+            driver.save_screenshot(error_screenshot)
+            
+            # Tenta logar o HTML da página para debug
+            # (page_source é uma chamada ao WebDriver: só é feita com o nível DEBUG ativo)
+            if logger.isEnabledFor(logging.DEBUG):
+                try:
+                    page_source_snippet = driver.page_source[:2000]  # Primeiros 2000 caracteres
+                    logger.debug(f"Snippet do HTML da página: {page_source_snippet}")
+                except:
+                    pass
+                
+        return trends
+        
+    except Exception as e:
+        logger.error(f"Erro geral ao selecionar trends: {e}", exc_info=True)
+        
+        # Tira screenshot do erro
+        error_screenshot = os.path.join(SCREENSHOT_DIR, f"trends_error_{int(time.time())}.png")
+        try:
+            driver.save_screenshot(error_screenshot)
+            logger.error(f"Screenshot do erro salvo em: {error_screenshot}")
+        except:
+            pass
+        
+        raise
+
+
+def get_backup_trends():
+    """
+    Lista fixa de trends de partida do pool de reserva (ver BotController.backup_trends), usada enquanto
+    o histórico ainda não tem trends bem-sucedidas suficientes.
+    """
+    backup_trends = [
+        "#Python", "#JavaScript", "#TechNews", "#AI", "#MachineLearning",
+        "#WebDev", "#Programming", "#OpenSource", "#DataScience", "#CloudComputing",
+        "#Cybersecurity", "#Innovation", "#DigitalTransformation", "#SoftwareDevelopment",
+        "#TechTrends", "#Automation", "#BigData", "#IoT", "#Blockchain", "#DevOps"
+    ]
+    return backup_trends
+
+def confirm_tweet_submitted(driver, timeout=30):
+    """
+    Confirma o envio observando a requisição de criação do post na rede.
+
+    Returns:
+        str or None: ID do novo post (None se a confirmação veio apenas pela interface).
+    Raises:
+        Exception: Se o servidor recusou o post ou a confirmação não chegou.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+    logger.info("Aguardando confirmação do envio pela rede...")
+    result = wait_for_post_confirmation(driver, timeout=timeout)
+    if result.confirmed:
+        logger.info(f"Post confirmado pelo servidor (HTTP {result.status}), ID: {result.post_id}")
+        return result.post_id
+    if result.observed:
+        if result.rejected:
+            raise PostRejected(f"Servidor recusou o post: {result.reason}")
+        raise Exception(f"Servidor recusou o post: {result.reason}")
+    
+    # A requisição não apareceu nos logs de rede (ex.: log de performance indisponível):
+    # recorre à verificação pelo fechamento do modal de composição.
+    logger.warning("Requisição de criação do post não observada na rede; verificando pela interface")
+    try:
+        WebDriverWait(driver, budget(5)).until(EC.invisibility_of_element_located((By.XPATH, "//div[@data-testid='tweetTextarea_0']")))
+    except TimeoutException:
+        raise Exception(f"Envio não confirmado: {result.reason}")
+    logger.info("Modal de composição fechado - tweet enviado com sucesso")
+    return None
+
+def post_tweet_fast_path(driver, tweet_content):
+    """
+    Caminho rápido de postagem: abre a URL de composição direto e insere o texto inteiro de uma vez
+    via CDP (Input.insertText), em vez de navegar pela home e digitar tecla por tecla.
+
+    Returns:
+        tuple: (postado, submetido). `postado` é o ID do post quando a rede o informou, True se
+               confirmado só pela interface, ou False. Se `submetido` for False, a falha ocorreu antes do clique em
+               publicar e é seguro tentar o fluxo tradicional sem risco de postagem duplicada.
+    """
+    from selenium.common.exceptions import ElementClickInterceptedException
+    submitted = False
+    try:
+        logger.info(f"Caminho rápido: abrindo a composição direta em {TWITTER_COMPOSE_URL}")
+        navigate(driver, TWITTER_COMPOSE_URL)
+        
+        textarea_selectors = [
+            "//div[@data-testid='tweetTextarea_0']",
+            "//div[@role='textbox']",
+            "//div[@contenteditable='true']"
+        ]
+        tweet_area, _ = selector_registry.wait_for_any(driver, 'tweet_textarea', textarea_selectors, 'visible', timeout=20)
+        notify_page_observers('snapshot', driver, TWITTER_COMPOSE_URL)
+        tweet_area.click()
+        
+        # Insere o texto inteiro numa única operação (sem eventos de tecla, sem caracteres perdidos)
+        driver.execute_cdp_cmd("Input.insertText", {"text": tweet_content})
+        
+        # Verifica o conteúdo do editor numa única chamada de script
+        draft_text = driver.execute_script("return arguments[0].innerText || '';", tweet_area)
+        if " ".join(draft_text.split()) != " ".join(tweet_content.split()):
+            logger.warning(f"Caminho rápido: texto do rascunho não confere ('{draft_text[:50]}...')")
+            return False, False
+        
+        submit_selectors = [
+            "//button[@data-testid='tweetButton']",
+            "//button[@data-testid='tweetButtonInline']"
+        ]
+        submit_button, _ = selector_registry.wait_for_any(driver, 'submit_button', submit_selectors, 'clickable', timeout=10)
+        drain_network_events(driver) # Só a requisição de criação do post deve ser observada
+        try:
+            submit_button.click()
+        except ElementClickInterceptedException:
+            driver.execute_script("arguments[0].click();", submit_button)
+        submitted = True
+        logger.info("Caminho rápido: botão de publicar clicado")
+        
+        post_id = confirm_tweet_submitted(driver)
+        logger.info("✓ Tweet postado pelo caminho rápido")
+        return post_id or True, True
+    except PostRejected:
+        raise # O conteúdo foi recusado: nada foi publicado, e o fluxo tradicional teria o mesmo fim
+    except Exception as e:
+        logger.warning(f"Caminho rápido de postagem falhou ({'após' if submitted else 'antes do'} envio): {e}")
+        return False, submitted
+
+def post_tweet_on_twitter(driver, tweet_content):
+    """
+    Posta um tweet. Falhas antes do clique em publicar são tentadas de novo na mesma sessão e com o mesmo texto
+    (ver POST_RETRY_POLICY); depois do clique, nunca, porque repetir poderia duplicar o tweet.
+
+    Returns:
+        str or bool: ID do novo post (ou True, se ele não foi informado).
+    Raises:
+        Exception: O erro da última tentativa (PostSubmitted se a falha ocorreu depois do envio).
+    """
+    return stage_runner.run('postagem', lambda: post_tweet_once(driver, tweet_content), POST_RETRY_POLICY,
+                            recover=lambda error: recover_page(driver))
+
+def post_tweet_once(driver, tweet_content):
+    """
+    Uma tentativa de postagem: primeiro o caminho rápido e, se ele falhar antes do envio, o fluxo tradicional.
+    """
+    posted, submitted = post_tweet_fast_path(driver, tweet_content)
+    if posted:
+        # O tweet já saiu: uma falha no screenshot não pode virar erro (a etapa seria repetida e o tweet duplicado)
+        success_screenshot = os.path.join(SCREENSHOT_DIR, f"tweet_success_{int(time.time())}.png")
+        try:
+            driver.save_screenshot(success_screenshot)
+        except Exception as e:
+            logger.warning(f"Não foi possível salvar o screenshot de sucesso: {e}")
+        return posted
+    if submitted:
+        # O clique em publicar já aconteceu: repetir o fluxo poderia duplicar o tweet.
+        raise PostSubmitted("falha após o envio pelo caminho rápido; a postagem não será repetida")
+    logger.info("Usando o fluxo tradicional de postagem (home + botão de novo tweet)")
+    return post_tweet_via_home(driver, tweet_content)
+
+def post_tweet_via_home(driver, tweet_content):
+    """
+    Fluxo tradicional de postagem (home, botão de novo tweet, digitação), com melhor tratamento de erros e diagnóstico.
+    Erros são levantados depois do diagnóstico; os que ocorrem após o clique em publicar, como PostSubmitted.
+    """
+    from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
+    logger.info(f"Tentando postar tweet: '{tweet_content[:50]}...'")
+    submitted = False
+    
+    try:
+        # Navega para a página inicial do Twitter
+        navigate(driver, TWITTER_HOME_URL_FOR_TWEET_BUTTON)
+        logger.info("Navegou para página inicial do Twitter")
+        
+        # Tenta encontrar e clicar no botão de novo tweet
+        logger.info("Procurando botão de novo tweet...")
+        
+        # Múltiplos seletores possíveis para o botão de tweet
+        tweet_button_selectors = [
+            "//a[@data-testid='SideNav_NewTweet_Button']",
+            "//button[@data-testid='SideNav_NewTweet_Button']",
+            "//a[contains(@href, '/compose/tweet')]",
+            "//button[contains(text(), 'Tweet')]",
+            "//a[@aria-label='Tweet']"
+        ]
+        
+        try:
+            tweet_button, _ = selector_registry.wait_for_any(driver, 'tweet_button', tweet_button_selectors, 'clickable', timeout=30)
+        except TimeoutException:
+            raise Exception("Não foi possível encontrar o botão de novo tweet")
+        
+        # Clica no botão de tweet
+        try:
+            tweet_button.click()
+            logger.info("Clicou no botão de novo tweet")
+        except ElementClickInterceptedException:
+            logger.warning("Clique interceptado, tentando com JavaScript")
+            driver.execute_script("arguments[0].click();", tweet_button)
+        
+        # Aguarda a área de texto aparecer
+        logger.info("Procurando área de texto do tweet...")
+        
+        # Múltiplos seletores para a área de texto
+        textarea_selectors = [
+            "//div[@data-testid='tweetTextarea_0']",
+            "//div[@role='textbox']",
+            "//div[@contenteditable='true']",
+            "//div[contains(@class, 'public-DraftEditor-content')]"
+        ]
+        
+        try:
+            tweet_area, _ = selector_registry.wait_for_any(driver, 'tweet_textarea', textarea_selectors, 'visible', timeout=30)
+        except TimeoutException:
+            # Tira screenshot para debug
+            screenshot_path = os.path.join(SCREENSHOT_DIR, f"no_textarea_{int(time.time())}.png")
+            driver.save_screenshot(screenshot_path)
+            raise Exception(f"Não foi possível encontrar a área de texto. Screenshot salvo em: {screenshot_path}")
+        
+        # Limpa qualquer texto existente e insere o novo conteúdo
+        tweet_area.clear()
+        tweet_area.send_keys(tweet_content)
+        logger.info("Texto inserido na área de tweet")
+        
+        # Aguarda um pouco para garantir que o texto foi inserido
+        deadline_sleep(2)
+        
+        # Verifica se o texto foi realmente inserido
+        inserted_text = tweet_area.text or tweet_area.get_attribute('value') or ''
+        if not inserted_text.strip():
+            raise Exception("O texto do tweet não foi inserido corretamente")
+        
+        logger.info(f"Texto verificado na área: '{inserted_text[:50]}...'")
+        
+        # Procura pelo botão de publicar
+        logger.info("Procurandoботão de publicar...")
+        
+        # Múltiplos seletores para o botão de publicar
+        submit_selectors = [
+            "//button[@data-testid='tweetButton']",
+            "//button[@data-testid='tweetButtonInline']",
+            "//button[contains(text(), 'Tweet')]",
+            "//button[contains(text(), 'Postar')]",
+            "//button[@role='button'][contains(., 'Tweet')]"
+        ]
+        
+        try:
+            submit_button, _ = selector_registry.wait_for_any(driver, 'submit_button', submit_selectors, 'clickable', timeout=30)
+        except TimeoutException:
+            # Tira screenshot para debug
+            screenshot_path = os.path.join(SCREENSHOT_DIR, f"no_submit_button_{int(time.time())}.png")
+            driver.save_screenshot(screenshot_path)
+            raise Exception(f"Não foi possível encontrar o botão de publicar. Screenshot salvo em: {screenshot_path}")
+        
+        # Verifica se o botão está habilitado
+        if not submit_button.is_enabled():
+            raise Exception("O botão de publicar está desabilitado")
+        
+        # Clica no botão de publicar
+        drain_network_events(driver) # Só a requisição de criação do post deve ser observada
+        try:
+            submit_button.click()
+            logger.info("Clicou no botão de publicar")
+        except ElementClickInterceptedException:
+            logger.warning("Clique no botão de publicar interceptado, tentando com JavaScript")
+            driver.execute_script("arguments[0].click();", submit_button)
+        submitted = True
+        
+        # Aguarda a confirmação de que o tweet foi enviado
+        post_id = confirm_tweet_submitted(driver)
+        
+        # Tira screenshot de sucesso (o tweet já saiu: uma falha aqui não pode virar erro de postagem)
+        success_screenshot = os.path.join(SCREENSHOT_DIR, f"tweet_success_{int(time.time())}.png")
+        try:
+            driver.save_screenshot(success_screenshot)
+            logger.info(f"Tweet postado com sucesso! Screenshot salvo em: {success_screenshot}")
+        except Exception as e:
+            logger.info(f"Tweet postado com sucesso! (screenshot não salvo: {e})")
+        return post_id or True
+        
+    except TimeoutException as e:
+        error_msg = f"Timeout ao postar tweet: {str(e)}"
+        logger.error(error_msg)
+        
+        # Tira screenshot do erro (o driver pode estar morto: a falha do screenshot não substitui o erro)
+        error_screenshot = os.path.join(SCREENSHOT_DIR, f"timeout_error_{int(time.time())}.png")
+        try:
+            driver.save_screenshot(error_screenshot)
+            logger.error(f"Screenshot do erro salvo em: {error_screenshot}")
+        except:
+            pass
+        
+        if submitted and not isinstance(e, PostRejected):
+            raise PostSubmitted(error_msg) from e
+        raise
+        
+    except Exception as e:
+        error_msg = f"Erro ao postar tweet: {str(e)}"
+        logger.error(error_msg, exc_info=True)
+        
+        # Tira screenshot do erro (o driver pode estar morto: a falha do screenshot não substitui o erro)
+        error_screenshot = os.path.join(SCREENSHOT_DIR, f"post_error_{int(time.time())}.png")
+        try:
+            driver.save_screenshot(error_screenshot)
+            logger.error(f"Screenshot do erro salvo em: {error_screenshot}")
+        except:
+            pass
+        
+        # Tenta obter informações adicionais sobre o estado da página
+        try:
+            current_url = driver.current_url
+            page_title = driver.title
+            logger.error(f"Estado da página - URL: {current_url}, Título: {page_title}")
+        except:
+            pass
+        
+        if submitted and not isinstance(e, PostRejected):
+            raise PostSubmitted(error_msg) from e
+        raise
+
+def generate_tweet_text(trend):
+    """
+    Gera o texto de um tweet para a trend já ajustado ao limite de caracteres.
+    """
+    custom_prompt = config_store.get('custom_prompt', '')
+    tweet_text = gemini_breaker.call(get_tweet_content_from_gemini, trend, custom_prompt)
+    if tweet_text and len(tweet_text) > MAX_TWEET_CHARACTERS:
+        logger.warning(f"Tweet muito longo ({len(tweet_text)} chars), truncando...")
+        tweet_text = tweet_text[:MAX_TWEET_CHARACTERS-3] + "..."
+    return tweet_text
+
+
+class BotController:
+    """
+    Estado e agendamento do bot, compartilhados pelo daemon e pela interface.
+
+    Mantém as estatísticas, o backlog de tweets, o WebDriver do ciclo (aberto sob
+    demanda), os backends de postagem e as fontes de trends, e executa o ciclo no
+    intervalo configurado. A interface se registra em `listeners` para ser avisada
+    ao fim de cada ciclo.
+
+    Args:
+        interval (int): Intervalo entre ciclos, em minutos (padrão: o do bot_config.json).
+        state_dir (str): Diretório dos arquivos de estado (backlog, índice de conteúdo, histórico de trends e
+                         diário); padrão: os arquivos do bot. A reprodução de cassetes e o teste de longa duração
+                         usam um diretório temporário, para não ler nem alterar o estado do bot.
+    """
+    def __init__(self, interval=None, state_dir=None):
+        self.interval = interval or config_store.get('interval', DEFAULT_INTERVAL_MINUTES)
+        self.state_dir = state_dir
+        self.stats = BotStats()
+        self.running_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.scheduler_thread = None
+        self.next_execution_time = None
+        self.listeners = [] # Funções chamadas (sem argumentos) ao fim de cada ciclo
+        self.current_stage = None # Etapa do ciclo em andamento (None quando ocioso)
+        # Relógio do agendador e intervalo entre verificações; o teste de longa duração (soak.py) os substitui para acelerar o tempo.
+        self.clock = datetime.now
+        self.scheduler_tick = 1
+        # Perfilamento sob demanda dos ciclos ('profile_cycles' no config ou PROFILE_CYCLES no .env)
+        self.profiler = CycleProfiler()
+        self.profile_session = None
+        
+        # Mudanças no bot_config.json (pela interface, pela API ou à mão) valem sem reiniciar
+        config_store.subscribe(self.on_config_change)
+        
+        # Backlog de tweets pré-gerados: o produtor só trabalha enquanto nenhum ciclo está rodando.
+        self.tweet_backlog = TweetBacklog(**self.state_file("tweet_backlog.json"))
+        # Índice de similaridade dos textos gerados/postados: evita gerar e postar quase o mesmo texto de novo.
+        self.content_index = ContentIndex(**self.state_file("content_index.json"))
+        # Resultados por trend (com decaimento): bloqueia trends que falham e pondera o sorteio pelas que funcionam.
+        self.trend_selector = TrendSelector(**self.state_file("trend_stats.json"))
+        # Diário dos ciclos: depois de uma queda, retoma o ciclo interrompido sem repetir o que já foi feito
+        self.journal = CycleJournal(**self.state_file("cycle_journal.jsonl"))
+        self.resume_state = None
+        self.recover_cycles()
+        self.cycle_idle_event = threading.Event(); self.cycle_idle_event.set()
+        self.backlog_producer = None
+        self.latest_trends = [] # Últimas trends obtidas, usadas pelo produtor do backlog
+        self.latest_trends_by_locale = {} # Com TREND_LOCALES: últimas trends de cada locale
+        
+        self.current_driver = None
+        self.driver_lock = threading.Lock()
+        # Um ciclo ou lote por vez: o navegador, o perfilamento e a pausa do produtor do backlog pertencem a quem
+        # segura esta trava, e ninguém fecha o navegador que outro ciclo ainda está usando.
+        self.session_lock = threading.Lock()
+        
+        # Backends de postagem: a API (se houver credenciais no .env) e o fluxo do navegador.
+        # São criados uma vez para manter o pool de conexões e as métricas entre ciclos.
+        self.api_poster = ApiPoster.from_env()
+        self.selenium_poster = SeleniumPoster(self.get_current_driver, post_tweet_on_twitter, compose_breaker)
+        self.tweet_poster = build_poster({'api': self.api_poster, 'selenium': self.selenium_poster})
+        
+        # Fontes de trends: arquivo/HTTP (se configurados no .env) antes do scraping com o navegador.
+        # Com TREND_LOCALES, a fonte do navegador lê vários locales em abas paralelas numa só sessão.
+        self.locale_views = parse_locale_views(TREND_LOCALES, TWITTER_TRENDS_URL)
+        select_fn = self.select_trends_by_locale if self.locale_views else select_trends_from_twitter
+        self.trend_merger = TrendMerger(build_default_sources(self.get_current_driver, select_fn, trends_breaker))
+
+    def state_file(self, name):
+        """Argumentos de um arquivo de estado: dentro de `state_dir`, se houver; senão, o caminho padrão."""
+        return {'path': os.path.join(self.state_dir, name)} if self.state_dir else {}
+
+    # --- WebDriver do ciclo ---
+    def session_busy(self):
+        """Indica se um ciclo ou lote está em andamento (e usando o navegador)."""
+        return self.session_lock.locked()
+
+    def get_current_driver(self):
+        """
+        Retorna o WebDriver do ciclo atual, inicializando-o apenas quando alguma etapa realmente precisa do navegador.
+        """
+        with self.driver_lock:
+            if self.current_driver is None:
+                logger.info("Inicializando o WebDriver sob demanda...")
+                self.current_driver = init_driver(PROFILE_PATH)
+                resource_watchdog.track_driver(self.current_driver, "ciclo")
+                logger.info("✓ WebDriver inicializado com sucesso")
+            return self.current_driver
+
+    def close_current_driver(self, sample_stats=True):
+        """
+        Fecha o WebDriver do ciclo, registrando o uso de recursos e encerrando processos que sobrarem.
+        """
+        with self.driver_lock:
+            if self.current_driver is None: return
+            driver, self.current_driver = self.current_driver, None
+        if sample_stats:
+            self.stats.add_resource_sample(resource_watchdog.sample_driver(driver))
+        try:
+            release_driver(driver)
+            logger.info("✓ WebDriver fechado")
+        except Exception as e:
+            logger.warning(f"Erro ao fechar WebDriver: {e}")
+
+    def recycle_driver_if_needed(self):
+        """
+        Recicla o navegador do ciclo se ele passou do limite de memória; o próximo uso abre um novo.
+        Conectado ao browser-host, fecha só a aba deste bot: o navegador é compartilhado, e reciclá-lo
+        (quando nenhum bot estiver conectado) fica a cargo do browser_host.py.
+        """
+        driver = self.current_driver
+        if driver is None: return
+        sample = resource_watchdog.sample_driver(driver)
+        if not resource_watchdog.should_recycle(sample): return
+        logger.warning(f"Navegador usando {sample['rss_mb']} MB (limite {resource_watchdog.max_rss_mb} MB); reciclando...")
+        self.stats.add_resource_sample(sample)
+        self.close_current_driver(sample_stats=False)
+
+    def select_trends_by_locale(self, driver):
+        """
+        Fonte de trends multi-locale: guarda as listas por locale e entrega ao ciclo a junção intercalada delas.
+        """
+        by_locale = stage_runner.run('trends', lambda: harvest_trends(driver, self.locale_views), TRENDS_RETRY_POLICY,
+                                     recover=lambda error: recover_page(driver))
+        if by_locale:
+            self.latest_trends_by_locale = by_locale
+        return interleave(by_locale)
+
+    # --- Backlog ---
+    def start_backlog_producer(self):
+        if self.backlog_producer and self.backlog_producer.is_alive(): return
+        self.backlog_producer = BacklogProducer(
+            self.tweet_backlog, self.generate_for_backlog,
+            lambda: self.fresh_trends(self.latest_trends or self.backup_trends(),
+                                      self.recently_used_trends() | self.trend_selector.blocked_trends()),
+            self.cycle_idle_event, accept_fn=self.accept_generated
+        )
+        self.backlog_producer.start()
+
+    def generate_for_backlog(self, trend):
+        try:
+            return generate_tweet_text(trend)
+        except ContentBlocked as e:
+            self.trend_selector.record_failure(trend, str(e))
+            return None
+
+    def stop_backlog_producer(self):
+        if self.backlog_producer: self.backlog_producer.stop(); self.backlog_producer = None
+
+    # --- Trends de reserva e duplicados ---
+    def backup_trends(self):
+        """
+        Pool de reserva aprendido: as trends com mais sucessos recentes, completadas pela lista fixa.
+        """
+        return self.trend_selector.fallback_pool(get_backup_trends())
+
+    def recently_used_trends(self):
+        """
+        Trends (em minúsculas) postadas dentro do período de descanso, nesta execução ou em anteriores.
+        """
+        window = float(config_store.get('trend_cooldown_hours', TREND_COOLDOWN_HOURS)) * 3600
+        return self.stats.recent_trends(window) | self.content_index.recent_trends(window)
+
+    def fresh_trends(self, trends, recent=None):
+        """Trends que não estão no período de descanso, na ordem dada."""
+        recent = self.recently_used_trends() if recent is None else recent
+        return [t for t in trends if t.casefold() not in recent]
+
+    def accept_generated(self, trend, text):
+        """
+        Registra um texto recém-gerado no índice. Retorna False (e o texto deve ser descartado) se ele
+        for parecido com um já gerado ou postado.
+        """
+        match = self.content_index.claim(text, trend)
+        if match:
+            entry, similarity = match
+            logger.warning(f"Texto gerado para '{trend}' descartado: {similarity:.0%} parecido com um "
+                           f"{'postado' if entry['kind'] == 'posted' else 'já gerado'} para '{entry.get('trend')}'")
+            self.trend_selector.record_failure(trend, f"texto gerado {similarity:.0%} parecido com um anterior")
+            return False
+        return True
+
+    def pop_unique_backlog(self, trends, exclude):
+        """
+        Retira do backlog o primeiro tweet que não seja parecido com um já postado (os parecidos são descartados).
+        """
+        while True:
+            entry = self.tweet_backlog.pop(preferred_trends=trends, exclude=exclude)
+            if not entry:
+                return None
+            match = self.content_index.find_similar(entry[1], kinds=('posted',))
+            if not match:
+                return entry
+            self.content_index.count_duplicate()
+            logger.warning(f"Tweet do backlog para '{entry[0]}' descartado: {match[1]:.0%} parecido com um já postado")
+
+    def choose_content(self, trends):
+        """
+        Escolhe (trend, texto) para o ciclo: um tweet do backlog ou um gerado na hora, evitando trends
+        em descanso ou bloqueadas e textos parecidos com anteriores. Uma falha do Gemini retorna (trend, None).
+        """
+        recent = self.recently_used_trends()
+        fresh = self.fresh_trends(trends, recent)
+        if len(fresh) < len(trends):
+            logger.info(f"{len(trends) - len(fresh)} trends ignoradas (postadas nas últimas "
+                        f"{config_store.get('trend_cooldown_hours', TREND_COOLDOWN_HOURS)}h)")
+        if not fresh:
+            logger.warning("Todas as trends estão em descanso; usando a lista completa")
+            fresh, recent = list(trends), set()
+        
+        backlog_entry = self.pop_unique_backlog(fresh, recent | self.trend_selector.blocked_trends())
+        if backlog_entry:
+            logger.info(f"✓ Tweet pré-gerado retirado do backlog para a trend '{backlog_entry[0]}' (restam {self.tweet_backlog.size()})")
+            return backlog_entry
+        
+        # Sorteia trends pelo histórico de resultados e gera o conteúdo na hora; só tenta outra se o
+        # Gemini recusar a trend ou o texto sair duplicado
+        for trend in self.trend_selector.pick(fresh, GENERATION_ATTEMPTS):
+            logger.info(f"✓ Trend selecionada: '{trend}' (de {len(fresh)} disponíveis, peso {self.trend_selector.weight(trend):.2f})")
+            try:
+                tweet_text = generate_tweet_text(trend)
+            except ContentBlocked as e:
+                self.trend_selector.record_failure(trend, str(e))
+                continue
+            if not tweet_text:
+                return trend, None
+            if self.accept_generated(trend, tweet_text):
+                return trend, tweet_text
+        raise Exception(f"Nenhum texto utilizável para {GENERATION_ATTEMPTS} trends (recusados pelo Gemini ou parecidos com tweets anteriores)")
+
+    def check_circuit_breakers(self, content_ready=False):
+        """
+        Antes de abrir o navegador, verifica se o ciclo pode terminar com os circuitos atuais.
+        Levanta CircuitOpenError quando uma dependência indispensável está fora do ar.
+        """
+        if not self.tweet_poster.is_available():
+            raise CircuitOpenError(compose_breaker)
+        if not content_ready and not gemini_breaker.available() and self.tweet_backlog.size() == 0:
+            raise CircuitOpenError(gemini_breaker)
+
+    # --- Diário e retomada ---
+    def recover_cycles(self):
+        """
+        Trata os ciclos que o diário mostra como interrompidos (o processo dono caiu no meio; os de processos
+        ainda vivos usando o mesmo diário são deixados em paz):
+
+        - post confirmado ou com envio iniciado e sem resposta: registrado como postado e nunca repetido
+          (sem confirmação não dá para saber se foi publicado, e postar de novo seria um duplicado);
+        - texto pronto e não enviado: o ciclo interrompido mais recente é retomado no próximo ciclo, direto
+          na postagem; os de ciclos mais antigos e de lotes voltam para o backlog (textos enviados pela API
+          de controle não, para não serem postados fora do lote pedido);
+        - trends recentes sem texto: reaproveitadas pelo ciclo retomado, sem nova coleta.
+        """
+        pending = self.journal.orphaned()
+        now = time.time()
+        for state in pending:
+            cycle_id = state['cycle_id']
+            latest_cycle = state is pending[-1] and state['kind'] == 'cycle'
+            resumable = None
+            for entry in state['items'].values():
+                if entry['state'] in ('posted', 'submitted'):
+                    self.content_index.mark_posted(entry['text'], entry['trend'])
+                    if entry['state'] == 'submitted':
+                        logger.warning(f"Ciclo {cycle_id} interrompido durante o envio do post para '{entry['trend']}': "
+                                       "sem confirmação, o post é tratado como publicado e não será repetido")
+                elif entry['state'] == 'content' and entry['source'] != 'api' and now - entry['content_at'] < BACKLOG_MAX_AGE_SECONDS:
+                    if latest_cycle:
+                        resumable = entry
+                    else:
+                        self.tweet_backlog.push(entry['trend'], entry['text'])
+                        logger.info(f"Ciclo {cycle_id} interrompido: texto para '{entry['trend']}' devolvido ao backlog")
+            fresh_trends = state['trends'] if state['trends_at'] and now - state['trends_at'] < RESUME_TRENDS_MAX_AGE_SECONDS else None
+            if latest_cycle and (resumable or fresh_trends):
+                self.resume_state = {'cycle_id': cycle_id, 'trends': fresh_trends,
+                                     'trend': resumable and resumable['trend'], 'text': resumable and resumable['text']}
+                logger.info(f"Ciclo {cycle_id} interrompido será retomado a partir "
+                            f"{'da postagem' if resumable else 'da escolha do conteúdo'}")
+                continue
+            self.journal.record(cycle_id, 'end', success=None, recovered=True)
+
+    # --- Ciclo ---
+    def cycle_deadline_seconds(self):
+        """
+        Orçamento do ciclo: o configurado, limitado ao intervalo menos CYCLE_INTERVAL_MARGIN_SECONDS, para que o
+        ciclo (com o fechamento do navegador) termine antes do próximo horário agendado.
+        """
+        configured = config_store.get('cycle_deadline_seconds', CYCLE_DEADLINE_SECONDS)
+        return min(configured, self.interval * 60 - CYCLE_INTERVAL_MARGIN_SECONDS)
+
+    def _enter_stage(self, deadline, stage):
+        self.current_stage = stage
+        if self.profile_session: self.profile_session.mark(stage)
+        deadline.check(stage)
+
+    def run_cycle(self):
+        """
+        Executa um ciclo completo: trends, conteúdo e postagem, dentro do orçamento de tempo do ciclo.
+        Não começa se outro ciclo ou lote estiver em andamento (ver session_lock).
+
+        Returns:
+            bool: True se o tweet foi postado.
+        """
+        if not self.session_lock.acquire(blocking=False):
+            logger.warning("Ciclo não iniciado: outro ciclo ou lote está usando o navegador")
+            return False
+        try:
+            return self._run_cycle()
+        finally:
+            self.session_lock.release()
+
+    def _run_cycle(self):
+        # Ciclo interrompido por uma queda (ver recover_cycles): retoma da última etapa concluída, com o mesmo id
+        resume, self.resume_state = self.resume_state, None
+        cycle_id = resume['cycle_id'] if resume else uuid.uuid4().hex[:8] # Correlaciona os logs, as estatísticas e o perfil do ciclo
+        logger.info("=" * 50)
+        logger.info(f"{'RETOMANDO CICLO INTERROMPIDO' if resume else 'INICIANDO NOVO CICLO DO BOT'} (id {cycle_id})")
+        logger.info("=" * 50)
+        
+        chosen_trend = None
+        tweet_text = None
+        submitted = False
+        success = False
+        error_details = None
+        self.cycle_idle_event.clear() # Pausa o produtor do backlog durante o ciclo
+        self.journal.record(cycle_id, 'resumed' if resume else 'start', kind='cycle')
+        
+        # Orçamento de tempo do ciclo: todas as esperas, requisições e pausas usam o tempo restante
+        deadline = Deadline(self.cycle_deadline_seconds(), cycle_id=cycle_id)
+        self.profile_session = self.profiler.begin(config_store.get('profile_cycles', PROFILE_CYCLES), lambda: self.current_stage)
+        with deadline:
+            try:
+                # Etapa 1: O WebDriver é inicializado sob demanda (get_current_driver), só se
+                # alguma fonte de trends ou backend de postagem precisar do navegador.
+                self._enter_stage(deadline, "1/5 preparação")
+                logger.info("Etapa 1/5: Preparando o ciclo (WebDriver sob demanda)...")
+                self.check_circuit_breakers(content_ready=bool(resume and resume['text']))
+                
+                # Etapa 2: Seleção de trends (na retomada, as do diário; com o texto pronto, nenhuma)
+                self._enter_stage(deadline, "2/5 trends")
+                if resume and (resume['text'] or resume['trends']):
+                    trends = resume['trends'] or []
+                    logger.info(f"Etapa 2/5: {len(trends)} trends recuperadas do diário (sem nova coleta)")
+                else:
+                    logger.info("Etapa 2/5: Obtendo trends das fontes configuradas...")
+                    trends = self.fetch_trends()
+                    self.journal.record(cycle_id, 'trends', trends=trends)
+                
+                # Etapa 3: Conteúdo - usa um tweet pré-gerado do backlog quando houver
+                self._enter_stage(deadline, "3/5 conteúdo")
+                if resume and resume['text']:
+                    chosen_trend, tweet_text = resume['trend'], resume['text']
+                    logger.info(f"Etapa 3/5: Conteúdo para '{chosen_trend}' recuperado do diário (sem nova geração)")
+                else:
+                    logger.info("Etapa 3/5: Obtendo conteúdo (backlog ou IA Gemini)...")
+                    chosen_trend, tweet_text = self.choose_content(trends)
+                    if tweet_text:
+                        self.journal.record(cycle_id, 'content', trend=chosen_trend, text=tweet_text)
+                
+                if not tweet_text:
+                    raise Exception("Falha ao gerar conteúdo com a IA Gemini")
+                
+                logger.info(f"✓ Conteúdo pronto ({len(tweet_text)} chars): '{tweet_text[:100]}...'")
+                
+                # Etapa 4: Postagem do tweet
+                self._enter_stage(deadline, "4/5 postagem")
+                logger.info("Etapa 4/5: Postando tweet no Twitter...")
+                self.recycle_driver_if_needed()
+                # Gravado antes do envio: se o processo cair agora, o post nunca é repetido
+                self.journal.record(cycle_id, 'submit', trend=chosen_trend)
+                submitted = True
+                try:
+                    success = self.tweet_poster.post(tweet_text)
+                except PostOutcomeUnknown as e:
+                    # O post pode ter saído: fica como postado no índice para nunca ser repetido
+                    self.journal.record(cycle_id, 'post_failed', error=str(e), outcome_unknown=True)
+                    self.content_index.mark_posted(tweet_text, chosen_trend)
+                    raise
+                self.journal.record(cycle_id, 'posted' if success else 'post_failed',
+                                    post_id=self.tweet_poster.last_post_id, error=None if success else self.tweet_poster.last_error)
+                
+                if success:
+                    self.content_index.mark_posted(tweet_text, chosen_trend)
+                    self.trend_selector.record_success(chosen_trend)
+                    logger.info(f"✓ Tweet postado com sucesso! (backend: {self.tweet_poster.last_backend}, "
+                                f"{self.tweet_poster.last_latency:.2f}s, ID: {self.tweet_poster.last_post_id or 'N/A'})")
+                else:
+                    deadline.check() # Se a falha foi por falta de tempo, registra como deadline exceeded
+                    error_details = f"Falha na postagem do tweet: {self.tweet_poster.last_error}"
+                    if self.tweet_poster.last_rejected:
+                        # Só a recusa do conteúdo pesa contra a trend; falhas do navegador, da rede ou do X não
+                        self.trend_selector.record_failure(chosen_trend, error_details)
+                    logger.error(f"✗ {error_details}")
+                
+                # Etapa 5: Finalização
+                self.current_stage = "5/5 finalização"
+                logger.info("Etapa 5/5: Finalizando ciclo...")
+                
+            except CircuitOpenError as e:
+                # Interrupção conhecida: encerra sem abrir o navegador nem salvar screenshots.
+                error_details = str(e)
+                logger.warning(f"✗ Ciclo pulado: {error_details}")
+            
+            except DeadlineExceeded as e:
+                error_details = str(e)
+                logger.error(f"✗ Ciclo abortado: orçamento de {deadline.seconds}s esgotado na etapa {e.stage}")
+            
+            except Exception as e:
+                error_details = str(DeadlineExceeded(deadline.stage)) if deadline.expired else str(e)
+                logger.error(f"✗ Erro geral na tarefa: {error_details}", exc_info=True)
+                
+                # Tenta obter informações adicionais do driver se ainda estiver ativo
+                if self.current_driver:
+                    try:
+                        current_url = self.current_driver.current_url
+                        logger.error(f"URL atual quando ocorreu o erro: {current_url}")
+                    except:
+                        pass
+            
+            finally:
+                self.current_stage = "5/5 finalização"
+                if tweet_text and not submitted:
+                    # Texto pronto que não chegou a ser enviado (prazo, circuito aberto): volta ao backlog em vez de se perder
+                    self.tweet_backlog.push(chosen_trend, tweet_text)
+                self.journal.record(cycle_id, 'end', success=success)
+                self.release_cycle_resources()
+                
+                # Sempre registra a tentativa nas estatísticas (com o perfil do ciclo, se houver)
+                profile_path = self.profiler.finish(self.profile_session, success)
+                self.profile_session = None
+                self.stats.add_tweet_attempt(success, chosen_trend, error=error_details, profile=profile_path, cycle_id=cycle_id)
+                self.current_stage = None
+                
+                # Log de finalização
+                logger.info("=" * 50)
+                if success:
+                    logger.info(f"CICLO CONCLUÍDO COM SUCESSO - Trend: {chosen_trend}")
+                else:
+                    logger.error(f"CICLO FALHOU - Trend: {chosen_trend}, Erro: {error_details}")
+                logger.info("=" * 50)
+                
+                self.notify_listeners()
+        return success
+
+    def fetch_trends(self):
+        """
+        Obtém as trends das fontes configuradas (ou as de backup) e atualiza o backlog com as trends ativas.
+        """
+        trends = self.trend_merger.fetch()
+        
+        if trends:
+            self.latest_trends = trends
+            self.tweet_backlog.mark_active(trends)
+        else:
+            logger.warning("Nenhuma trend obtida do Twitter, usando trends de backup...")
+            trends = self.backup_trends()
+            logger.info(f"Usando {len(trends)} trends de backup")
+        
+        if not trends:
+            raise Exception("Não foi possível obter nenhuma trend (nem do Twitter nem de backup)")
+        return trends
+
+    def release_cycle_resources(self):
+        """
+        Fim de ciclo (ou lote): libera o produtor do backlog, fecha o driver e limpa processos órfãos e screenshots antigos.
+        """
+        self.cycle_idle_event.set() # Libera o produtor do backlog
+        self.close_current_driver()
+        resource_watchdog.reap_orphans()
+        prune_screenshots()
+
+    def notify_listeners(self):
+        """Avisa a interface (ou quem mais estiver ouvindo) que um ciclo terminou."""
+        for listener in list(self.listeners):
+            try: listener()
+            except Exception as e: logger.debug(f"Erro em listener do ciclo: {e}")
+
+    # --- Lote ---
+    def prepare_batch_items(self, trends, size):
+        """
+        Monta até `size` itens (trend, texto): primeiro do backlog, depois gerando com o Gemini para trends
+        distintas, fora do período de descanso e sem textos parecidos com anteriores.
+        """
+        items = []
+        used = self.recently_used_trends()
+        blocked = self.trend_selector.blocked_trends()
+        while len(items) < size:
+            entry = self.pop_unique_backlog(trends, used | blocked)
+            if not entry: break
+            items.append(entry)
+            used.add(entry[0].casefold())
+        # Todas as trends utilizáveis, em ordem sorteada pelo histórico de resultados
+        candidates = self.trend_selector.pick(trends, len(trends), exclude=used)
+        for trend in candidates:
+            if len(items) >= size: break
+            if trend.casefold() in used: continue
+            try:
+                text = generate_tweet_text(trend)
+            except ContentBlocked as e:
+                self.trend_selector.record_failure(trend, str(e))
+                continue
+            except CircuitOpenError as e:
+                logger.warning(f"Lote: geração interrompida ({e})")
+                break
+            if not text: logger.warning(f"Lote: falha ao gerar conteúdo para '{trend}'")
+            elif self.accept_generated(trend, text): items.append((trend, text))
+        return items
+
+    def run_batch(self, items=None, size=None, spacing=None):
+        """
+        Posta vários tweets numa única sessão do navegador: trends, navegador e login são preparados uma
+        vez só para o lote inteiro. Falhas de um item não interrompem os demais.
+
+        Args:
+            items (list): [(trend, texto)] já prontos; se None, monta `size` itens a partir das trends atuais.
+            size (int): Quantidade de posts quando `items` não é informado (padrão: BATCH_SIZE).
+            spacing (float): Segundos entre os posts (padrão: BATCH_SPACING_SECONDS).
+
+        Returns:
+            list: Um resultado por item: {'trend', 'success', 'post_id', 'backend', 'latency', 'error'};
+                  vazia se outro ciclo ou lote estiver em andamento (ver session_lock).
+        """
+        if not self.session_lock.acquire(blocking=False):
+            logger.warning("Lote não iniciado: outro ciclo ou lote está usando o navegador")
+            return []
+        try:
+            return self._run_batch(items, size, spacing)
+        finally:
+            self.session_lock.release()
+
+    def _run_batch(self, items, size, spacing):
+        size = size or config_store.get('batch_size', BATCH_SIZE)
+        spacing = config_store.get('batch_spacing_seconds', BATCH_SPACING_SECONDS) if spacing is None else spacing
+        item_seconds = config_store.get('batch_item_deadline_seconds', BATCH_ITEM_DEADLINE_SECONDS)
+        expected = len(items) if items else size
+        cycle_id = uuid.uuid4().hex[:8]
+        logger.info("=" * 50)
+        logger.info(f"INICIANDO LOTE DE {expected} POSTS (id {cycle_id}, intervalo de {spacing:.0f}s)")
+        logger.info("=" * 50)
+        
+        results = []
+        generated = items is None # Itens montados aqui (e não enviados pela API) voltam ao backlog se sobrarem
+        started = time.monotonic()
+        self.cycle_idle_event.clear()
+        self.journal.record(cycle_id, 'start', kind='batch')
+        # Orçamento do lote: o de um ciclo para a preparação, mais o de cada post e as pausas entre eles
+        deadline = Deadline(config_store.get('cycle_deadline_seconds', CYCLE_DEADLINE_SECONDS)
+                            + expected * (item_seconds + spacing), cycle_id=cycle_id)
+        with deadline:
+            try:
+                self._enter_stage(deadline, "lote: preparação")
+                self.check_circuit_breakers()
+                if items is None:
+                    self._enter_stage(deadline, "lote: trends")
+                    trends = self.fetch_trends()
+                    self.journal.record(cycle_id, 'trends', trends=trends)
+                    self._enter_stage(deadline, "lote: conteúdo")
+                    items = self.prepare_batch_items(trends, size)
+                    logger.info(f"Lote: {len(items)} itens prontos")
+                for index, (trend, text) in enumerate(items, 1):
+                    self.journal.record(cycle_id, 'content', item=index, trend=trend, text=text,
+                                        source='batch' if generated else 'api')
+                
+                for index, (trend, text) in enumerate(items, 1):
+                    self._enter_stage(deadline, f"lote: post {index}/{len(items)}")
+                    result = {'trend': trend, 'success': False, 'post_id': None, 'backend': None, 'latency': None, 'error': None}
+                    try:
+                        if not self.tweet_poster.is_available():
+                            raise CircuitOpenError(compose_breaker)
+                        match = self.content_index.find_similar(text, kinds=('posted',))
+                        if match:
+                            self.content_index.count_duplicate()
+                            raise Exception(f"Texto {match[1]:.0%} parecido com um já postado; não postado")
+                        self.recycle_driver_if_needed()
+                        # Cada post tem o próprio prazo, dentro do que resta do lote
+                        with Deadline(min(item_seconds, deadline.remaining()), cycle_id=cycle_id) as item_deadline:
+                            item_deadline.check(deadline.stage)
+                            self.journal.record(cycle_id, 'submit', item=index, trend=trend)
+                            try:
+                                result['success'] = bool(self.tweet_poster.post(text))
+                            except PostOutcomeUnknown as e:
+                                # O post pode ter saído: fica como postado no índice para nunca ser repetido
+                                self.journal.record(cycle_id, 'post_failed', item=index, error=str(e), outcome_unknown=True)
+                                self.content_index.mark_posted(text, trend)
+                                raise
+                        self.journal.record(cycle_id, 'posted' if result['success'] else 'post_failed', item=index,
+                                            post_id=self.tweet_poster.last_post_id)
+                        result.update(backend=self.tweet_poster.last_backend, latency=self.tweet_poster.last_latency,
+                                      post_id=self.tweet_poster.last_post_id)
+                        if result['success']:
+                            self.content_index.mark_posted(text, trend)
+                            self.trend_selector.record_success(trend)
+                        else:
+                            result['error'] = f"Falha na postagem do tweet: {self.tweet_poster.last_error}"
+                            if self.tweet_poster.last_rejected:
+                                self.trend_selector.record_failure(trend, result['error'])
+                    except DeadlineExceeded as e:
+                        result['error'] = str(e)
+                        if deadline.expired: raise
+                    except Exception as e:
+                        result['error'] = str(e)
+                    results.append(result)
+                    self.stats.add_tweet_attempt(result['success'], trend, error=result['error'], cycle_id=cycle_id)
+                    logger.info(f"Lote {index}/{len(items)}: {'✓' if result['success'] else '✗'} '{trend}'"
+                                + (f" ({result['error']})" if result['error'] else ""))
+                    if index < len(items):
+                        deadline_sleep(spacing)
+            
+            except CircuitOpenError as e:
+                logger.warning(f"✗ Lote pulado: {e}")
+            except DeadlineExceeded as e:
+                logger.error(f"✗ Lote abortado: orçamento de {deadline.seconds:.0f}s esgotado na etapa {e.stage}")
+            except Exception as e:
+                logger.error(f"✗ Erro geral no lote: {e}", exc_info=True)
+            finally:
+                self.current_stage = "lote: finalização"
+                if generated and items:
+                    # Itens prontos que o lote não chegou a tentar (prazo, circuito aberto) voltam ao backlog
+                    for trend, text in items[len(results):]:
+                        self.tweet_backlog.push(trend, text)
+                self.journal.record(cycle_id, 'end', success=any(r['success'] for r in results))
+                self.release_cycle_resources()
+                self.current_stage = None
+                
+                posted = sum(1 for r in results if r['success'])
+                elapsed = time.monotonic() - started
+                logger.info("=" * 50)
+                logger.info(f"LOTE CONCLUÍDO: {posted}/{len(items or [])} posts em {elapsed:.0f}s"
+                            + (f" ({(elapsed - spacing * max(0, len(results) - 1)) / len(results):.1f}s por post sem as pausas)" if results else ""))
+                logger.info("=" * 50)
+                self.notify_listeners()
+        return results
+
+    # --- Agendamento ---
+    def launch_cycle(self):
+        """
+        Lança a tarefa em uma thread e recalcula o próximo horário de execução. Se um ciclo ou lote ainda estiver
+        em andamento, este horário é pulado (não se acumulam ciclos) e o próximo fica um intervalo à frente.
+
+        Returns:
+            bool: True se um ciclo foi lançado.
+        """
+        launched = not self.session_busy()
+        if launched:
+            # Lança a tarefa principal em segundo plano
+            threading.Thread(target=self.run_cycle, daemon=True).start()
+        else:
+            logger.warning("Um ciclo ou lote ainda está em andamento; esta execução foi pulada")
+        
+        # Recalcula e define o próximo horário de execução a partir de AGORA
+        self.next_execution_time = self.clock() + timedelta(minutes=self.interval)
+        logger.info(f"{'Tarefa executada' if launched else 'Execução pulada'}. Próxima execução agendada para: "
+                    f"{self.next_execution_time.strftime('%H:%M:%S')}")
+        return launched
+
+    def scheduler_loop(self):
+        """Nosso próprio agendador, sem a biblioteca 'schedule'."""
+        logger.info(f"Agendador iniciado com intervalo de {self.interval} minutos.")
+        
+        # Primeira execução imediata
+        self.launch_cycle()
+        
+        while not self.stop_event.is_set():
+            # Verifica a cada segundo
+            if self.running_event.is_set() and self.clock() >= self.next_execution_time:
+                logger.info("Horário agendado atingido. Executando tarefa...")
+                self.launch_cycle()
+            
+            self.stop_event.wait(timeout=self.scheduler_tick)
+            
+        logger.info("Agendador finalizado.")
+
+    def set_interval(self, minutes):
+        """
+        Altera o intervalo (mínimo de MIN_INTERVAL_MINUTES), salva no config e recalcula o próximo horário.
+
+        Returns:
+            int: O intervalo efetivamente aplicado.
+        """
+        minutes = max(MIN_INTERVAL_MINUTES, int(minutes))
+        if minutes != self.interval:
+            self._apply_interval(minutes)
+            config_store.update(interval=minutes)
+        return minutes
+
+    def _apply_interval(self, minutes):
+        logger.info(f"Intervalo alterado de {self.interval} para {minutes} minutos.")
+        self.interval = minutes
+        if self.running_event.is_set():
+            self.next_execution_time = self.clock() + timedelta(minutes=minutes)
+            logger.info(f"Próxima execução recalculada para: {self.next_execution_time.strftime('%H:%M:%S')}")
+
+    def on_config_change(self, config, changed):
+        """
+        Assinante do config_store: aplica um novo intervalo ao agendador e descarta os tweets
+        pré-gerados com o prompt antigo.
+        """
+        if 'interval' in changed:
+            try:
+                minutes = max(MIN_INTERVAL_MINUTES, int(config.get('interval') or DEFAULT_INTERVAL_MINUTES))
+            except (TypeError, ValueError):
+                logger.error(f"Intervalo inválido no config: {config.get('interval')!r}")
+            else:
+                if minutes != self.interval: self._apply_interval(minutes)
+        if 'custom_prompt' in changed:
+            removed = self.tweet_backlog.clear()
+            self.content_index.discard_generated()
+            if removed: logger.info(f"Prompt alterado: {removed} tweets pré-gerados descartados do backlog")
+
+    def start(self):
+        if self.running_event.is_set(): return False
+        self.running_event.set(); self.stop_event.clear()
+        self.stats = BotStats(); self.stats.start_time = datetime.now()
+        logger.info(f"Bot iniciado com intervalo de {self.interval} minutos.")
+        self.scheduler_thread = threading.Thread(target=self.scheduler_loop, daemon=True)
+        self.scheduler_thread.start()
+        self.start_backlog_producer()
+        return True
+
+    def stop(self):
+        if not self.running_event.is_set(): return False
+        self.running_event.clear(); self.stop_event.set()
+        self.next_execution_time = None # Limpa o horário
+        self.stop_backlog_producer()
+        return True
+
+    def is_stopped(self):
+        return not (self.scheduler_thread and self.scheduler_thread.is_alive())
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Browser-host: processo supervisor que mantém um Chrome "quente" rodando.
+
+O Chrome é iniciado uma única vez com a porta de depuração remota aberta e o
+perfil do .env já carregado. Os processos do bot (bot_ui.py, bot.py) se
+conectam a ele via `debuggerAddress` em vez de lançar um navegador novo, então
+reinícios do bot levam menos de um segundo. O supervisor verifica a saúde do
+navegador periodicamente e o relança se ele cair ou parar de responder. Se o
+Chrome passar do limite de memória, ele só é reciclado quando nenhum bot
+estiver conectado a ele, para não derrubar o ciclo de outro bot no meio.
+
+Uso:
+    python browser_host.py
+e, no .env dos bots:
+    BROWSER_DEBUGGER_ADDRESS="127.0.0.1:9222"
+"""
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import time
+import urllib.request
+
+from dotenv import load_dotenv
+
+from resource_watchdog import BROWSER_MAX_RSS_MB, process_tree, sample_processes
+
+logger = logging.getLogger(__name__)
+
+BROWSER_HOST_PORT = int(os.getenv("BROWSER_HOST_PORT", "9222"))
+BROWSER_HOST_CHECK_SECONDS = 10  # Intervalo entre verificações de saúde.
+BROWSER_HOST_MAX_FAILURES = 3    # Verificações seguidas sem resposta antes de relançar.
+
+# Mesmas opções usadas por init_driver quando o bot lança o próprio navegador.
+CHROME_ARGUMENTS = [
+    "--lang=pt-BR",
+    "--start-maximized",
+    "--disable-notifications",
+    "--disable-gpu",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--no-first-run",
+    "--no-default-browser-check",
+]
+
+_CHROME_CANDIDATES = [
+    "google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome",
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+
+def find_chrome_binary():
+    """
+    Localiza o executável do Chrome (variável CHROME_BINARY tem prioridade).
+    """
+    configured = os.getenv("CHROME_BINARY")
+    if configured:
+        return configured
+    for candidate in _CHROME_CANDIDATES:
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if path:
+            return path
+    return None
+
+
+def get_browser_version(address, timeout=2):
+    """
+    Consulta o endpoint /json/version do navegador.
+
+    Returns:
+        dict or None: As informações do navegador, ou None se ele não responder.
+    """
+    try:
+        with urllib.request.urlopen(f"http://{address}/json/version", timeout=timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except Exception:
+        return None
+
+
+def is_browser_alive(address, timeout=2):
+    return get_browser_version(address, timeout) is not None
+
+
+def attached_sessions(address, timeout=5):
+    """
+    Conta as abas com um cliente DevTools conectado (ex.: o chromedriver de um bot), via Target.getTargets.
+
+    Returns:
+        int or None: O número de abas conectadas, ou None se não foi possível consultar o navegador.
+    """
+    version = get_browser_version(address, timeout)
+    if not version or not version.get("webSocketDebuggerUrl"):
+        return None
+    try:
+        import websocket # websocket-client, dependência do Selenium
+        # Sem o cabeçalho Origin, que o Chrome recusa sem --remote-allow-origins.
+        ws = websocket.create_connection(version["webSocketDebuggerUrl"], timeout=timeout, suppress_origin=True)
+        try:
+            ws.send(json.dumps({"id": 1, "method": "Target.getTargets"}))
+            while True:
+                reply = json.loads(ws.recv())
+                if reply.get("id") == 1:
+                    break
+        finally:
+            ws.close()
+    except Exception as e:
+        logger.warning(f"Não foi possível listar as sessões conectadas ao navegador: {e}")
+        return None
+    targets = reply.get("result", {}).get("targetInfos", [])
+    return sum(1 for t in targets if t.get("type") == "page" and t.get("attached"))
+
+
+class BrowserHost:
+    """
+    Mantém um processo do Chrome com depuração remota ativo, relançando-o quando necessário.
+
+    Args:
+        profile_path (str): Diretório de perfil do Chrome (None para um perfil temporário do Chrome).
+        port (int): Porta de depuração remota.
+        chrome_binary (str): Caminho do executável do Chrome.
+        max_rss_mb (int): Memória (RSS da árvore do Chrome) a partir da qual o navegador é reciclado.
+    """
+    def __init__(self, profile_path=None, port=BROWSER_HOST_PORT, chrome_binary=None, max_rss_mb=BROWSER_MAX_RSS_MB):
+        self.profile_path = profile_path
+        self.max_rss_mb = max_rss_mb
+        self.port = port
+        self.address = f"127.0.0.1:{port}"
+        self.chrome_binary = chrome_binary or find_chrome_binary()
+        self.process = None
+        self._cpu_cache = {} # Processos do Chrome entre amostras (ver process_tree)
+        self.launches = 0
+
+    def launch(self, startup_timeout=30):
+        if not self.chrome_binary:
+            raise RuntimeError("Executável do Chrome não encontrado. Defina CHROME_BINARY no .env.")
+        args = [self.chrome_binary, f"--remote-debugging-port={self.port}",
+                "--remote-debugging-address=127.0.0.1"] + CHROME_ARGUMENTS
+        if self.profile_path:
+            args.append(f"--user-data-dir={self.profile_path}")
+        logger.info(f"Lançando o Chrome do browser-host na porta {self.port}...")
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.launches += 1
+        deadline = time.monotonic() + startup_timeout
+        while time.monotonic() < deadline:
+            if is_browser_alive(self.address):
+                logger.info(f"✓ Chrome pronto em {self.address} (PID {self.process.pid}, lançamento nº {self.launches})")
+                return True
+            if self.process.poll() is not None:
+                break
+            time.sleep(0.5)
+        logger.error("O Chrome do browser-host não respondeu a tempo")
+        return False
+
+    def shutdown(self):
+        if self.process and self.process.poll() is None:
+            logger.info("Encerrando o Chrome do browser-host...")
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+    def relaunch(self):
+        self.shutdown()
+        return self.launch()
+
+    def run_forever(self, check_interval=BROWSER_HOST_CHECK_SECONDS):
+        """
+        Loop de supervisão: verifica a saúde do navegador e o relança se cair ou travar. Acima do limite de
+        memória, a reciclagem espera até nenhum bot estar conectado.
+        """
+        if is_browser_alive(self.address):
+            logger.info(f"Já existe um navegador respondendo em {self.address}; apenas supervisionando.")
+        else:
+            self.launch()
+        failures = 0
+        recycle_pending = False
+        while True:
+            time.sleep(check_interval)
+            process_died = self.process is not None and self.process.poll() is not None
+            if not process_died and is_browser_alive(self.address):
+                failures = 0
+                if self.process is not None and not recycle_pending:
+                    usage = sample_processes(process_tree(self.process.pid, self._cpu_cache))
+                    if usage['rss_mb'] >= self.max_rss_mb:
+                        logger.warning(f"Chrome usando {usage['rss_mb']} MB em {usage['processes']} processos "
+                                       f"(limite {self.max_rss_mb} MB); reciclando quando nenhum bot estiver conectado")
+                        recycle_pending = True
+                if recycle_pending and self.recycle_if_idle():
+                    recycle_pending = False
+                continue
+            failures += 1
+            logger.warning(f"Navegador sem resposta ({failures}/{BROWSER_HOST_MAX_FAILURES})"
+                           f"{' - processo encerrado' if process_died else ''}")
+            if process_died or failures >= BROWSER_HOST_MAX_FAILURES:
+                self.relaunch()
+                failures = 0
+                recycle_pending = False
+
+    def recycle_if_idle(self):
+        """
+        Relança o navegador se nenhuma aba tiver um bot conectado. Retorna True se reciclou.
+        """
+        sessions = attached_sessions(self.address)
+        if sessions != 0:
+            logger.debug(f"Reciclagem do navegador adiada: {'sessões desconhecidas' if sessions is None else f'{sessions} aba(s) com bot conectado'}")
+            return False
+        logger.info("Nenhum bot conectado; reciclando o navegador")
+        self.relaunch()
+        return True
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    raw_profile_path = os.getenv("CHROME_PROFILE_PATH")
+    host = BrowserHost(os.path.abspath(os.path.expanduser(raw_profile_path)) if raw_profile_path else None)
+    try:
+        host.run_forever()
+    except KeyboardInterrupt:
+        logger.info("Browser-host interrompido pelo usuário (Ctrl+C).")
+    finally:
+        host.shutdown()
+    sys.exit(0)
@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+"""
+Gravação e reprodução de cassetes para medir o desempenho do ciclo offline.
+
+Uma cassete é um arquivo JSON versionado com o que um ciclo real usou:
+- pares requisição/resposta da API Gemini (e da API do X, se usada), com a latência original;
+- snapshots do DOM das páginas do X (trends e composição), já renderizadas;
+- as respostas de rede que o bot lê dessas páginas (JSON das trends, criação do post).
+
+Na gravação, um proxy local fica entre o bot e as APIs, e observadores em
+bot_core/network_trends guardam as páginas e respostas. Na reprodução, o mesmo
+servidor local faz o papel do x.com e das APIs, com os tempos originais (ou
+escalados/zerados), e o ciclo roda de verdade no Chrome contra ele. Assim
+otimizações em select_trends_from_twitter, post_tweet_on_twitter e na geração
+podem ser comparadas de forma reproduzível.
+
+Uso:
+    python cassette.py record cassettes/ciclo.json          # grava um ciclo real (posta de verdade!)
+    python cassette.py replay cassettes/ciclo.json --repeat 5
+    python cassette.py replay cassettes/ciclo.json --speed 0 # sem latência
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import network_trends
+from post_confirmation import CREATE_POST_MARKERS
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+
+# Prefixos do servidor local -> URL real das APIs intermediadas pelo proxy.
+UPSTREAMS = {
+    "gemini": "https://generativelanguage.googleapis.com",
+    "xapi": "https://api.twitter.com",
+}
+# Parâmetros de query que nunca vão para o arquivo.
+SECRET_QUERY_PARAMS = ("key",)
+
+_SCRIPT_TAG = re.compile(r"<script\b[^>]*>.*?</script\s*>", re.IGNORECASE | re.DOTALL)
+_BODY_OPEN = re.compile(r"<body\b[^>]*>", re.IGNORECASE)
+_BODY_CLOSE = re.compile(r"</body\s*>", re.IGNORECASE)
+
+# Na reprodução o conteúdo da página só aparece depois do tempo original de renderização; as respostas
+# de rede gravadas são buscadas com o mesmo atraso e o clique em publicar dispara a requisição de criação.
+_REPLAY_SCRIPT = """<script>
+(function () {
+  var speed = %(speed)s, renderDelay = %(render_delay)s, responses = %(responses)s, postPath = %(post_path)s;
+  setTimeout(function () {
+    var template = document.getElementById('__cassette_body');
+    document.body.appendChild(template.content.cloneNode(true));
+    template.remove();
+  }, renderDelay * 1000 * speed);
+  responses.forEach(function (r) {
+    setTimeout(function () { fetch(r.path, {credentials: 'same-origin'}); }, r.delay * 1000 * speed);
+  });
+  document.addEventListener('input', function () {
+    document.querySelectorAll('[data-testid^="tweetButton"]').forEach(function (b) {
+      b.removeAttribute('disabled'); b.setAttribute('aria-disabled', 'false');
+    });
+  }, true);
+  document.addEventListener('click', function (ev) {
+    if (postPath && ev.target.closest && ev.target.closest('[data-testid^="tweetButton"]')) {
+      fetch(postPath, {method: 'POST', body: '{}', credentials: 'same-origin'});
+    }
+  }, true);
+})();
+</script>"""
+
+
+def _clean_path(url):
+    """
+    Caminho + query da URL, sem esquema/host e sem parâmetros secretos (ex.: a API key do Gemini).
+    """
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in SECRET_QUERY_PARAMS]
+    return parts.path + (f"?{urlencode(query)}" if query else "")
+
+
+class Cassette:
+    """
+    Interações gravadas de um ciclo, na ordem em que aconteceram.
+
+    Tipos de interação:
+        http:     {'upstream', 'method', 'path', 'request', 'status', 'content_type', 'body', 'elapsed'}
+        page:     {'path', 'html', 'elapsed', 'responses': [{'path', 'delay'}]}
+        response: {'method', 'path', 'status', 'body', 'elapsed'}
+    """
+    def __init__(self, interactions=None, recorded_at=None):
+        self.interactions = interactions or []
+        self.recorded_at = recorded_at or datetime.now().isoformat(timespec='seconds')
+        self._cursors = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != CASSETTE_VERSION:
+            raise ValueError(f"Versão de cassete não suportada: {data.get('version')} (esperada {CASSETTE_VERSION})")
+        return cls(data.get('interactions', []), data.get('recorded_at'))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CASSETTE_VERSION, 'recorded_at': self.recorded_at,
+                       'interactions': self.interactions}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+    def add(self, interaction):
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def find(self, kind, path, method=None, upstream=None):
+        """
+        Próxima interação gravada que casa com a requisição. Quando as gravações daquela chave acabam,
+        repete a última (permite reproduzir o ciclo várias vezes).
+        """
+        path = _clean_path(path)
+        with self._lock:
+            matches = [i for i in self.interactions
+                       if i['kind'] == kind and i['path'].split('?')[0] == path.split('?')[0]
+                       and (method is None or i.get('method') == method)
+                       and (upstream is None or i.get('upstream') == upstream)]
+            if not matches:
+                return None
+            exact = [i for i in matches if i['path'] == path]
+            matches = exact or matches
+            key = (kind, method, upstream, path)
+            index = self._cursors.get(key, 0)
+            self._cursors[key] = index + 1
+            return matches[min(index, len(matches) - 1)]
+
+    def first(self, kind, method=None):
+        return next((i for i in self.interactions if i['kind'] == kind
+                     and (method is None or i.get('method') == method)), None)
+
+
+class CassetteRecorder:
+    """
+    Observa um ciclo real e grava as páginas e respostas de rede que o bot usou.
+    """
+    def __init__(self, cassette):
+        self.cassette = cassette
+        self._navigated_at = None
+        self._page_responses = []
+
+    def on_page(self, event, driver, url):
+        if event == 'navigate':
+            self._navigated_at = time.monotonic()
+            self._page_responses = []
+        elif event == 'snapshot' and self._navigated_at is not None:
+            self.cassette.add({
+                'kind': 'page',
+                'path': _clean_path(url).split('?')[0],
+                'html': driver.page_source,
+                'elapsed': round(time.monotonic() - self._navigated_at, 3),
+                'responses': self._page_responses,
+            })
+            logger.info(f"Cassete: snapshot de {url} gravado")
+
+    def on_response(self, url, body, status, elapsed):
+        is_post = any(marker in url for marker in CREATE_POST_MARKERS)
+        path = _clean_path(url)
+        self.cassette.add({'kind': 'response', 'method': 'POST' if is_post else 'GET', 'path': path,
+                           'status': status or 200, 'body': body, 'elapsed': round(elapsed, 3)})
+        if not is_post and self._navigated_at is not None:
+            self._page_responses.append({'path': path, 'delay': round(time.monotonic() - self._navigated_at, 3)})
+        logger.info(f"Cassete: resposta de rede gravada ({path.split('?')[0]})")
+
+    def attach(self, bot_core):
+        bot_core.page_observers.append(self.on_page)
+        network_trends.response_observers.append(self.on_response)
+
+    def detach(self, bot_core):
+        bot_core.page_observers.remove(self.on_page)
+        network_trends.response_observers.remove(self.on_response)
+
+
+class _CassetteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(f"Cassete: {format % args}")
+
+    def do_GET(self):
+        self.server.cassette_server.handle(self, "GET")
+
+    def do_POST(self):
+        self.server.cassette_server.handle(self, "POST")
+
+    def reply(self, status, body, content_type="application/json"):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class CassetteServer:
+    """
+    Servidor local que grava (proxy para as APIs reais) ou reproduz uma cassete.
+
+    Args:
+        cassette (Cassette): A cassete a gravar ou reproduzir.
+        mode (str): 'record' ou 'replay'.
+        speed (float): Fator aplicado às latências gravadas na reprodução (1 = original, 0 = sem espera).
+    """
+    def __init__(self, cassette, mode="replay", speed=1.0, port=0):
+        self.cassette = cassette
+        self.mode = mode
+        self.speed = speed
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), _CassetteHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.cassette_server = self
+        self._session = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="cassette-server", daemon=True).start()
+        logger.info(f"Servidor de cassete ({self.mode}) em {self.base_url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _delay(self, seconds):
+        if self.speed > 0 and seconds:
+            time.sleep(seconds * self.speed)
+
+    def handle(self, handler, method):
+        length = int(handler.headers.get("Content-Length") or 0)
+        request_body = handler.rfile.read(length) if length else b""
+        prefix, _, rest = handler.path.lstrip("/").partition("/")
+        if prefix in UPSTREAMS:
+            if self.mode == "record":
+                return self._forward(handler, method, prefix, "/" + rest, request_body)
+            return self._replay_http(handler, method, prefix, "/" + rest)
+        if self.mode != "replay":
+            return handler.reply(404, '{"error": "somente APIs são intermediadas na gravação"}')
+        return self._replay_browser(handler, method)
+
+    def _forward(self, handler, method, upstream, path, request_body):
+        import requests
+        if self._session is None:
+            self._session = requests.Session()
+        headers = {k: v for k, v in handler.headers.items() if k.lower() not in ("host", "content-length", "connection")}
+        started = time.monotonic()
+        response = self._session.request(method, UPSTREAMS[upstream] + path, data=request_body, headers=headers, timeout=120)
+        elapsed = time.monotonic() - started
+        try:
+            request_payload = json.loads(request_body.decode("utf-8")) if request_body else None
+        except ValueError:
+            request_payload = request_body.decode("utf-8", "replace")
+        content_type = response.headers.get("Content-Type", "application/json")
+        self.cassette.add({'kind': 'http', 'upstream': upstream, 'method': method, 'path': _clean_path(path),
+                           'request': request_payload, 'status': response.status_code,
+                           'content_type': content_type, 'body': response.text, 'elapsed': round(elapsed, 3)})
+        logger.info(f"Cassete: {method} {upstream}{_clean_path(path).split('?')[0]} gravado ({elapsed:.2f}s)")
+        handler.reply(response.status_code, response.content, content_type)
+
+    def _replay_http(self, handler, method, upstream, path):
+        interaction = self.cassette.find('http', path, method=method, upstream=upstream)
+        if interaction is None:
+            return handler.reply(404, '{"error": "interação não gravada"}')
+        self._delay(interaction['elapsed'])
+        handler.reply(interaction['status'], interaction['body'], interaction.get('content_type', 'application/json'))
+
+    def _replay_browser(self, handler, method):
+        if method == "GET":
+            page = self.cassette.find('page', handler.path)
+            if page is not None:
+                return handler.reply(200, self._render_page(page), "text/html; charset=utf-8")
+        response = self.cassette.find('response', handler.path, method=method)
+        if response is None:
+            return handler.reply(404, "", "text/plain")
+        if method == "POST":
+            self._delay(response['elapsed'])
+        handler.reply(response['status'], response['body'])
+
+    def _render_page(self, page):
+        html = _SCRIPT_TAG.sub("", page['html'])
+        post = self.cassette.first('response', method='POST')
+        script = _REPLAY_SCRIPT % {
+            'speed': json.dumps(self.speed),
+            'render_delay': json.dumps(page['elapsed']),
+            'responses': json.dumps(page.get('responses', [])),
+            'post_path': json.dumps(post['path'] if post else None),
+        }
+        body_open, body_close = _BODY_OPEN.search(html), _BODY_CLOSE.search(html)
+        if not body_open or not body_close:
+            return html + script
+        inner = html[body_open.end():body_close.start()]
+        return (html[:body_open.end()] + '<template id="__cassette_body">' + inner + '</template>'
+                + script + html[body_close.start():])
+
+
+def _isolated_controller(bot_core, workdir):
+    """
+    BotController com todo o estado persistente (backlog, índice de conteúdo, histórico de trends, diário de
+    ciclos e registro de seletores) num diretório temporário, para que a gravação/reprodução não consuma tweets
+    pré-gerados, não retome ciclos do bot nem altere o que ele aprendeu. Cada execução começa do zero.
+    """
+    from selector_registry import SelectorRegistry
+    bot_core.selector_registry = SelectorRegistry(path=os.path.join(workdir, "selector_stats.json"))
+    controller = bot_core.BotController(state_dir=workdir)
+    controller.resume_state = None
+    return controller
+
+
+def record(path):
+    cassette = Cassette()
+    server = CassetteServer(cassette, mode="record").start()
+    # As URLs base precisam estar no ambiente antes de importar o núcleo.
+    os.environ["GEMINI_API_BASE_URL"] = f"{server.base_url}/gemini"
+    os.environ["X_API_BASE_URL"] = f"{server.base_url}/xapi"
+    import bot_core
+    if bot_core.check_configuration():
+        return 1
+    recorder = CassetteRecorder(cassette)
+    recorder.attach(bot_core)
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            success = _isolated_controller(bot_core, workdir).run_cycle()
+    finally:
+        recorder.detach(bot_core)
+        server.stop()
+    cassette.save(path)
+    logger.info(f"Cassete salva em {path} ({len(cassette.interactions)} interações, ciclo {'ok' if success else 'com falha'})")
+    return 0 if success else 1
+
+
+def _timed(name, fn, timings):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            timings.setdefault(name, []).append(time.perf_counter() - started)
+    return wrapper
+
+
+def replay(path, speed=1.0, repeat=1):
+    cassette = Cassette.load(path)
+    server = CassetteServer(cassette, mode="replay", speed=speed).start()
+    os.environ["TWITTER_BASE_URL"] = server.base_url
+    os.environ["GEMINI_API_BASE_URL"] = f"{server.base_url}/gemini"
+    os.environ["X_API_BASE_URL"] = f"{server.base_url}/xapi"
+    import bot_core
+    if bot_core.check_configuration():
+        return 1
+    timings = {}
+    for name in ("select_trends_from_twitter", "get_tweet_content_from_gemini", "post_tweet_on_twitter"):
+        setattr(bot_core, name, _timed(name, getattr(bot_core, name), timings))
+    failures = 0
+    try:
+        for run in range(repeat):
+            with tempfile.TemporaryDirectory() as workdir:
+                controller = _isolated_controller(bot_core, workdir)
+                started = time.perf_counter()
+                ok = controller.run_cycle()
+                timings.setdefault("ciclo", []).append(time.perf_counter() - started)
+                failures += 0 if ok else 1
+    finally:
+        server.stop()
+    print(f"\nReprodução de {path} (gravada em {cassette.recorded_at}), velocidade {speed}, {repeat} execução(ões):")
+    for name, values in timings.items():
+        print(f"  {name:32s} mín {min(values):7.3f}s  mediana {statistics.median(values):7.3f}s  máx {max(values):7.3f}s  (n={len(values)})")
+    print(f"  falhas: {failures}")
+    return 0 if failures == 0 else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grava ou reproduz cassetes de um ciclo do bot.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="grava um ciclo real (a postagem é real!)")
+    rec.add_argument("path")
+    rep = sub.add_parser("replay", help="reproduz a cassete localmente e mede os tempos")
+    rep.add_argument("path")
+    rep.add_argument("--speed", type=float, default=1.0, help="fator das latências gravadas (0 = sem espera)")
+    rep.add_argument("--repeat", type=int, default=1, help="quantidade de ciclos a reproduzir")
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        return record(args.path)
+    return replay(args.path, speed=args.speed, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Circuit breakers das dependências externas do bot.
+
+Cada dependência (página de trends, fluxo de postagem no navegador, API
+Gemini) tem um breaker. Depois de algumas falhas seguidas ele "abre" e o
+ciclo desiste antes de abrir o Chrome ou gastar cota; passado o intervalo de
+prova, fica "meio aberto" e deixa passar uma única chamada de teste: se ela
+funcionar o breaker fecha, se falhar volta a abrir por mais um intervalo.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from deadline import DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))  # Falhas seguidas até abrir.
+CIRCUIT_PROBE_SECONDS = int(os.getenv("CIRCUIT_PROBE_SECONDS", "900"))        # Tempo aberto antes de testar de novo.
+
+CLOSED = "fechado"
+OPEN = "aberto"
+HALF_OPEN = "meio-aberto"
+
+
+class CircuitOpenError(Exception):
+    """A dependência está com o circuito aberto; a chamada nem foi tentada."""
+    def __init__(self, breaker):
+        self.breaker = breaker
+        super().__init__(f"circuito '{breaker.name}' aberto (nova tentativa em {breaker.retry_in():.0f}s; "
+                         f"última falha: {breaker.last_error or 'desconhecida'})")
+
+
+class RequestRejected(Exception):
+    """A dependência respondeu, mas recusou esta chamada específica (ex.: prompt bloqueado). Não indica falha da dependência."""
+
+
+class CircuitBreaker:
+    """
+    Breaker com estados fechado/aberto/meio-aberto.
+
+    Args:
+        name (str): Nome da dependência (usado nos logs e na interface).
+        failure_threshold (int): Falhas consecutivas que abrem o circuito.
+        probe_interval (float): Segundos com o circuito aberto antes de permitir uma chamada de teste.
+    """
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, probe_interval=CIRCUIT_PROBE_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state_locked()
+
+    def _state_locked(self):
+        if self.opened_at is None:
+            return CLOSED
+        if time.monotonic() - self.opened_at >= self.probe_interval:
+            return HALF_OPEN
+        return OPEN
+
+    def retry_in(self):
+        with self._lock:
+            if self.opened_at is None:
+                return 0.0
+            return max(0.0, self.probe_interval - (time.monotonic() - self.opened_at))
+
+    def available(self):
+        """
+        Indica se uma chamada poderia ser tentada agora, sem reservar a chamada de teste.
+        """
+        with self._lock:
+            state = self._state_locked()
+            return state == CLOSED or (state == HALF_OPEN and not self._probe_in_flight)
+
+    def allow_request(self):
+        """
+        Reserva uma chamada. No estado meio-aberto apenas uma chamada de teste passa por vez.
+        """
+        with self._lock:
+            state = self._state_locked()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                logger.info(f"Circuito '{self.name}' meio-aberto: tentando uma chamada de teste")
+                return True
+            return False
+
+    def check(self):
+        """
+        Levanta CircuitOpenError se a chamada não puder ser feita agora.
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(self)
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"✓ Circuito '{self.name}' fechado novamente")
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = str(error) if error else self.last_error
+            was_probe = self._probe_in_flight
+            self._probe_in_flight = False
+            if was_probe or (self.opened_at is None and self.consecutive_failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                logger.warning(f"Circuito '{self.name}' aberto após {self.consecutive_failures} falha(s) "
+                               f"seguida(s); nova tentativa em {self.probe_interval}s")
+
+    def release(self):
+        """
+        Libera a chamada reservada sem contar sucesso nem falha (ex.: o ciclo ficou sem tempo).
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Executa `fn` protegida pelo breaker. Resultados vazios/falsos contam como falha.
+        """
+        self.check()
+        try:
+            result = fn(*args, **kwargs)
+        except DeadlineExceeded:
+            # Falta de tempo do ciclo não diz nada sobre a saúde da dependência.
+            self.release()
+            raise
+        except RequestRejected:
+            # A dependência está saudável: quem falhou foi o pedido.
+            self.record_success()
+            raise
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        if result:
+            self.record_success()
+        else:
+            self.record_failure("resultado vazio")
+        return result
+
+    def describe(self):
+        state = self.state
+        if state == OPEN:
+            return f"{self.name}: {state} ({self.retry_in():.0f}s)"
+        return f"{self.name}: {state}"
+
+
+# Um breaker por dependência externa, compartilhado pelo ciclo e pelo produtor do backlog.
+trends_breaker = CircuitBreaker("trends")
+compose_breaker = CircuitBreaker("postagem")
+gemini_breaker = CircuitBreaker("gemini")
+BREAKERS = (trends_breaker, compose_breaker, gemini_breaker)
+
+
+def describe_breakers(breakers=BREAKERS):
+    return " | ".join(b.describe() for b in breakers)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Configuração do bot (bot_config.json) em memória, recarregada só quando o arquivo muda.
+
+Leituras (`get`) devolvem o valor já em memória, sem tocar no disco. Uma thread
+de vigia compara a assinatura do arquivo (mtime, inode e tamanho) a cada
+CONFIG_WATCH_SECONDS e recarrega quando ele é editado por fora (à mão, por outro
+processo). Gravações são atômicas (arquivo temporário + rename), então um
+leitor nunca vê o arquivo pela metade. Assinantes são avisados das chaves que
+mudaram, seja qual for a origem da mudança.
+"""
+
+import copy
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+CONFIG_WATCH_SECONDS = float(os.getenv("CONFIG_WATCH_SECONDS", "2"))
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+
+class ConfigStore:
+    """
+    Configuração em memória com recarga por mudança no arquivo, escrita atômica e assinantes.
+
+    Args:
+        path (str): Caminho do arquivo JSON.
+        defaults (dict): Valores usados para as chaves ausentes no arquivo.
+        watch_interval (float): Segundos entre verificações do arquivo pela thread de vigia.
+    """
+    def __init__(self, path, defaults=None, watch_interval=CONFIG_WATCH_SECONDS):
+        self.path = path
+        self.defaults = dict(defaults or {})
+        self.watch_interval = watch_interval
+        self.subscribers = [] # Funções chamadas com (config, chaves_alteradas)
+        self._lock = threading.RLock()
+        self._config = dict(self.defaults)
+        self._signature = None
+        self._watcher = None
+        self._stop_event = threading.Event()
+        self.reload()
+
+    # --- Leitura ---
+    def get(self, key, default=None):
+        """Valor em memória (sem acesso a disco)."""
+        return self._config.get(key, default)
+
+    def snapshot(self):
+        """Cópia da configuração atual, que pode ser alterada e passada para `replace`."""
+        return copy.deepcopy(self._config)
+
+    def reload(self, force=False):
+        """
+        Relê o arquivo se a assinatura mudou (ou se `force`). Um arquivo inválido mantém a última configuração boa.
+
+        Returns:
+            bool: True se a configuração foi recarregada.
+        """
+        with self._lock:
+            signature = _file_signature(self.path)
+            if not force and signature == self._signature:
+                return False
+            self._signature = signature
+            if signature is None:
+                loaded = {}
+            else:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        loaded = json.load(f)
+                except Exception as e:
+                    logger.error(f"Erro ao carregar config ({self.path}); mantendo a anterior: {e}")
+                    return False
+            self._apply(dict(self.defaults, **loaded))
+            return True
+
+    # --- Escrita ---
+    def update(self, **changes):
+        """Altera algumas chaves e grava o arquivo."""
+        with self._lock:
+            self.replace(dict(self._config, **changes))
+
+    def replace(self, config):
+        """
+        Grava a configuração inteira de forma atômica e avisa os assinantes do que mudou.
+        """
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(config, f, ensure_ascii=False, indent=2)
+                f.flush(); os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._signature = _file_signature(self.path)
+            self._apply(dict(self.defaults, **config))
+
+    def _apply(self, new_config):
+        changed = {k for k in set(self._config) | set(new_config) if self._config.get(k) != new_config.get(k)}
+        self._config = new_config # Troca a referência inteira: leitores sem lock nunca veem um dict pela metade
+        if not changed:
+            return
+        logger.info(f"Configuração alterada: {', '.join(sorted(changed))}")
+        for subscriber in list(self.subscribers):
+            try: subscriber(new_config, changed)
+            except Exception as e: logger.error(f"Erro em assinante da configuração: {e}", exc_info=True)
+
+    # --- Assinantes e vigia ---
+    def subscribe(self, fn):
+        """Registra `fn(config, chaves_alteradas)` e inicia a vigia do arquivo."""
+        self.subscribers.append(fn)
+        self.start_watching()
+
+    def unsubscribe(self, fn):
+        if fn in self.subscribers: self.subscribers.remove(fn)
+
+    def start_watching(self):
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=self._watch_loop, name="config-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop_event.set()
+
+    def _watch_loop(self):
+        while not self._stop_event.wait(self.watch_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                logger.debug(f"Erro ao verificar a configuração: {e}")
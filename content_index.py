@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+Índice persistente de similaridade dos textos gerados e postados.
+
+Cada texto é normalizado (minúsculas, sem acentos nem links), dividido em
+shingles de caracteres e resumido numa assinatura MinHash. As assinaturas são
+distribuídas em baldes LSH (faixas da assinatura), então verificar um texto
+novo custa uma assinatura e algumas consultas a dicionário, sem comparar com
+todo o histórico: só os textos que caem num mesmo balde têm a similaridade
+(Jaccard estimada) calculada.
+
+Dois usos no bot:
+    - textos gerados (Gemini, backlog) parecidos com um já gerado ou postado são
+      descartados antes de abrir o navegador;
+    - antes de postar, o texto é comparado com os já postados, que o X
+      rejeitaria como duplicados.
+
+Configuração (.env):
+    DUPLICATE_SIMILARITY          similaridade (0-1) a partir da qual dois textos são duplicados (padrão 0.7)
+    CONTENT_INDEX_MAX_AGE_DAYS    por quanto tempo os textos postados são lembrados (padrão 30)
+    CONTENT_INDEX_MAX_ENTRIES     teto de textos no índice; os mais antigos saem primeiro (padrão 3000)
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import unicodedata
+import zlib
+
+logger = logging.getLogger(__name__)
+
+CONTENT_INDEX_FILE = "content_index.json"
+DUPLICATE_SIMILARITY = float(os.getenv("DUPLICATE_SIMILARITY", "0.7"))
+CONTENT_INDEX_MAX_AGE_DAYS = float(os.getenv("CONTENT_INDEX_MAX_AGE_DAYS", "30"))
+CONTENT_INDEX_MAX_ENTRIES = int(os.getenv("CONTENT_INDEX_MAX_ENTRIES", "3000"))
+GENERATED_MAX_AGE_SECONDS = 6 * 3600 # Textos gerados e nunca postados (mesma validade do backlog)
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 64
+# 16 faixas de 4 valores: textos com similaridade 0.7 caem num mesmo balde com ~99% de chance.
+LSH_BANDS = 16
+_ROWS_PER_BAND = NUM_PERMUTATIONS // LSH_BANDS
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_SIGNATURE_SEED = 1046 # Fixa: as assinaturas salvas em disco precisam continuar comparáveis
+_rng = random.Random(_SIGNATURE_SEED)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+                 for _ in range(NUM_PERMUTATIONS)]
+_PARAMS = f"minhash:{SHINGLE_SIZE}:{NUM_PERMUTATIONS}:{_SIGNATURE_SEED}"
+
+_URL_RE = re.compile(r"https?://\S+")
+_NON_WORD_RE = re.compile(r"[^\w#@]+")
+
+
+def normalize_text(text):
+    """
+    Forma canônica para comparação: sem acentos, links e pontuação, em minúsculas e com espaços únicos.
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    text = _URL_RE.sub(" ", text)
+    return " ".join(_NON_WORD_RE.sub(" ", text).split())
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    text = normalize_text(text)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def minhash_signature(text):
+    """
+    Assinatura MinHash (NUM_PERMUTATIONS valores de 32 bits) dos shingles do texto.
+    """
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles(text)]
+    if not hashes:
+        return [_MAX_HASH] * NUM_PERMUTATIONS
+    return [min([((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes]) for a, b in _PERMUTATIONS]
+
+
+def estimated_similarity(sig_a, sig_b):
+    """Fração de posições iguais nas assinaturas: estimativa da similaridade de Jaccard dos shingles."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERMUTATIONS
+
+
+def _band_keys(signature):
+    return [(band, tuple(signature[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND])) for band in range(LSH_BANDS)]
+
+
+def _encode_signature(signature):
+    return base64.b64encode(b"".join(v.to_bytes(4, "big") for v in signature)).decode("ascii")
+
+
+def _decode_signature(encoded):
+    raw = base64.b64decode(encoded)
+    return [int.from_bytes(raw[i:i + 4], "big") for i in range(0, len(raw), 4)]
+
+
+def _text_id(text):
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()[:16]
+
+
+class ContentIndex:
+    """
+    Índice MinHash/LSH dos textos, persistido em JSON e seguro entre threads.
+
+    Cada entrada guarda o texto, a trend, o tipo ('generated' ou 'posted'), o horário e a assinatura.
+    """
+    def __init__(self, path=CONTENT_INDEX_FILE, threshold=DUPLICATE_SIMILARITY,
+                 max_entries=CONTENT_INDEX_MAX_ENTRIES, max_age_seconds=CONTENT_INDEX_MAX_AGE_DAYS * 86400,
+                 generated_max_age_seconds=GENERATED_MAX_AGE_SECONDS):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.generated_max_age_seconds = generated_max_age_seconds
+        self.duplicates_avoided = 0
+        self._lock = threading.Lock()
+        self._entries = {} # id -> {'text', 'trend', 'kind', 'created_at', 'signature'}
+        self._buckets = {} # (faixa, valores da faixa) -> {ids}
+        self._load()
+
+    # --- Persistência ---
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            same_params = data.get('params') == _PARAMS
+            for entry in data.get('entries', []):
+                # Assinaturas de outra configuração (shingles, permutações) são recalculadas do texto.
+                signature = _decode_signature(entry['signature']) if same_params else minhash_signature(entry['text'])
+                self._insert_locked(_text_id(entry['text']), dict(entry, signature=signature))
+            self._evict_locked(time.time())
+            logger.info(f"Índice de conteúdo carregado: {len(self._entries)} textos")
+        except Exception as e:
+            logger.error(f"Erro ao carregar o índice de conteúdo ({self.path}): {e}")
+            self._entries, self._buckets = {}, {}
+
+    def _save(self):
+        # Escrita atômica: um crash no meio não deixa o arquivo corrompido.
+        tmp_path = f"{self.path}.tmp"
+        entries = [dict(entry, signature=_encode_signature(entry['signature'])) for entry in self._entries.values()]
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'params': _PARAMS, 'entries': entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Erro ao salvar o índice de conteúdo: {e}")
+
+    # --- Estrutura ---
+    def _insert_locked(self, entry_id, entry):
+        self._entries[entry_id] = entry
+        for key in _band_keys(entry['signature']):
+            self._buckets.setdefault(key, set()).add(entry_id)
+
+    def _remove_locked(self, entry_id):
+        entry = self._entries.pop(entry_id)
+        for key in _band_keys(entry['signature']):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket: del self._buckets[key]
+
+    def _evict_locked(self, now):
+        removed = 0
+        for entry_id, entry in list(self._entries.items()):
+            max_age = self.max_age_seconds if entry['kind'] == 'posted' else self.generated_max_age_seconds
+            if now - entry['created_at'] > max_age:
+                self._remove_locked(entry_id); removed += 1
+        if len(self._entries) > self.max_entries:
+            oldest = sorted(self._entries, key=lambda i: self._entries[i]['created_at'])
+            for entry_id in oldest[:len(self._entries) - self.max_entries]:
+                self._remove_locked(entry_id); removed += 1
+        return removed
+
+    def _find_locked(self, signature, kinds):
+        best, best_similarity = None, 0.0
+        candidates = set()
+        for key in _band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+        for entry_id in candidates:
+            entry = self._entries[entry_id]
+            if kinds and entry['kind'] not in kinds:
+                continue
+            similarity = estimated_similarity(signature, entry['signature'])
+            if similarity >= self.threshold and similarity > best_similarity:
+                best, best_similarity = entry, similarity
+        if best is None:
+            return None
+        return {k: v for k, v in best.items() if k != 'signature'}, best_similarity
+
+    # --- Consultas e registro ---
+    def find_similar(self, text, kinds=None):
+        """
+        Procura um texto parecido (similaridade >= threshold) entre os dos tipos dados (todos, se None).
+
+        Returns:
+            tuple or None: (entrada, similaridade) do mais parecido, ou None.
+        """
+        signature = minhash_signature(text)
+        with self._lock:
+            return self._find_locked(signature, kinds)
+
+    def claim(self, text, trend=None):
+        """
+        Registra um texto recém-gerado, a menos que já exista um parecido (gerado ou postado).
+
+        Returns:
+            tuple or None: (entrada, similaridade) do parecido (o texto não é registrado), ou None se foi registrado.
+        """
+        signature = minhash_signature(text)
+        now = time.time()
+        with self._lock:
+            self._evict_locked(now)
+            match = self._find_locked(signature, None)
+            if match:
+                self.duplicates_avoided += 1
+                return match
+            self._insert_locked(_text_id(text), {'text': text, 'trend': trend, 'kind': 'generated',
+                                                 'created_at': now, 'signature': signature})
+            self._save()
+        return None
+
+    def mark_posted(self, text, trend=None):
+        """Registra (ou promove) o texto como postado."""
+        entry_id = _text_id(text)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                self._insert_locked(entry_id, {'text': text, 'trend': trend, 'kind': 'posted',
+                                               'created_at': now, 'signature': minhash_signature(text)})
+            else:
+                entry.update(kind='posted', created_at=now, trend=trend or entry.get('trend'))
+            self._evict_locked(now)
+            self._save()
+
+    def count_duplicate(self):
+        """Conta um duplicado evitado fora de `claim` (ex.: texto do backlog parecido com um já postado)."""
+        with self._lock:
+            self.duplicates_avoided += 1
+
+    def discard_generated(self):
+        """
+        Esquece os textos gerados e não postados (ex.: o prompt mudou e o backlog foi descartado).
+        """
+        with self._lock:
+            removed = [i for i, e in self._entries.items() if e['kind'] != 'posted']
+            for entry_id in removed:
+                self._remove_locked(entry_id)
+            if removed: self._save()
+        return len(removed)
+
+    def recent_trends(self, window_seconds):
+        """Trends com texto postado nos últimos `window_seconds` (em minúsculas, para comparar)."""
+        since = time.time() - window_seconds
+        with self._lock:
+            return {e['trend'].casefold() for e in self._entries.values()
+                    if e['kind'] == 'posted' and e.get('trend') and e['created_at'] >= since}
+
+    def summary(self):
+        with self._lock:
+            posted = sum(1 for e in self._entries.values() if e['kind'] == 'posted')
+            return {'entries': len(self._entries), 'posted': posted, 'duplicates_avoided': self.duplicates_avoided}
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+API local de controle e status do bot (HTTP em 127.0.0.1).
+
+Expõe as mesmas ações da interface (iniciar, parar, executar agora, mudar o
+intervalo) e o estado ao vivo do BotController, para que um supervisor
+gerencie vários processos do bot num mesmo host sem uma janela para cada um.
+
+Endpoints (JSON):
+    GET  /status              estatísticas, próxima execução, etapa atual, circuitos, backlog, trends por locale, duplicados evitados, histórico de trends e novas tentativas por etapa
+    POST /start               inicia o agendamento
+    POST /stop                para o agendamento
+    POST /run-once            executa um ciclo agora (reinicia a contagem do intervalo)
+    POST /interval            {"minutes": 60}
+    POST /batch               {"size": 5, "spacing": 30} ou {"items": [{"trend": "...", "text": "..."}]}
+
+Toda requisição precisa do cabeçalho `X-Control-Token`. O token vem de
+CONTROL_API_TOKEN ou, sem ele, é gerado a cada início e gravado (só para o
+dono) em CONTROL_API_TOKEN_FILE. Os POSTs exigem `Content-Type:
+application/json`, e requisições com `Origin` de fora do host são recusadas:
+uma página aberta no navegador não consegue acionar a API.
+"""
+
+import json
+import logging
+import os
+import secrets
+import threading
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from circuit_breaker import BREAKERS
+from stage_runner import stage_runner
+
+logger = logging.getLogger(__name__)
+
+CONTROL_API_HOST = "127.0.0.1"
+CONTROL_API_PORT = int(os.getenv("CONTROL_API_PORT", "0"))  # 0 = API desativada
+CONTROL_API_TOKEN = os.getenv("CONTROL_API_TOKEN")
+CONTROL_API_TOKEN_FILE = os.getenv("CONTROL_API_TOKEN_FILE", "control_api_token") # Token gerado, quando não configurado
+LOCAL_HOSTS = {"127.0.0.1", "localhost", "::1"}
+
+
+def controller_status(controller):
+    """
+    Monta o estado atual do bot num dicionário serializável em JSON.
+    """
+    next_run = controller.next_execution_time
+    return {
+        'running': controller.running_event.is_set(),
+        'interval_minutes': controller.interval,
+        'next_run': next_run.isoformat(timespec='seconds') if next_run else None,
+        'stage': controller.current_stage,
+        'stats': controller.stats.get_summary(),
+        'circuit_breakers': {b.name: {'state': b.state, 'retry_in': round(b.retry_in()), 'last_error': b.last_error}
+                             for b in BREAKERS},
+        'backlog_size': controller.tweet_backlog.size(),
+        'trends_by_locale': controller.latest_trends_by_locale,
+        'content_index': controller.content_index.summary(),
+        'trend_selector': controller.trend_selector.summary(),
+        'stages': stage_runner.summary(),
+    }
+
+
+class _ControlHandler(BaseHTTPRequestHandler):
+    server_version = "BotControl/1.0"
+
+    def log_message(self, format, *args):
+        logger.debug(f"API de controle: {format % args}")
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        origin = self.headers.get("Origin")
+        if origin is not None and urlsplit(origin).hostname not in LOCAL_HOSTS:
+            self._reply(403, {'error': 'origem não permitida'})
+            return False
+        if not secrets.compare_digest(self.headers.get("X-Control-Token") or "", self.server.token):
+            self._reply(401, {'error': 'token inválido'})
+            return False
+        return True
+
+    def _read_json(self):
+        """
+        Corpo da requisição como objeto JSON ({} se vazio). Levanta ValueError (respondido com 400) se o corpo não
+        for JSON válido ou não for um objeto.
+        """
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            data = json.loads(self.rfile.read(length).decode("utf-8"))
+        except ValueError as e:
+            raise ValueError(f"corpo não é JSON válido: {e}") from e
+        if not isinstance(data, dict):
+            raise ValueError("o corpo deve ser um objeto JSON")
+        return data
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path.rstrip("/") == "/status":
+            self._reply(200, controller_status(self.server.controller))
+        else:
+            self._reply(404, {'error': f'rota desconhecida: {self.path}'})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if content_type != "application/json":
+            self._reply(415, {'error': "Content-Type deve ser application/json"})
+            return
+        controller = self.server.controller
+        route = self.path.rstrip("/")
+        try:
+            if route == "/start":
+                changed = controller.start()
+            elif route == "/stop":
+                changed = controller.stop()
+            elif route == "/run-once":
+                if controller.session_busy():
+                    self._reply(409, {'error': 'um ciclo ou lote já está em andamento'})
+                    return
+                logger.info("Executando tarefa a pedido da API de controle...")
+                changed = controller.launch_cycle()
+            elif route == "/batch":
+                payload = self._read_json()
+                items, size, spacing = payload.get("items"), payload.get("size"), payload.get("spacing")
+                if (size is not None and (not isinstance(size, int) or isinstance(size, bool) or size < 1)) or \
+                        (spacing is not None and (not isinstance(spacing, (int, float)) or spacing < 0)):
+                    self._reply(400, {'error': "'size' deve ser inteiro positivo e 'spacing' um número de segundos"})
+                    return
+                if items is not None:
+                    if not isinstance(items, list) or not items or not all(isinstance(i, dict) and i.get("text") for i in items):
+                        self._reply(400, {'error': "campo 'items' deve ser uma lista de {\"trend\", \"text\"}"})
+                        return
+                    items = [(i.get("trend") or "", i["text"]) for i in items]
+                if controller.session_busy():
+                    self._reply(409, {'error': 'um ciclo ou lote já está em andamento'})
+                    return
+                logger.info("Executando lote a pedido da API de controle...")
+                threading.Thread(target=controller.run_batch, daemon=True,
+                                 kwargs={'items': items, 'size': size, 'spacing': spacing}).start()
+                changed = True
+            elif route == "/interval":
+                minutes = self._read_json().get("minutes")
+                if not isinstance(minutes, int) or isinstance(minutes, bool):
+                    self._reply(400, {'error': "campo 'minutes' (inteiro) obrigatório"})
+                    return
+                previous = controller.interval
+                changed = controller.set_interval(minutes) != previous
+            else:
+                self._reply(404, {'error': f'rota desconhecida: {self.path}'})
+                return
+        except ValueError as e:
+            self._reply(400, {'error': str(e)})
+            return
+        self._reply(200, {'ok': True, 'changed': changed, 'status': controller_status(controller)})
+
+
+class ControlServer:
+    """
+    Servidor HTTP local da API de controle, rodando numa thread própria.
+
+    Args:
+        controller (BotController): O controlador do bot.
+        port (int): Porta em 127.0.0.1 (0 escolhe uma porta livre).
+        token (str): Token exigido no cabeçalho X-Control-Token (sem ele, um é gerado; ver ensure_token).
+    """
+    def __init__(self, controller, port=CONTROL_API_PORT, token=CONTROL_API_TOKEN, host=CONTROL_API_HOST):
+        self.httpd = ThreadingHTTPServer((host, port), _ControlHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.controller = controller
+        self.httpd.token = ensure_token(token)
+        self.thread = None
+
+    @property
+    def address(self):
+        host, port = self.httpd.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="control-api", daemon=True)
+        self.thread.start()
+        logger.info(f"API de controle ouvindo em http://{self.address}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def ensure_token(token=None, path=CONTROL_API_TOKEN_FILE):
+    """
+    Retorna o token configurado ou gera um novo e o grava em `path`, legível só pelo dono (escrita atômica).
+    """
+    if token:
+        return token
+    token = secrets.token_urlsafe(32)
+    tmp_path = f"{path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(token + "\n")
+    os.replace(tmp_path, path)
+    logger.info(f"API de controle: CONTROL_API_TOKEN não definido; token gerado em {os.path.abspath(path)}")
+    return token
+
+
+def start_control_server(controller, port=CONTROL_API_PORT):
+    """
+    Inicia a API de controle se uma porta foi configurada; retorna o servidor ou None.
+    """
+    if not port:
+        return None
+    try:
+        return ControlServer(controller, port).start()
+    except OSError as e:
+        logger.error(f"Não foi possível iniciar a API de controle na porta {port}: {e}")
+        return None
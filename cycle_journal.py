@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Diário (write-ahead log) dos ciclos, para retomar o trabalho depois de uma queda.
+
+Cada etapa concluída de um ciclo é gravada no diário antes de o ciclo seguir
+(uma linha JSON por evento, com fsync), então, se o processo cair ou o Chrome
+morrer no meio, o próximo início sabe exatamente até onde o ciclo chegou:
+
+    start       ciclo (ou lote) iniciado
+    trends      trends obtidas
+    content     trend escolhida e texto pronto (do backlog ou do Gemini)
+    submit      envio do post iniciado; a partir daqui o post PODE ter sido publicado
+    posted      post confirmado (com o ID, quando houver)
+    post_failed o backend informou que o post não foi publicado
+    end         ciclo encerrado (com ou sem sucesso)
+
+No lote, os eventos de cada post levam o índice do item. Ciclos sem `end` são
+os interrompidos; `summarize_cycle` resume até onde cada um chegou.
+
+O `start` (e o `resumed`, quando outro processo retoma o ciclo) registra o dono
+do ciclo: PID, horário de início do processo e um token aleatório do processo.
+Vários processos podem usar o mesmo diário (ex.: daemon e interface, ou um
+reinício enquanto o processo antigo ainda termina o ciclo), e só os ciclos
+cujo dono já morreu contam como interrompidos (`orphaned`). No POSIX, as
+escritas e a compactação seguram um flock em <diário>.lock, para que uma
+compactação não descarte eventos gravados por outro processo no meio dela.
+"""
+
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos (o dono de cada ciclo continua registrado)
+    fcntl = None
+
+try:
+    import psutil
+except ImportError:  # Sem psutil, a vida do dono é verificada só pelo PID
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+CYCLE_JOURNAL_FILE = os.getenv("CYCLE_JOURNAL_FILE", "cycle_journal.jsonl")
+JOURNAL_COMPACT_BYTES = 256 * 1024 # Acima disso, o diário é reescrito só com os ciclos não encerrados
+PROCESS_TOKEN = secrets.token_hex(8) # Distingue este processo de outro que venha a reusar o mesmo PID
+
+
+def _process_started_at(pid):
+    if psutil is None:
+        return None
+    try:
+        return psutil.Process(pid).create_time()
+    except psutil.Error:
+        return None
+
+
+def current_owner():
+    """Dono dos ciclos iniciados por este processo, como gravado no diário."""
+    pid = os.getpid()
+    return {'pid': pid, 'token': PROCESS_TOKEN, 'process_started_at': _process_started_at(pid)}
+
+
+def owner_alive(owner):
+    """
+    Se o processo dono de um ciclo ainda está rodando. Ciclos sem dono (diários antigos) contam como de um
+    processo morto; na dúvida (sem psutil no Windows), o dono conta como vivo e o ciclo não é retomado.
+    """
+    if not owner or not owner.get('pid'):
+        return False
+    if owner.get('token') == PROCESS_TOKEN:
+        return True
+    pid = owner['pid']
+    if psutil is not None:
+        started_at = _process_started_at(pid)
+        if started_at is None:
+            return False
+        # Outro processo com o mesmo PID (ex.: depois de reiniciar a máquina) não é o dono
+        recorded = owner.get('process_started_at')
+        return recorded is None or abs(started_at - recorded) < 1
+    if os.name == 'nt':
+        return True # os.kill no Windows encerraria o processo
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def summarize_cycle(events):
+    """
+    Estado de um ciclo a partir dos seus eventos, na ordem em que foram gravados.
+
+    Returns:
+        dict: {'cycle_id', 'kind', 'owner', 'started_at', 'trends', 'trends_at', 'ended',
+               'items': {item: {'trend', 'text', 'source', 'content_at', 'state'}}}, com `state` em
+               'content', 'submitted', 'posted' ou 'post_failed' e `owner` o do último start/resumed.
+    """
+    state = {'cycle_id': events[0]['cycle_id'], 'kind': 'cycle', 'owner': None, 'started_at': events[0]['ts'],
+             'trends': None, 'trends_at': None, 'ended': False, 'items': {}}
+    for event in events:
+        name, item = event['event'], event.get('item')
+        if name in ('start', 'resumed'):
+            state['kind'] = event.get('kind', 'cycle')
+            state['owner'] = event.get('owner')
+        elif name == 'trends':
+            state['trends'], state['trends_at'] = event.get('trends'), event['ts']
+        elif name == 'content':
+            state['items'][item] = {'trend': event.get('trend'), 'text': event.get('text'), 'source': event.get('source'),
+                                    'content_at': event['ts'], 'state': 'content'}
+        elif name == 'submit' and item in state['items']:
+            state['items'][item]['state'] = 'submitted'
+        elif name in ('posted', 'post_failed') and item in state['items']:
+            state['items'][item].update(state=name, post_id=event.get('post_id'))
+        elif name == 'end':
+            state['ended'] = True
+    return state
+
+
+class CycleJournal:
+    """
+    Diário append-only em JSON lines; cada evento é gravado em disco (fsync) antes de retornar.
+    """
+    def __init__(self, path=CYCLE_JOURNAL_FILE, compact_bytes=JOURNAL_COMPACT_BYTES):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.compact_bytes = compact_bytes
+        self.owner = current_owner()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        """Trava entre threads e, no POSIX, entre processos (flock, liberado sozinho se o processo morrer)."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            try:
+                lock_file = open(self.lock_path, 'a')
+            except OSError as e:
+                logger.warning(f"Diário de ciclos sem trava entre processos: {e}")
+                yield
+                return
+            with lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def record(self, cycle_id, event, **data):
+        if event in ('start', 'resumed'):
+            data['owner'] = self.owner
+        entry = dict(data, cycle_id=cycle_id, event=event, ts=time.time())
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._locked():
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+                    f.flush(); os.fsync(f.fileno())
+            except OSError as e:
+                logger.error(f"Erro ao gravar no diário de ciclos ({event}): {e}")
+        if event == 'end':
+            self.compact_if_needed()
+
+    def _read_events(self):
+        events = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Linha cortada por uma queda no meio da escrita: o evento não aconteceu
+                        logger.warning("Diário de ciclos: linha incompleta ignorada")
+        except FileNotFoundError:
+            pass
+        return events
+
+    def pending(self):
+        """
+        Ciclos iniciados e não encerrados, do mais antigo para o mais recente.
+
+        Returns:
+            list: Estados (ver summarize_cycle).
+        """
+        with self._locked():
+            events = self._read_events()
+        by_cycle = {}
+        for event in events:
+            by_cycle.setdefault(event.get('cycle_id'), []).append(event)
+        states = [summarize_cycle(cycle_events) for cycle_events in by_cycle.values()]
+        return [s for s in states if not s['ended']]
+
+    def orphaned(self):
+        """
+        Ciclos não encerrados cujo processo dono já morreu, do mais antigo para o mais recente. Os de processos
+        vivos (este ou outro usando o mesmo diário) ainda estão em andamento e não podem ser retomados.
+        """
+        orphans = []
+        for state in self.pending():
+            if owner_alive(state['owner']):
+                logger.info(f"Ciclo {state['cycle_id']} em andamento no processo {state['owner']['pid']}; não será retomado")
+            else:
+                orphans.append(state)
+        return orphans
+
+    def compact_if_needed(self):
+        try:
+            if os.path.getsize(self.path) < self.compact_bytes:
+                return
+        except OSError:
+            return
+        self.compact()
+
+    def compact(self):
+        """Reescreve o diário (de forma atômica) só com os eventos dos ciclos não encerrados."""
+        with self._locked():
+            events = self._read_events()
+            ended = {e.get('cycle_id') for e in events if e.get('event') == 'end'}
+            kept = [e for e in events if e.get('cycle_id') not in ended]
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    for event in kept:
+                        f.write(json.dumps(event, ensure_ascii=False) + "\n")
+                    f.flush(); os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.error(f"Erro ao compactar o diário de ciclos: {e}")
+                return
+        logger.debug(f"Diário de ciclos compactado: {len(events)} -> {len(kept)} eventos")
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Perfilamento sob demanda dos ciclos do bot.
+
+Quando ativado, um amostrador lê a pilha da thread do ciclo a cada poucos
+milissegundos (sys._current_frames) e, opcionalmente, o cProfile mede o ciclo
+de forma determinística. Cada amostra é marcada com a etapa do ciclo em
+andamento ("2/5 trends", "4/5 postagem"...), incluindo as threads auxiliares
+criadas durante o ciclo (ex.: fontes de trends em paralelo), e classificada como Python puro,
+WebDriver (round trips ao chromedriver), rede (requests/urllib3) ou espera
+(sleep/wait), para mostrar para onde o tempo foi.
+
+Arquivos salvos em PROFILES_DIR por ciclo perfilado:
+    cycle_<data>.collapsed   pilhas colapsadas ("etapa;mod:func;... N"), prontas para flamegraph.pl/speedscope
+    cycle_<data>.json        duração, etapas (com tempos) e tempo por etapa x categoria
+    cycle_<data>.prof        saída do cProfile (só com PROFILE_DETERMINISTIC=1; abrir com pstats/snakeviz)
+
+Modo (variável PROFILE_CYCLES ou 'profile_cycles' no bot_config.json, que tem prioridade):
+    off        desativado (padrão)
+    all        todos os ciclos
+    every:N    um a cada N ciclos
+    slow:S     perfila todos, mas só salva os ciclos que levaram mais de S segundos
+"""
+
+import cProfile
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+PROFILE_CYCLES = os.getenv("PROFILE_CYCLES", "off")
+PROFILE_DETERMINISTIC = os.getenv("PROFILE_DETERMINISTIC", "0") == "1"
+PROFILE_SAMPLE_MS = float(os.getenv("PROFILE_SAMPLE_MS", "5"))
+PROFILES_DIR = os.getenv("PROFILES_DIR", "profiles")
+
+# Categorias das amostras, pela pilha (da folha para a raiz): a primeira regra que casar vence.
+# Esperas feitas direto em C (ex.: time.sleep) aparecem na função Python que as chamou.
+WAIT_FUNCTIONS = {"sleep", "wait", "deadline_sleep", "select", "poll", "_wait_for_tstate_lock"}
+WEBDRIVER_MODULES = ("selenium",)
+NETWORK_MODULES = ("requests", "urllib3", "http", "socket", "ssl")
+
+
+def parse_mode(value):
+    """
+    Converte o modo ("off", "all", "every:N", "slow:S") em (modo, parâmetro). Valores inválidos desativam.
+    """
+    value = (value or "off").strip().lower()
+    name, _, arg = value.partition(":")
+    try:
+        if name == "all": return "every", 1
+        if name == "every": return "every", max(1, int(arg))
+        if name == "slow": return "slow", float(arg)
+    except ValueError:
+        pass
+    if name not in ("off", ""):
+        logger.warning(f"Modo de perfilamento inválido: '{value}' (use off, all, every:N ou slow:S)")
+    return "off", None
+
+
+def _frame_label(frame):
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_name}"
+
+
+def classify_stack(frames):
+    """
+    Classifica uma pilha (lista de frames da folha para a raiz) em 'espera', 'webdriver', 'rede' ou 'python'.
+    """
+    leaf_module = frames[0].f_globals.get("__name__", "") if frames else ""
+    if frames and frames[0].f_code.co_name in WAIT_FUNCTIONS and not leaf_module.startswith(NETWORK_MODULES):
+        return "espera"
+    modules = [f.f_globals.get("__name__", "") for f in frames]
+    if any(m.startswith(WEBDRIVER_MODULES) for m in modules):
+        return "webdriver"
+    if any(m.startswith(NETWORK_MODULES) for m in modules):
+        return "rede"
+    return "python"
+
+
+class ProfileSession:
+    """
+    Perfilamento de um ciclo, executado na thread do ciclo.
+
+    Args:
+        stage_fn (callable): Retorna a etapa atual do ciclo (marcador das amostras).
+        deterministic (bool): Também roda o cProfile na thread do ciclo.
+        interval (float): Intervalo entre amostras, em segundos.
+    """
+    def __init__(self, stage_fn, deterministic=PROFILE_DETERMINISTIC, interval=PROFILE_SAMPLE_MS / 1000):
+        self.stage_fn = stage_fn
+        self.interval = interval
+        self.profile = cProfile.Profile() if deterministic else None
+        self.stacks = Counter()     # "etapa;raiz;...;folha" -> amostras
+        self.categories = Counter() # (etapa, categoria) -> amostras
+        self.stages = []            # [(etapa, segundos desde o início)]
+        self.started_at = None
+        self.elapsed = None
+        self._thread_id = None
+        self._baseline = set() # Threads que já existiam antes do ciclo (agendador, API, produtor do backlog)
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        self._thread_id = threading.get_ident()
+        self._baseline = set(sys._current_frames()) - {self._thread_id}
+        self.started_at = time.perf_counter()
+        self._sampler = threading.Thread(target=self._sample_loop, name="cycle-profiler", daemon=True)
+        self._sampler.start()
+        if self.profile: self.profile.enable()
+        return self
+
+    def mark(self, stage):
+        """Registra a entrada numa etapa do ciclo."""
+        self.stages.append((stage, round(time.perf_counter() - self.started_at, 3)))
+
+    def stop(self):
+        if self.profile: self.profile.disable()
+        self.elapsed = time.perf_counter() - self.started_at
+        self._stop.set()
+        self._sampler.join(timeout=1)
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            stage = self.stage_fn() or "fora de etapa"
+            names = {t.ident: t.name for t in threading.enumerate()}
+            cycle_category, helpers_busy = None, False
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or thread_id in self._baseline:
+                    continue
+                frames = []
+                while frame is not None:
+                    frames.append(frame); frame = frame.f_back
+                labels = [_frame_label(f) for f in reversed(frames)]
+                category = classify_stack(frames)
+                if thread_id == self._thread_id:
+                    cycle_category = category
+                else:
+                    labels.insert(0, f"[{names.get(thread_id, thread_id)}]")
+                    self.categories[(stage, category)] += 1
+                    helpers_busy = True
+                self.stacks[";".join([stage] + labels)] += 1
+            # A thread do ciclo esperando as auxiliares não conta como espera: o tempo já está nelas.
+            if cycle_category and not (helpers_busy and cycle_category == "espera"):
+                self.categories[(stage, cycle_category)] += 1
+
+    def save(self, directory=PROFILES_DIR, success=None):
+        """
+        Grava os arquivos do ciclo e retorna o caminho base (sem extensão).
+        """
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"cycle_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+        with open(f"{base}.collapsed", "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        by_stage = {}
+        for (stage, category), count in self.categories.items():
+            by_stage.setdefault(stage, {})[category] = round(count * self.interval, 3)
+        summary = {
+            'elapsed_seconds': round(self.elapsed, 3),
+            'success': success,
+            'sample_interval_ms': self.interval * 1000,
+            'samples': sum(self.stacks.values()),
+            'stages': [{'stage': s, 'at_seconds': t} for s, t in self.stages],
+            'seconds_by_stage_and_category': by_stage,
+        }
+        with open(f"{base}.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        if self.profile:
+            self.profile.dump_stats(f"{base}.prof")
+        return base
+
+
+class CycleProfiler:
+    """
+    Decide quais ciclos perfilar e guarda os perfis. O modo é relido a cada ciclo.
+    """
+    def __init__(self, directory=PROFILES_DIR):
+        self.directory = directory
+        self.cycle_count = 0
+
+    def begin(self, mode_value, stage_fn):
+        """
+        Inicia o perfilamento do ciclo atual se o modo pedir; retorna a sessão ou None.
+        """
+        mode, param = parse_mode(mode_value)
+        if mode == "off":
+            return None
+        self.cycle_count += 1
+        if mode == "every" and (self.cycle_count - 1) % param:
+            return None
+        session = ProfileSession(stage_fn).start()
+        session.mode, session.threshold = mode, param
+        return session
+
+    def finish(self, session, success=None):
+        """
+        Encerra a sessão e salva o perfil (no modo slow:S, só se o ciclo passou do limite). Retorna o caminho base ou None.
+        """
+        if session is None:
+            return None
+        session.stop()
+        if session.mode == "slow" and session.elapsed < session.threshold:
+            return None
+        try:
+            base = session.save(self.directory, success)
+        except OSError as e:
+            logger.warning(f"Não foi possível salvar o perfil do ciclo: {e}")
+            return None
+        logger.info(f"Perfil do ciclo ({session.elapsed:.1f}s, {sum(session.stacks.values())} amostras) salvo em {base}.*")
+        return base
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Orçamento de tempo (deadline) de um ciclo do bot.
+
+O ciclo cria um Deadline no início; cada espera do WebDriver, requisição
+HTTP e pausa usa `budget(...)`/`deadline_sleep(...)`, que limitam o tempo ao
+que resta do orçamento. Assim os timeouts deixam de se somar e a duração
+máxima do ciclo fica limitada e configurável. Quando o orçamento acaba, é
+levantado DeadlineExceeded com a etapa em que o ciclo estava.
+"""
+
+import threading
+import time
+
+_local = threading.local()
+
+
+class DeadlineExceeded(Exception):
+    """O orçamento de tempo do ciclo acabou."""
+    def __init__(self, stage=None):
+        self.stage = stage
+        super().__init__(f"deadline exceeded (etapa: {stage or 'desconhecida'})")
+
+
+class Deadline:
+    """
+    Prazo absoluto de um ciclo. Use como context manager para torná-lo o prazo atual da thread.
+
+    Args:
+        seconds (float): Duração máxima do ciclo em segundos.
+        cycle_id (str): Identificador do ciclo, anexado aos logs emitidos sob este prazo.
+    """
+    def __init__(self, seconds, cycle_id=None):
+        self.seconds = seconds
+        self.cycle_id = cycle_id
+        self.expires_at = time.monotonic() + seconds
+        self.stage = None
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self, stage=None):
+        """
+        Marca a etapa atual (se informada) e levanta DeadlineExceeded se o prazo já acabou.
+        """
+        if stage:
+            self.stage = stage
+        if self.expired:
+            raise DeadlineExceeded(self.stage)
+
+    def timeout(self, default):
+        """
+        Retorna o menor entre o timeout desejado e o tempo restante.
+        """
+        self.check()
+        return min(default, self.remaining())
+
+    def sleep(self, seconds):
+        remaining = self.remaining()
+        time.sleep(min(seconds, remaining))
+        if seconds > remaining:
+            raise DeadlineExceeded(self.stage)
+
+    def __enter__(self):
+        # Pilha por thread: o mesmo Deadline pode estar ativo em várias threads ao mesmo tempo.
+        _stack().append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _stack().pop()
+        return False
+
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+def current_deadline():
+    """
+    Retorna o Deadline ativo na thread atual, ou None.
+    """
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+def budget(default):
+    """
+    Timeout a ser usado numa espera/requisição: `default` limitado ao que resta do prazo atual.
+    """
+    deadline = current_deadline()
+    return deadline.timeout(default) if deadline else default
+
+
+def deadline_sleep(seconds):
+    """
+    `time.sleep` que respeita o prazo atual.
+    """
+    deadline = current_deadline()
+    if deadline:
+        deadline.sleep(seconds)
+    else:
+        time.sleep(seconds)
+
+
+def bind_deadline(fn):
+    """
+    Envolve `fn` para que ela rode com o prazo da thread atual, mesmo quando executada em outra thread.
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return fn
+
+    def wrapper(*args, **kwargs):
+        with deadline:
+            return fn(*args, **kwargs)
+    return wrapper
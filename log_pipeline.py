@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Logging sem bloqueio para o bot.
+
+As threads do ciclo só colocam o registro numa fila (QueueHandler); uma thread
+em segundo plano (QueueListener) formata e escreve no console, na interface Tk
+e num arquivo rotativo de linhas JSON. Assim escrever log nunca atrasa o ciclo,
+nem quando o terminal ou o disco estão lentos.
+
+Cada registro emitido durante um ciclo recebe o `cycle_id` e a etapa do prazo
+(Deadline) ativo na thread, inclusive nas threads auxiliares que herdam o prazo
+com `bind_deadline`, para correlacionar todas as linhas de um mesmo ciclo.
+
+Para conteúdos caros (payloads, corpos de resposta), use argumentos preguiçosos:
+    logger.debug("Payload: %s", lazy_json(payload))
+A serialização só acontece se o nível estiver ativo, e na thread do listener.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from datetime import datetime
+
+from deadline import current_deadline
+
+LOG_FILE = os.getenv("LOG_FILE", os.path.join("logs", "bot.jsonl")) # Vazio desativa o arquivo
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+CONSOLE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Atributos padrão de um LogRecord; o resto (passado com extra=...) vai para o JSON.
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'cycle_id', 'stage'}
+
+_listener = None
+
+
+class Lazy:
+    """
+    Valor de log calculado só quando a mensagem é de fato formatada.
+    """
+    def __init__(self, fn):
+        self.fn = fn
+
+    def __str__(self):
+        try:
+            return str(self.fn())
+        except Exception as e:
+            return f"<erro ao formatar: {e}>"
+
+
+def lazy_json(data, limit=None):
+    """
+    Serializa `data` em JSON (opcionalmente truncado) apenas quando o log for escrito.
+    """
+    return Lazy(lambda: json.dumps(data, ensure_ascii=False, indent=2, default=str)[:limit])
+
+
+def lazy_text(text, limit=500):
+    return Lazy(lambda: text[:limit])
+
+
+class CycleContextFilter(logging.Filter):
+    """
+    Anota o registro com o cycle_id e a etapa do prazo ativo na thread que emitiu o log.
+    """
+    def filter(self, record):
+        deadline = current_deadline()
+        record.cycle_id = getattr(deadline, 'cycle_id', None)
+        record.stage = getattr(deadline, 'stage', None)
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que deixa a formatação da mensagem para o listener.
+
+    O QueueHandler padrão formata a mensagem na thread que emitiu o log; aqui só
+    o traceback é renderizado na hora (os frames mudam depois). O bot usa f-strings,
+    então os argumentos que chegam são quase sempre Lazy, imutáveis na prática.
+    """
+    def prepare(self, record):
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class JsonLineFormatter(logging.Formatter):
+    """
+    Uma linha JSON por registro: horário, nível, logger, thread, ciclo, etapa, mensagem e extras.
+    """
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'cycle_id': getattr(record, 'cycle_id', None),
+            'stage': getattr(record, 'stage', None),
+            'message': record.getMessage(),
+        }
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """
+    Formato tradicional do console, com o início do cycle_id quando o registro pertence a um ciclo.
+    """
+    def format(self, record):
+        text = super().format(record)
+        cycle_id = getattr(record, 'cycle_id', None)
+        return f"[{cycle_id}] {text}" if cycle_id else text
+
+
+def setup_logging(level=LOG_LEVEL, console=True, log_file=LOG_FILE):
+    """
+    Configura o logging raiz com fila e listener em segundo plano. Pode ser chamado mais de uma vez
+    (as chamadas seguintes só ajustam o nível).
+
+    Returns:
+        QueueListener: O listener, para adicionar handlers com `add_handler`.
+    """
+    global _listener
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _listener is not None:
+        return _listener
+
+    handlers = []
+    if console:
+        stream = logging.StreamHandler()
+        stream.setFormatter(ConsoleFormatter(CONSOLE_FORMAT))
+        handlers.append(stream)
+    if log_file:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+            file_handler.setFormatter(JsonLineFormatter())
+            handlers.append(file_handler)
+        except OSError as e:
+            print(f"Não foi possível abrir o arquivo de log {log_file}: {e}")
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(CycleContextFilter())
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def add_handler(handler):
+    """
+    Adiciona um handler (ex.: o da interface Tk) ao listener em segundo plano.
+    """
+    listener = setup_logging()
+    listener.handlers = listener.handlers + (handler,)
+
+
+def shutdown_logging():
+    """
+    Esvazia a fila e para o listener (chamado automaticamente na saída do processo).
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
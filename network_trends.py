@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Extração de trends a partir das respostas de rede do próprio X.
+
+A página Explorar baixa as trends como JSON antes de renderizá-las. Com o
+log de performance do Chrome habilitado (`goog:loggingPrefs`), lemos os
+eventos de rede, pegamos o corpo da resposta da timeline via CDP e extraímos
+nome, posição e volume de posts sem depender do HTML/CSS da página.
+"""
+
+import json
+import logging
+import re
+import time
+
+from deadline import budget
+
+logger = logging.getLogger(__name__)
+
+# Trechos de URL das respostas que trazem as trends da página Explorar.
+EXPLORE_RESPONSE_MARKERS = (
+    "/i/api/2/guide.json",
+    "GenericTimelineById",
+    "ExplorePage",
+    "ExploreSidebar",
+    "TrendHistory",
+)
+
+PERFORMANCE_LOGGING_PREFS = {"performance": "ALL"}
+
+# Observadores das respostas de rede lidas pelo bot, chamados com (url, corpo, status, segundos desde o início
+# da espera). Usados pela gravação de cassetes (cassette.py).
+response_observers = []
+
+
+def enable_performance_logging(options):
+    """
+    Habilita o log de performance (eventos CDP de rede) nas opções do Chrome.
+    """
+    options.set_capability("goog:loggingPrefs", PERFORMANCE_LOGGING_PREFS)
+
+
+def read_network_events(driver):
+    """
+    Lê (e consome) os eventos pendentes do log de performance do navegador.
+
+    Cada evento recebe a chave 'webview' com o alvo (aba) que o gerou, quando o chromedriver a informa.
+    """
+    try:
+        entries = driver.get_log("performance")
+    except Exception as e:
+        logger.debug(f"Log de performance indisponível: {e}")
+        return []
+    events = []
+    for entry in entries:
+        try:
+            outer = json.loads(entry["message"])
+            message = outer["message"]
+        except (KeyError, ValueError, TypeError):
+            continue
+        message["webview"] = outer.get("webview")
+        if message.get("method", "").startswith("Network."):
+            events.append(message)
+    return events
+
+
+def notify_response_observers(url, body, status, elapsed):
+    for observer in list(response_observers):
+        try:
+            observer(url, body, status, elapsed)
+        except Exception as e:
+            logger.debug(f"Erro em observador de resposta: {e}")
+
+
+def drain_network_events(driver):
+    """
+    Descarta eventos antigos para que a próxima leitura contenha apenas a navegação atual.
+    """
+    read_network_events(driver)
+
+
+def parse_post_volume(text):
+    """
+    Converte descrições como '12.3K posts', '12,3 mil posts' ou '1.234 posts' em número inteiro.
+    """
+    if not text:
+        return None
+    match = re.search(r"(\d+(?:[.,]\d+)*)\s*(k|mil|m|mi|b|bi)?\b", text.lower())
+    if not match:
+        return None
+    number, suffix = match.group(1), match.group(2)
+    if suffix:
+        # Com sufixo, o separador é decimal: '12.3K' ou '12,3 mil'.
+        value = float(number.replace(",", "."))
+        multiplier = {"k": 1e3, "mil": 1e3, "m": 1e6, "mi": 1e6, "b": 1e9, "bi": 1e9}[suffix]
+        return int(value * multiplier)
+    # Sem sufixo, pontos e vírgulas são separadores de milhar: '1.234' ou '1,234'.
+    return int(re.sub(r"[.,]", "", number))
+
+
+def _trend_from_dict(node):
+    """
+    Reconhece um objeto de trend tanto no formato GraphQL (TimelineTrend) quanto no legado (guide.json).
+    """
+    if node.get("__typename") == "TimelineTrend" or "trend_metadata" in node or "trendMetadata" in node:
+        name = node.get("name")
+        if isinstance(name, str) and name.strip():
+            metadata = node.get("trend_metadata") or node.get("trendMetadata") or {}
+            description = metadata.get("meta_description") or metadata.get("metaDescription")
+            rank = node.get("rank")
+            try:
+                rank = int(rank) if rank is not None else None
+            except (TypeError, ValueError):
+                rank = None
+            return {
+                "name": name.strip(),
+                "rank": rank,
+                "post_count": parse_post_volume(description),
+                "description": description,
+            }
+    return None
+
+
+def parse_trends_from_payload(payload):
+    """
+    Percorre o JSON da resposta e retorna as trends encontradas, na ordem do ranking.
+
+    Returns:
+        list: Dicionários com 'name', 'rank', 'post_count' e 'description'.
+    """
+    trends, seen = [], set()
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            trend = _trend_from_dict(node)
+            if trend and trend["name"] not in seen:
+                seen.add(trend["name"])
+                trends.append(trend)
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    # Mantém a ordem do documento para trends sem rank explícito.
+    return sorted(trends, key=lambda t: t["rank"] if t["rank"] is not None else float("inf"))
+
+
+def capture_explore_trends(driver, timeout=15, poll_interval=0.25):
+    """
+    Aguarda a resposta de rede da timeline Explorar e extrai as trends dela.
+
+    Deve ser chamada logo após `driver.get(...)` da página de trends, com o log de
+    performance habilitado e esvaziado antes da navegação.
+
+    Returns:
+        list: Trends detalhadas (ver parse_trends_from_payload) ou lista vazia se nada for capturado.
+    """
+    started = time.monotonic()
+    wait_until = started + budget(timeout)
+    pending = {}  # requestId -> URL das respostas candidatas
+    while time.monotonic() < wait_until:
+        for event in read_network_events(driver):
+            params = event.get("params", {})
+            method = event.get("method")
+            if method == "Network.responseReceived":
+                url = params.get("response", {}).get("url", "")
+                if any(marker in url for marker in EXPLORE_RESPONSE_MARKERS):
+                    pending[params.get("requestId")] = url
+            elif method == "Network.loadingFinished" and params.get("requestId") in pending:
+                request_id = params["requestId"]
+                url = pending.pop(request_id)
+                try:
+                    body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+                    notify_response_observers(url, body.get("body", ""), 200, time.monotonic() - started)
+                    payload = json.loads(body.get("body", ""))
+                except Exception as e:
+                    logger.debug(f"Não foi possível ler o corpo da resposta {url}: {e}")
+                    continue
+                trends = parse_trends_from_payload(payload)
+                if trends:
+                    logger.info(f"{len(trends)} trends capturadas da resposta de rede: {url.split('?')[0]}")
+                    return trends
+        time.sleep(poll_interval)
+    logger.warning("Nenhuma resposta de trends capturada na rede dentro do tempo limite")
+    return []
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Confirmação de postagem pela rede.
+
+Em vez de inferir o sucesso pelo fechamento do modal e esperar alguns
+segundos, observamos nos eventos de rede do navegador a requisição de
+criação do post (GraphQL CreateTweet) e a sua resposta. O resultado sai
+assim que a resposta chega, com o ID do novo post ou o motivo da falha.
+"""
+
+import json
+import logging
+import time
+
+from deadline import budget
+from network_trends import notify_response_observers, read_network_events
+
+logger = logging.getLogger(__name__)
+
+# Trechos de URL das requisições que criam um post.
+CREATE_POST_MARKERS = ("/CreateTweet", "/CreateNoteTweet", "/2/tweets")
+# Respostas de erro que dizem respeito à conta ou ao serviço (autenticação, limite), não ao conteúdo do post.
+PROVIDER_ERROR_STATUSES = (401, 429)
+
+
+class PostConfirmation:
+    """
+    Resultado da observação da requisição de criação do post.
+
+    Attributes:
+        observed (bool): Se a requisição de criação foi vista na rede.
+        confirmed (bool): Se o servidor confirmou a criação do post.
+        post_id (str): ID do novo post, quando confirmado.
+        status (int): Status HTTP da resposta.
+        reason (str): Motivo da falha, quando houver.
+        rejected (bool): O servidor respondeu e recusou o conteúdo (ex.: duplicado); falhas de rede, de
+                         autenticação, limite de requisições e erros 5xx não contam.
+    """
+    def __init__(self, observed=False, confirmed=False, post_id=None, status=None, reason=None, rejected=False):
+        self.observed = observed
+        self.rejected = rejected
+        self.confirmed = confirmed
+        self.post_id = post_id
+        self.status = status
+        self.reason = reason
+
+    def __repr__(self):
+        return (f"PostConfirmation(observed={self.observed}, confirmed={self.confirmed}, "
+                f"post_id={self.post_id}, status={self.status}, reason={self.reason!r}, rejected={self.rejected})")
+
+
+def parse_create_post_response(payload):
+    """
+    Extrai (post_id, motivo_da_falha) da resposta JSON de criação do post.
+    """
+    errors = payload.get("errors") if isinstance(payload, dict) else None
+    if errors:
+        first = errors[0] if isinstance(errors, list) and errors else {}
+        return None, first.get("message") or str(first)
+    data = payload.get("data", {}) if isinstance(payload, dict) else {}
+    # GraphQL: data.create_tweet.tweet_results.result.rest_id (ou create_note_tweet)
+    for key in ("create_tweet", "create_note_tweet", "notetweet_create"):
+        result = data.get(key, {}).get("tweet_results", {}).get("result", {})
+        if result.get("rest_id"):
+            return result["rest_id"], None
+    # API v2: data.id
+    if data.get("id"):
+        return str(data["id"]), None
+    return None, "resposta sem ID do post"
+
+
+def wait_for_post_confirmation(driver, timeout=30, poll_interval=0.1):
+    """
+    Observa os eventos de rede até a resposta da requisição de criação do post.
+
+    O log de performance deve ter sido esvaziado (drain_network_events) antes do clique em publicar. Só contam
+    os eventos da aba atual: num navegador compartilhado (browser-host), o log traz também os posts de outras abas.
+
+    Returns:
+        PostConfirmation: O resultado; `observed=False` se a requisição não apareceu no tempo limite.
+    """
+    started = time.monotonic()
+    wait_until = started + budget(timeout)
+    try:
+        own_tab = driver.current_window_handle
+    except Exception:
+        own_tab = None # Sem a aba atual, não há como filtrar
+    tracked = {}  # requestId -> status HTTP (None até a resposta chegar)
+    urls = {}     # requestId -> URL da requisição de criação
+    while time.monotonic() < wait_until:
+        for event in read_network_events(driver):
+            webview = event.get("webview")
+            if own_tab and webview and webview != own_tab:
+                continue # Evento de outra aba
+            method = event.get("method")
+            params = event.get("params", {})
+            request_id = params.get("requestId")
+            if method == "Network.requestWillBeSent":
+                request = params.get("request", {})
+                if request.get("method") == "POST" and any(m in request.get("url", "") for m in CREATE_POST_MARKERS):
+                    tracked[request_id] = None
+                    urls[request_id] = request.get("url", "")
+            elif request_id not in tracked:
+                continue
+            elif method == "Network.responseReceived":
+                tracked[request_id] = params.get("response", {}).get("status")
+            elif method == "Network.loadingFailed":
+                return PostConfirmation(observed=True, reason=params.get("errorText") or "falha de rede")
+            elif method == "Network.loadingFinished":
+                status = tracked[request_id]
+                try:
+                    body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+                    notify_response_observers(urls[request_id], body.get("body", ""), status, time.monotonic() - started)
+                    payload = json.loads(body.get("body", ""))
+                    post_id, reason = parse_create_post_response(payload)
+                    has_errors = isinstance(payload, dict) and bool(payload.get("errors"))
+                except Exception as e:
+                    post_id, reason, has_errors = None, f"corpo da resposta ilegível: {e}", False
+                if status and status >= 400 and not reason:
+                    reason = f"HTTP {status}"
+                confirmed = bool(post_id) and (status is None or status < 400)
+                rejected = not confirmed and has_errors and not (status and (status >= 500 or status in PROVIDER_ERROR_STATUSES))
+                return PostConfirmation(observed=True, confirmed=confirmed, post_id=post_id, status=status,
+                                        reason=None if confirmed else reason, rejected=rejected)
+        time.sleep(poll_interval)
+    return PostConfirmation(observed=bool(tracked), reason="resposta da criação do post não chegou a tempo")
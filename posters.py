@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+Backends de postagem intercambiáveis.
+
+O fluxo Selenium atual (navegar, clicar, digitar) é um backend; a API HTTP
+oficial do X é outro, sem navegador e com conexões reaproveitadas. Cada
+backend mede latência e erros, e o FailoverPoster tenta um após o outro.
+"""
+
+import logging
+import os
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests_oauthlib import OAuth1
+from urllib3.exceptions import NewConnectionError
+
+from circuit_breaker import RequestRejected
+from deadline import budget
+
+logger = logging.getLogger(__name__)
+
+# A URL base pode apontar para um servidor stub local (ex.: http://127.0.0.1:8099) em testes.
+X_API_BASE_URL = os.getenv("X_API_BASE_URL", "https://api.twitter.com")
+# Ordem de preferência dos backends, separados por vírgula (ex.: "api,selenium").
+POSTING_BACKENDS = os.getenv("POSTING_BACKENDS", "selenium")
+
+
+class PosterError(Exception):
+    """Erro de postagem com a mensagem retornada pelo backend."""
+
+
+class PostRejected(PosterError, RequestRejected):
+    """
+    O serviço recebeu o post e recusou este conteúdo (ex.: duplicado, política): nada foi publicado, e outro
+    envio do mesmo texto, por qualquer backend, teria o mesmo fim. Como RequestRejected, não conta como falha
+    no circuit breaker da composição: o serviço está saudável, quem falhou foi o texto.
+    """
+
+
+class PostOutcomeUnknown(PosterError):
+    """
+    A falha ocorreu depois do envio (ex.: clique em publicar, requisição sem resposta): o post pode ter sido
+    publicado. Nunca é tentado de novo, nem por outro backend, e é propagado por `TweetPoster.post`.
+    """
+
+
+def _never_connected(error):
+    """
+    A falha ocorreu antes de a conexão ser aberta (timeout de conexão, DNS, conexão recusada), ou seja,
+    antes do envio da requisição.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+class TweetPoster:
+    """
+    Interface comum dos backends de postagem.
+
+    Subclasses implementam `_post(text)`, retornando True em caso de sucesso
+    ou levantando PosterError/retornando False em caso de falha. Falhas em que
+    o post pode ter saído levantam PostOutcomeUnknown, que `post` repassa.
+    """
+    name = "base"
+
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.last_latency = None
+        self.last_error = None
+        self.last_post_id = None
+        self.last_rejected = False # A última falha foi uma recusa do conteúdo (PostRejected)
+
+    def is_available(self):
+        return True
+
+    def post(self, text):
+        self.attempts += 1
+        self.last_post_id = None
+        self.last_rejected = False
+        started = time.perf_counter()
+        error = None
+        unknown = None
+        try:
+            ok = bool(self._post(text))
+            if not ok:
+                error = "backend retornou falha"
+        except PostOutcomeUnknown as e:
+            ok, error, unknown = False, str(e), e
+        except Exception as e:
+            ok, error = False, str(e)
+            self.last_rejected = isinstance(e, PostRejected)
+        latency = time.perf_counter() - started
+        self.total_latency += latency
+        self.last_latency = latency
+        if ok:
+            self.successes += 1
+            self.last_error = None
+            logger.info(f"[{self.name}] Postagem concluída em {latency:.2f}s")
+        else:
+            self.failures += 1
+            self.last_error = error
+            logger.warning(f"[{self.name}] Falha na postagem após {latency:.2f}s: {error}")
+        if unknown is not None:
+            raise unknown
+        return ok
+
+    def _post(self, text):
+        raise NotImplementedError
+
+    def get_stats(self):
+        return {
+            'backend': self.name,
+            'attempts': self.attempts,
+            'successes': self.successes,
+            'failures': self.failures,
+            'avg_latency': (self.total_latency / self.attempts) if self.attempts else 0.0,
+            'last_latency': self.last_latency,
+            'last_error': self.last_error,
+        }
+
+
+class SeleniumPoster(TweetPoster):
+    """
+    Backend que usa o fluxo do navegador.
+
+    Args:
+        driver_fn (callable): Retorna o WebDriver a ser usado (pode inicializá-lo sob demanda).
+        post_fn (callable): Função de postagem `post_fn(driver, text)`, que retorna o ID do post
+                            (str), True em caso de sucesso sem ID, ou False.
+        breaker (CircuitBreaker): Se informado, o backend fica indisponível (sem abrir o
+                                  navegador) enquanto o circuito estiver aberto.
+    """
+    name = "selenium"
+
+    def __init__(self, driver_fn, post_fn, breaker=None):
+        super().__init__()
+        self.driver_fn = driver_fn
+        self.post_fn = post_fn
+        self.breaker = breaker
+
+    def is_available(self):
+        return self.breaker is None or self.breaker.available()
+
+    def _post(self, text):
+        if self.breaker is None:
+            result = self.post_fn(self.driver_fn(), text)
+        else:
+            result = self.breaker.call(lambda: self.post_fn(self.driver_fn(), text))
+        self.last_post_id = result if isinstance(result, str) else None
+        return bool(result)
+
+
+class ApiPoster(TweetPoster):
+    """
+    Backend que posta pela API v2 do X (POST /2/tweets) com autenticação OAuth 1.0a.
+
+    A sessão HTTP é mantida entre ciclos, reaproveitando as conexões do pool.
+    """
+    name = "api"
+
+    def __init__(self, consumer_key, consumer_secret, access_token, access_token_secret,
+                 base_url=X_API_BASE_URL, timeout=15, pool_size=4):
+        super().__init__()
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.auth = OAuth1(consumer_key, consumer_secret, access_token, access_token_secret)
+
+    @classmethod
+    def from_env(cls):
+        """
+        Cria o backend a partir das variáveis de ambiente, ou retorna None se faltarem credenciais.
+        """
+        keys = ("X_API_KEY", "X_API_SECRET", "X_ACCESS_TOKEN", "X_ACCESS_TOKEN_SECRET")
+        values = [os.getenv(k) for k in keys]
+        if not all(values):
+            return None
+        return cls(*values)
+
+    def _post(self, text):
+        try:
+            response = self.session.post(f"{self.base_url}/2/tweets", json={"text": text}, timeout=budget(self.timeout))
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                requests.exceptions.ChunkedEncodingError, requests.exceptions.ContentDecodingError) as e:
+            if _never_connected(e):
+                raise # A conexão nem foi aberta: o post certamente não saiu
+            # A requisição pode ter sido enviada (conexão caiu, resposta não chegou): o servidor pode ter criado o post.
+            raise PostOutcomeUnknown(f"sem resposta da API após o envio: {e}") from e
+        if response.status_code >= 400:
+            message = f"HTTP {response.status_code}: {response.text[:200]}"
+            # 400/403 recusam o conteúdo (ex.: duplicado); autenticação, limite e 5xx são falhas do serviço.
+            raise PostRejected(message) if response.status_code in (400, 403) else PosterError(message)
+        try:
+            self.last_post_id = str(response.json()["data"]["id"])
+        except (ValueError, KeyError, TypeError) as e:
+            # Resposta de sucesso ilegível: o post provavelmente foi criado, só não sabemos o ID.
+            raise PostOutcomeUnknown(f"HTTP {response.status_code} sem o ID do post na resposta: {e}") from e
+        logger.info(f"[api] Tweet criado com ID: {self.last_post_id}")
+        return True
+
+    def close(self):
+        self.session.close()
+
+
+class FailoverPoster(TweetPoster):
+    """
+    Tenta os backends na ordem dada até um deles postar com sucesso. Só passa para o próximo quando a
+    falha certamente ocorreu antes do envio; PostOutcomeUnknown encerra a postagem sem tentar outro backend,
+    e uma recusa do conteúdo (PostRejected) também, porque o outro backend recusaria o mesmo texto.
+    """
+    name = "failover"
+
+    def __init__(self, posters):
+        super().__init__()
+        self.posters = [p for p in posters if p is not None]
+        self.last_backend = None
+
+    def is_available(self):
+        return any(p.is_available() for p in self.posters)
+
+    def _post(self, text):
+        errors = []
+        self.last_backend = None
+        for poster in self.posters:
+            if not poster.is_available():
+                continue
+            try:
+                ok = poster.post(text)
+            except PostOutcomeUnknown:
+                self.last_backend = poster.name
+                logger.error(f"Backend '{poster.name}' falhou depois do envio; nenhum outro backend será tentado")
+                raise
+            if ok:
+                self.last_backend = poster.name
+                self.last_post_id = poster.last_post_id
+                return True
+            if poster.last_rejected:
+                self.last_backend = poster.name
+                raise PostRejected(f"{poster.name}: {poster.last_error}")
+            errors.append(f"{poster.name}: {poster.last_error}")
+            logger.warning(f"Backend '{poster.name}' falhou, tentando o próximo...")
+        raise PosterError("; ".join(errors) or "nenhum backend disponível")
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats['backends'] = [p.get_stats() for p in self.posters]
+        stats['last_backend'] = self.last_backend
+        return stats
+
+
+def build_poster(posters_by_name, order=POSTING_BACKENDS):
+    """
+    Monta o FailoverPoster conforme a ordem configurada (ex.: "api,selenium").
+
+    Args:
+        posters_by_name (dict): Backends disponíveis por nome; valores None (ex.: API
+                                sem credenciais) são ignorados.
+        order (str): Nomes dos backends separados por vírgula, em ordem de preferência.
+    """
+    names = [n.strip().lower() for n in order.split(",") if n.strip()]
+    for name in names:
+        if name not in posters_by_name:
+            logger.warning(f"Backend de postagem desconhecido ignorado: '{name}'")
+    posters = [posters_by_name.get(name) for name in names]
+    # O navegador continua como último recurso mesmo se não estiver listado.
+    if "selenium" not in names:
+        posters.append(posters_by_name.get("selenium"))
+    return FailoverPoster(posters)
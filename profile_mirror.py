@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""
+Perfil do Chrome em memória (tmpfs), a partir de uma cópia "dourada" enxuta.
+
+O perfil indicado em CHROME_PROFILE_PATH cresce sem parar (caches, modelos,
+relatórios de falha) e o Chrome lê boa parte dele a cada inicialização. Com
+PROFILE_MIRROR=1:
+
+    - uma cópia dourada do perfil, sem caches nem arquivos descartáveis, é criada
+      uma vez (PROFILE_GOLDEN_DIR) e passa a ser o perfil de referência;
+    - a cada navegador lançado, a cópia dourada é espelhada num diretório em
+      tmpfs (/dev/shm, quando existe), e o Chrome roda sobre esse espelho;
+    - ao fechar o navegador, só o estado da sessão (cookies, armazenamento local,
+      preferências) volta para a cópia dourada, e o espelho é apagado;
+    - os recursos estáticos ficam num cache em disco separado e compartilhado
+      entre lançamentos (CHROME_DISK_CACHE_DIR), limitado a CHROME_DISK_CACHE_MB;
+      cada navegador que o usa deixa uma reserva em <CHROME_DISK_CACHE_DIR>.leases,
+      e o cache só é esvaziado quando nenhum navegador vivo o está usando.
+
+Para refazer a cópia dourada (ex.: depois de logar de novo no perfil original):
+    python profile_mirror.py rebuild
+Tamanhos atuais do perfil original, da cópia dourada e do cache:
+    python profile_mirror.py stats
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MIRROR = os.getenv("PROFILE_MIRROR", "0") == "1"
+PROFILE_GOLDEN_DIR = os.getenv("PROFILE_GOLDEN_DIR") # Padrão: <CHROME_PROFILE_PATH>-golden
+PROFILE_MIRROR_ROOT = os.getenv("PROFILE_MIRROR_ROOT") or ("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir())
+CHROME_DISK_CACHE_DIR = os.getenv("CHROME_DISK_CACHE_DIR", "chrome_disk_cache")
+CHROME_DISK_CACHE_MB = int(os.getenv("CHROME_DISK_CACHE_MB", "256"))
+MIRROR_PREFIX = "chrome-profile-"
+CACHE_LOCK_TIMEOUT_SECONDS = 10
+
+# Descartáveis: o Chrome recria tudo isso sozinho, e é o que faz o perfil crescer.
+PRUNE_NAMES = {
+    "Cache", "Code Cache", "GPUCache", "DawnCache", "DawnGraphiteCache", "DawnWebGPUCache", "GrShaderCache",
+    "GraphiteDawnCache", "ShaderCache", "CacheStorage", "ScriptCache", "Media Cache", "blob_storage",
+    "Crashpad", "Crash Reports", "BrowserMetrics", "component_crx_cache", "extensions_crx_cache",
+    "optimization_guide_model_store", "OptimizationHints", "OnDeviceHeadSuggestModel", "Safe Browsing",
+    "SafetyTips", "segmentation_platform", "Download Service", "History Provider Cache",
+    "SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile",
+}
+PRUNE_SUFFIXES = (".pma", ".tmp") # Não inclui .log: o leveldb (Local Storage, IndexedDB) guarda dados neles
+
+# Estado da sessão copiado de volta para a cópia dourada (relativo ao diretório do perfil, ex.: Default/).
+SESSION_STATE = (
+    "Cookies", "Cookies-journal", os.path.join("Network", "Cookies"), os.path.join("Network", "Cookies-journal"),
+    os.path.join("Network", "TransportSecurity"), "Preferences", "Secure Preferences",
+    "Login Data", "Login Data-journal", "Web Data", "Web Data-journal",
+    "Local Storage", "Session Storage", "IndexedDB", "Sessions",
+)
+ROOT_STATE = ("Local State",)
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try: total += os.lstat(os.path.join(root, name)).st_size
+            except OSError: pass
+    return total
+
+
+def _ignore_prunable(directory, names):
+    return [n for n in names if n in PRUNE_NAMES or n.endswith(PRUNE_SUFFIXES)]
+
+
+def _profile_dirs(user_data_dir):
+    try:
+        return [n for n in os.listdir(user_data_dir)
+                if (n == "Default" or n.startswith("Profile ")) and os.path.isdir(os.path.join(user_data_dir, n))]
+    except OSError:
+        return []
+
+
+def _replace_path(src, dst):
+    """
+    Copia `src` (arquivo ou diretório) sobre `dst` sem deixar `dst` pela metade: copia ao lado e troca.
+    """
+    tmp = f"{dst}.sync-tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    if os.path.isdir(src):
+        shutil.copytree(src, tmp, symlinks=True, ignore=_ignore_prunable)
+        old = f"{dst}.sync-old"
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(dst): os.rename(dst, old)
+        os.rename(tmp, dst)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class ProfileMirror:
+    """
+    Cópia dourada do perfil, espelhos em tmpfs por lançamento e cache em disco limitado.
+
+    Args:
+        source_path (str): Perfil original (CHROME_PROFILE_PATH), usado só para criar a cópia dourada.
+        golden_dir (str): Onde fica a cópia dourada (padrão: <source_path>-golden).
+        mirror_root (str): Diretório em memória onde os espelhos são criados.
+        cache_dir (str): Cache em disco compartilhado pelos lançamentos.
+        cache_max_mb (int): Limite do cache em disco.
+    """
+    def __init__(self, source_path, golden_dir=PROFILE_GOLDEN_DIR, mirror_root=PROFILE_MIRROR_ROOT,
+                 cache_dir=CHROME_DISK_CACHE_DIR, cache_max_mb=CHROME_DISK_CACHE_MB):
+        self.source_path = source_path
+        self.golden_dir = os.path.abspath(golden_dir or f"{source_path.rstrip(os.sep)}-golden")
+        self.mirror_root = mirror_root
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.cache_max_bytes = cache_max_mb * 1024 * 1024
+        self.leases_dir = f"{self.cache_dir}.leases" # Fora do cache, que pode ser apagado inteiro
+        self.cache_lock_path = f"{self.cache_dir}.lock"
+        self._lock = threading.Lock() # Sincronizações de volta não se sobrepõem
+        self._counter = 0
+        self._leases = {} # user-data-dir -> reservas do cache em disco dos navegadores lançados com ele
+
+    # --- Cópia dourada ---
+    def ensure_golden(self):
+        if not os.path.isdir(self.golden_dir):
+            self.rebuild_golden()
+        return self.golden_dir
+
+    def rebuild_golden(self):
+        """
+        (Re)cria a cópia dourada a partir do perfil original, sem os descartáveis.
+        """
+        started = time.monotonic()
+        with self._lock:
+            _replace_path(self.source_path, self.golden_dir)
+        logger.info(f"Cópia dourada do perfil criada em {self.golden_dir}: {directory_size(self.golden_dir) / 1e6:.1f} MB "
+                    f"(original: {directory_size(self.source_path) / 1e6:.1f} MB) em {time.monotonic() - started:.1f}s")
+
+    # --- Espelhos por lançamento ---
+    def acquire(self):
+        """
+        Cria o espelho em memória para um novo navegador e retorna o caminho a usar como user-data-dir.
+        Sem espaço no diretório em memória, retorna a própria cópia dourada. Em ambos os casos reserva o
+        cache em disco até o `release` correspondente.
+        """
+        started = time.monotonic()
+        golden = self.ensure_golden()
+        self.cleanup_orphans()
+        size = directory_size(golden)
+        try:
+            free = shutil.disk_usage(self.mirror_root).free
+        except OSError:
+            free = 0
+        with self._lock:
+            self._counter += 1
+            counter = self._counter
+        if size * 2 > free:
+            logger.warning(f"Sem espaço em {self.mirror_root} para espelhar o perfil ({size / 1e6:.0f} MB); usando a cópia dourada")
+            mirror = golden
+        else:
+            mirror = os.path.join(self.mirror_root, f"{MIRROR_PREFIX}{os.getpid()}-{counter}")
+            shutil.rmtree(mirror, ignore_errors=True)
+            shutil.copytree(golden, mirror, symlinks=True, ignore=_ignore_prunable)
+            logger.info(f"Perfil espelhado em {mirror} ({size / 1e6:.1f} MB, {(time.monotonic() - started) * 1000:.0f} ms)")
+        lease = self._acquire_cache_lease(counter)
+        with self._lock:
+            self._leases.setdefault(mirror, []).append(lease)
+        return mirror
+
+    def release(self, mirror, sync=True):
+        """
+        Navegador fechado: copia o estado da sessão de volta para a cópia dourada, apaga o espelho, devolve
+        a reserva do cache em disco e mantém o cache dentro do limite.
+        """
+        if mirror and os.path.abspath(mirror) != self.golden_dir and os.path.isdir(mirror):
+            if sync:
+                self.sync_back(mirror)
+            shutil.rmtree(mirror, ignore_errors=True)
+        with self._lock:
+            leases = self._leases.get(mirror) or []
+            lease = leases.pop() if leases else None
+            if not leases:
+                self._leases.pop(mirror, None)
+        if lease:
+            self._release_cache_lease(lease)
+        self.enforce_cache_limit()
+
+    def sync_back(self, mirror):
+        started = time.monotonic()
+        copied = 0
+        with self._lock:
+            items = [(name, name) for name in ROOT_STATE]
+            for profile in _profile_dirs(mirror):
+                items.extend((os.path.join(profile, rel), os.path.join(profile, rel)) for rel in SESSION_STATE)
+            for rel_src, rel_dst in items:
+                src = os.path.join(mirror, rel_src)
+                if not os.path.exists(src):
+                    continue
+                try:
+                    _replace_path(src, os.path.join(self.golden_dir, rel_dst))
+                    copied += 1
+                except OSError as e:
+                    logger.warning(f"Erro ao sincronizar {rel_src} para a cópia dourada: {e}")
+        logger.info(f"Estado da sessão sincronizado na cópia dourada ({copied} itens, {(time.monotonic() - started) * 1000:.0f} ms)")
+
+    def cleanup_orphans(self):
+        """Apaga espelhos deixados por processos que já terminaram (ex.: o bot caiu com o navegador aberto)."""
+        try:
+            names = os.listdir(self.mirror_root)
+        except OSError:
+            return
+        for name in names:
+            if not name.startswith(MIRROR_PREFIX):
+                continue
+            try:
+                pid = int(name[len(MIRROR_PREFIX):].split("-")[0])
+            except ValueError:
+                continue
+            if pid != os.getpid() and not _pid_alive(pid):
+                shutil.rmtree(os.path.join(self.mirror_root, name), ignore_errors=True)
+                logger.info(f"Espelho de perfil órfão removido: {name}")
+
+    # --- Cache em disco ---
+    def chrome_arguments(self):
+        """Argumentos do Chrome para o cache em disco compartilhado e limitado."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        return [f"--disk-cache-dir={self.cache_dir}", f"--disk-cache-size={self.cache_max_bytes}"]
+
+    def enforce_cache_limit(self):
+        """
+        O Chrome trata --disk-cache-size como alvo; se o cache passar do limite mesmo assim, é apagado
+        inteiro (o Chrome o recria, e apagar entradas soltas corromperia o índice), mas só quando nenhum
+        navegador vivo, deste ou de outro processo, tem reserva nele. Senão fica para o próximo fechamento.
+        """
+        size = directory_size(self.cache_dir)
+        if size <= self.cache_max_bytes:
+            return
+        if not self._lock_cache():
+            logger.warning("Trava do cache em disco ocupada; limite do cache verificado no próximo fechamento")
+            return
+        try:
+            in_use = self._live_leases()
+            if in_use:
+                logger.info(f"Cache em disco do Chrome com {size / 1e6:.0f} MB (limite {self.cache_max_bytes / 1e6:.0f} MB), "
+                            f"mas em uso por {len(in_use)} navegador(es); esvaziamento adiado")
+                return
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+        finally:
+            self._unlock_cache()
+        logger.info(f"Cache em disco do Chrome com {size / 1e6:.0f} MB (limite {self.cache_max_bytes / 1e6:.0f} MB): esvaziado")
+
+    def _acquire_cache_lease(self, counter):
+        """Registra que um navegador deste processo vai usar o cache em disco; retorna o arquivo da reserva."""
+        lease = os.path.join(self.leases_dir, f"{os.getpid()}-{counter}")
+        locked = self._lock_cache()
+        try:
+            os.makedirs(self.leases_dir, exist_ok=True)
+            open(lease, "w").close()
+        except OSError as e:
+            logger.warning(f"Erro ao reservar o cache em disco ({e}); o cache não será esvaziado por este processo")
+            return None
+        finally:
+            if locked:
+                self._unlock_cache()
+        return lease
+
+    def _release_cache_lease(self, lease):
+        try:
+            os.remove(lease)
+        except OSError:
+            pass
+
+    def _live_leases(self):
+        """Reservas de processos vivos; as de processos que já terminaram são apagadas."""
+        try:
+            names = os.listdir(self.leases_dir)
+        except OSError:
+            return []
+        live = []
+        for name in names:
+            try:
+                pid = int(name.split("-")[0])
+            except ValueError:
+                continue
+            if _pid_alive(pid):
+                live.append(name)
+            else:
+                self._release_cache_lease(os.path.join(self.leases_dir, name))
+        return live
+
+    def _lock_cache(self, timeout=CACHE_LOCK_TIMEOUT_SECONDS):
+        """
+        Trava entre processos (arquivo criado com O_EXCL, com o PID do dono) para reservar e esvaziar o
+        cache sem que um navegador seja lançado no meio do esvaziamento. Retorna False se não conseguir a tempo.
+        """
+        wait_until = time.monotonic() + timeout
+        while True:
+            try:
+                fd = os.open(self.cache_lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+            except FileExistsError:
+                if self._cache_lock_stale():
+                    self._unlock_cache()
+                    continue
+                if time.monotonic() >= wait_until:
+                    return False
+                time.sleep(0.05)
+                continue
+            except OSError as e:
+                logger.warning(f"Erro ao criar a trava do cache em disco: {e}")
+                return False
+            with os.fdopen(fd, "w") as f:
+                f.write(str(os.getpid()))
+            return True
+
+    def _cache_lock_stale(self):
+        """A trava foi deixada por um processo que já terminou."""
+        try:
+            with open(self.cache_lock_path) as f:
+                pid = int(f.read().strip())
+        except (OSError, ValueError):
+            return False # Sumiu ou está sendo criada agora
+        return pid != os.getpid() and not _pid_alive(pid)
+
+    def _unlock_cache(self):
+        try:
+            os.remove(self.cache_lock_path)
+        except OSError:
+            pass
+
+
+def main():
+    from dotenv import load_dotenv
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Cópia dourada e espelho em memória do perfil do Chrome.")
+    parser.add_argument("command", choices=["rebuild", "stats"])
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    raw_profile_path = os.getenv("CHROME_PROFILE_PATH")
+    if not raw_profile_path or not os.path.isdir(os.path.expanduser(raw_profile_path)):
+        parser.error("CHROME_PROFILE_PATH não definido ou inválido no .env")
+    mirror = ProfileMirror(os.path.abspath(os.path.expanduser(raw_profile_path)))
+    if args.command == "rebuild":
+        mirror.rebuild_golden()
+    else:
+        for label, path in (("original", mirror.source_path), ("cópia dourada", mirror.golden_dir), ("cache em disco", mirror.cache_dir)):
+            print(f"{label:15} {directory_size(path) / 1e6:10.1f} MB  {path}")
+        print(f"espelhos em     {mirror.mirror_root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Watchdog de recursos do navegador.
+
+Acompanha a árvore de processos (chromedriver + Chrome) de cada WebDriver
+iniciado pelo bot, amostra RSS e CPU a cada ciclo, mata processos que
+sobraram após o `quit()` e sinaliza quando o navegador deve ser reciclado
+por ultrapassar o limite de memória configurado.
+
+Os processos acompanhados ficam registrados em BROWSER_PIDS_DIR (um arquivo
+por processo do bot, com PID e horário de criação). Se o bot cair com o
+navegador aberto, o próximo processo encerra só esses navegadores: nunca o
+Chrome do usuário nem o do browser-host.
+
+Requer `psutil`; sem ele o watchdog apenas registra um aviso e não faz nada.
+"""
+
+import json
+import logging
+import os
+import threading
+
+try:
+    import psutil
+except ImportError:  # O bot continua funcionando, só sem o watchdog.
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+BROWSER_MAX_RSS_MB = int(os.getenv("BROWSER_MAX_RSS_MB", "2048"))  # Limite para reciclar o navegador.
+BROWSER_PIDS_DIR = os.getenv("BROWSER_PIDS_DIR", "browser_pids")  # Navegadores lançados, por processo do bot.
+
+
+def process_tree(pid, cache=None):
+    """
+    Retorna o processo e todos os seus descendentes (lista vazia se ele não existir).
+
+    Args:
+        cache (dict): PID -> psutil.Process das amostras anteriores da mesma árvore. Os processos já vistos
+                      voltam como o mesmo objeto, porque o cpu_percent de um objeto novo sempre começa em 0.0;
+                      o dicionário passa a conter só a árvore atual.
+    """
+    if psutil is None:
+        return []
+    try:
+        root = psutil.Process(pid)
+        processes = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return []
+    if cache is None:
+        return processes
+    # psutil.Process compara PID e horário de criação: um PID reaproveitado por outro processo não casa.
+    processes = [cache[p.pid] if cache.get(p.pid) == p else p for p in processes]
+    cache.clear()
+    cache.update((p.pid, p) for p in processes)
+    return processes
+
+
+def sample_processes(processes):
+    """
+    Soma RSS (MB) e CPU (%) de uma lista de processos, ignorando os que já terminaram.
+    O CPU de cada processo é medido desde a chamada anterior no mesmo objeto (ver o cache de process_tree);
+    na primeira, vale 0.0.
+    """
+    rss, cpu, alive = 0, 0.0, 0
+    for proc in processes:
+        try:
+            rss += proc.memory_info().rss
+            cpu += proc.cpu_percent(interval=None)
+            alive += 1
+        except psutil.Error:
+            continue
+    return {'rss_mb': round(rss / (1024 * 1024), 1), 'cpu_percent': round(cpu, 1), 'processes': alive}
+
+
+def kill_processes(processes, timeout=5):
+    """
+    Termina (e, se preciso, mata) os processos e aguarda o término para não deixar zumbis.
+
+    Returns:
+        int: Quantos processos ainda estavam vivos e foram encerrados.
+    """
+    alive = []
+    for proc in processes:
+        try:
+            if proc.is_running():
+                proc.terminate()
+                alive.append(proc)
+        except psutil.Error:
+            continue
+    if not alive:
+        return 0
+    _, still_alive = psutil.wait_procs(alive, timeout=timeout)
+    for proc in still_alive:
+        try:
+            proc.kill()
+        except psutil.Error:
+            pass
+    psutil.wait_procs(still_alive, timeout=timeout)
+    return len(alive)
+
+
+def process_record(proc):
+    """{'pid', 'started_at'} de um processo, ou None se ele já terminou."""
+    try:
+        return {'pid': proc.pid, 'started_at': proc.create_time()}
+    except psutil.Error:
+        return None
+
+
+def find_process(record):
+    """
+    O processo registrado, se ainda for o mesmo (PID e horário de criação); um PID reaproveitado não casa.
+    """
+    try:
+        proc = psutil.Process(record['pid'])
+        if abs(proc.create_time() - record['started_at']) < 1:
+            return proc
+    except (psutil.Error, KeyError, TypeError):
+        pass
+    return None
+
+
+class ResourceWatchdog:
+    """
+    Registra os WebDrivers iniciados e controla memória, CPU e processos órfãos.
+
+    Args:
+        max_rss_mb (int): RSS total da árvore do navegador a partir do qual ele deve ser reciclado.
+        pids_dir (str): Onde registrar os processos acompanhados, para encerrá-los se o bot cair.
+    """
+    def __init__(self, max_rss_mb=BROWSER_MAX_RSS_MB, pids_dir=BROWSER_PIDS_DIR):
+        self.max_rss_mb = max_rss_mb
+        self.pids_dir = pids_dir
+        self._lock = threading.Lock()
+        self._tracked = {}  # PID raiz (chromedriver) -> {'label': ..., 'processes': [...]}
+        if psutil is None:
+            logger.warning("psutil não instalado: watchdog de recursos do navegador desativado.")
+
+    @property
+    def enabled(self):
+        return psutil is not None
+
+    def track_driver(self, driver, label="driver"):
+        """
+        Passa a acompanhar a árvore de processos do WebDriver (chromedriver e seus Chromes).
+        """
+        if not self.enabled:
+            return
+        try:
+            root_pid = driver.service.process.pid
+        except AttributeError:
+            return
+        cpu_cache = {}
+        processes = process_tree(root_pid, cpu_cache)
+        sample_processes(processes) # Marca o início da medição de CPU de cada processo
+        with self._lock:
+            self._tracked[root_pid] = {'label': label, 'processes': processes, 'cpu_cache': cpu_cache}
+        self._save_pids()
+        driver.watchdog_root_pid = root_pid
+        logger.debug(f"Watchdog acompanhando '{label}' (PID raiz {root_pid})")
+
+    def sample_driver(self, driver):
+        """
+        Amostra RSS/CPU da árvore de processos do WebDriver. Retorna None se não for possível.
+        """
+        root_pid = getattr(driver, 'watchdog_root_pid', None)
+        if not self.enabled or root_pid is None:
+            return None
+        with self._lock:
+            entry = self._tracked.get(root_pid)
+        processes = process_tree(root_pid, entry['cpu_cache'] if entry else None)
+        new_processes = []
+        with self._lock:
+            if root_pid in self._tracked:
+                # Guarda os PIDs vistos para matar os que sobrarem após o quit().
+                known = {p.pid for p in self._tracked[root_pid]['processes']}
+                new_processes = [p for p in processes if p.pid not in known]
+                self._tracked[root_pid]['processes'].extend(new_processes)
+        if new_processes:
+            self._save_pids()
+        return sample_processes(processes)
+
+    def should_recycle(self, sample):
+        return bool(sample) and sample['rss_mb'] >= self.max_rss_mb
+
+    def release_driver(self, driver):
+        """
+        Chamado após `driver.quit()`: encerra qualquer processo da árvore que tenha sobrado.
+        """
+        root_pid = getattr(driver, 'watchdog_root_pid', None)
+        if not self.enabled or root_pid is None:
+            return 0
+        with self._lock:
+            entry = self._tracked.pop(root_pid, None)
+        if not entry:
+            return 0
+        leftovers = {p.pid: p for p in entry['processes'] + process_tree(root_pid)}
+        killed = kill_processes(list(leftovers.values()))
+        self._save_pids()
+        if killed:
+            logger.warning(f"Watchdog: {killed} processos do navegador '{entry['label']}' sobraram após o quit() e foram encerrados")
+        return killed
+
+    def _pids_path(self):
+        return os.path.join(self.pids_dir, f"{os.getpid()}.json")
+
+    def _save_pids(self):
+        """Registra (de forma atômica) os processos acompanhados por este processo do bot; sem nenhum, apaga o registro."""
+        with self._lock:
+            processes = [p for entry in self._tracked.values() for p in entry['processes']]
+        records = [r for r in map(process_record, processes) if r]
+        path = self._pids_path()
+        try:
+            if not records:
+                if os.path.exists(path):
+                    os.remove(path)
+                return
+            os.makedirs(self.pids_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'owner': process_record(psutil.Process()), 'processes': records}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Watchdog: erro ao registrar os processos do navegador: {e}")
+
+    def reap_orphans(self):
+        """
+        Encerra os navegadores registrados por processos do bot que já morreram (ex.: o bot caiu com o Chrome
+        aberto). Só processos que o watchdog registrou e que ainda são os mesmos (PID e horário de criação).
+        """
+        if not self.enabled:
+            return 0
+        try:
+            names = [n for n in os.listdir(self.pids_dir) if n.endswith(".json")]
+        except OSError:
+            return 0
+        orphans = []
+        for name in names:
+            path = os.path.join(self.pids_dir, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                owner = data.get('owner')
+                records = data.get('processes') or []
+            except (OSError, ValueError, AttributeError):
+                continue
+            if find_process(owner or {}) is not None:
+                continue # O processo do bot que registrou os navegadores ainda está rodando
+            orphans.extend(p for p in map(find_process, records) if p is not None)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        killed = kill_processes(orphans)
+        if killed:
+            logger.warning(f"Watchdog: {killed} processos órfãos do navegador encerrados")
+        return killed
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Registro adaptativo de seletores.
+
+Em vez de tentar cada seletor alternativo em sequência (cada um com seu
+próprio timeout), todos os candidatos de um grupo são avaliados juntos em
+uma única condição de espera, com uma só chamada JavaScript por verificação.
+O registro guarda em disco a taxa de acerto e o tempo até o match de cada
+seletor e reordena os candidatos pelo histórico de sucesso.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+from deadline import budget
+
+logger = logging.getLogger(__name__)
+
+SELECTOR_STATS_FILE = "selector_stats.json"
+
+# Avalia todos os XPaths numa única ida ao navegador e devolve o primeiro que satisfaz a condição.
+_RACE_SCRIPT = """
+const xpaths = arguments[0], condition = arguments[1];
+function visible(el) {
+    const style = window.getComputedStyle(el);
+    return el.getClientRects().length > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+}
+for (let i = 0; i < xpaths.length; i++) {
+    let result;
+    try {
+        result = document.evaluate(xpaths[i], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    } catch (e) { continue; }
+    for (let j = 0; j < result.snapshotLength; j++) {
+        const el = result.snapshotItem(j);
+        if (condition === 'present') return [i, el];
+        if (!visible(el)) continue;
+        if (condition === 'clickable' && (el.disabled || el.getAttribute('aria-disabled') === 'true')) continue;
+        return [i, el];
+    }
+}
+return null;
+"""
+
+
+class SelectorRegistry:
+    """
+    Mantém estatísticas por grupo de seletores e executa a espera combinada.
+
+    Args:
+        path (str): Arquivo JSON onde as estatísticas são persistidas.
+    """
+    def __init__(self, path=SELECTOR_STATS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats = {}  # grupo -> seletor -> {'hits', 'misses', 'avg_ms'}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._stats = json.load(f)
+            except Exception as e:
+                logger.error(f"Erro ao carregar estatísticas de seletores ({path}): {e}")
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._stats, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Erro ao salvar estatísticas de seletores: {e}")
+
+    def _entry(self, group, selector):
+        return self._stats.setdefault(group, {}).setdefault(selector, {'hits': 0, 'misses': 0, 'avg_ms': None})
+
+    def ordered(self, group, candidates):
+        """
+        Retorna os candidatos ordenados pelo histórico: maior taxa de acerto primeiro e, no empate,
+        o mais rápido. Seletores sem histórico mantêm a ordem original.
+        """
+        with self._lock:
+            group_stats = self._stats.get(group, {})
+
+            def score(item):
+                index, selector = item
+                entry = group_stats.get(selector)
+                if not entry:
+                    return (-0.5, float('inf'), index)
+                # Suavização de Laplace: um único acerto não supera um histórico longo.
+                rate = (entry['hits'] + 1) / (entry['hits'] + entry['misses'] + 2)
+                avg_ms = entry['avg_ms'] if entry['avg_ms'] is not None else float('inf')
+                return (-rate, avg_ms, index)
+
+            return [selector for _, selector in sorted(enumerate(candidates), key=score)]
+
+    def _hit_locked(self, group, selector, elapsed_seconds):
+        entry = self._entry(group, selector)
+        entry['hits'] += 1
+        elapsed_ms = round(elapsed_seconds * 1000, 1)
+        # Média móvel exponencial para acompanhar mudanças recentes da página.
+        entry['avg_ms'] = elapsed_ms if entry['avg_ms'] is None else round(0.7 * entry['avg_ms'] + 0.3 * elapsed_ms, 1)
+
+    def record_hit(self, group, selector, elapsed_seconds):
+        with self._lock:
+            self._hit_locked(group, selector, elapsed_seconds)
+            self._save()
+
+    def record_miss(self, group, selector):
+        with self._lock:
+            self._entry(group, selector)['misses'] += 1
+            self._save()
+
+    def wait_for_any(self, driver, group, candidates, condition='clickable', timeout=30, poll_frequency=0.2):
+        """
+        Espera até que QUALQUER um dos seletores XPath satisfaça a condição.
+
+        Args:
+            driver (webdriver.Chrome): A instância do WebDriver.
+            group (str): Nome do grupo de seletores (chave das estatísticas).
+            candidates (list): XPaths alternativos.
+            condition (str): 'present', 'visible' ou 'clickable'.
+            timeout (float): Tempo máximo de espera para o grupo inteiro (limitado ao prazo do ciclo).
+
+        Returns:
+            tuple: (elemento, seletor vencedor).
+        Raises:
+            TimeoutException: Se nenhum candidato satisfizer a condição a tempo.
+        """
+        # Importado aqui: o Selenium só é carregado quando há um navegador de fato.
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        ordered = self.ordered(group, candidates)
+        timeout = budget(timeout)
+        started = time.monotonic()
+
+        def any_candidate(drv):
+            result = drv.execute_script(_RACE_SCRIPT, ordered, condition)
+            return (result[1], ordered[result[0]]) if result else False
+
+        try:
+            element, selector = WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(any_candidate)
+        except TimeoutException:
+            with self._lock:
+                for candidate in ordered:
+                    self._entry(group, candidate)['misses'] += 1
+                self._save()
+            raise TimeoutException(f"Nenhum seletor do grupo '{group}' encontrado em {timeout:.1f}s")
+
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self._hit_locked(group, selector, elapsed)
+            # Os candidatos à frente do vencedor na ordem atual não casaram: contam como falha.
+            for candidate in ordered[:ordered.index(selector)]:
+                self._entry(group, candidate)['misses'] += 1
+            self._save()
+        logger.info(f"Seletor '{group}' encontrado em {elapsed:.2f}s: {selector}")
+        return element, selector
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de longa duração (soak) do ciclo do bot, para achar vazamentos antes da produção.
+
+Roda milhares de ciclos do BotController pelo agendador de verdade, com o
+relógio acelerado (cada ciclo termina e o relógio avança um intervalo inteiro)
+e com navegador, trends, Gemini e postagem simulados localmente. O navegador
+simulado é um processo filho real e grava screenshots em disco, como o Chrome.
+
+A cada N ciclos mede o heap do Python (tracemalloc), as threads, os descritores
+de arquivo abertos, os processos filhos e o espaço em disco usado. Ao final,
+calcula a tendência de cada métrica (após o aquecimento) e falha se alguma
+cresce acima do tolerado por 1000 ciclos.
+
+Uso:
+    python soak.py                                   # 2000 ciclos, amostra a cada 100
+    python soak.py --cycles 5000 --sample-every 250 --failure-rate 0.2
+"""
+
+import argparse
+import gc
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+try:
+    import psutil
+except ImportError:  # Sem psutil, descritores vêm de /proc e os processos filhos não são medidos.
+    psutil = None
+
+logger = logging.getLogger("soak")
+
+# Crescimento máximo tolerado por 1000 ciclos (inclinação da tendência após o aquecimento).
+GROWTH_LIMITS = {
+    'heap_kb': 512,
+    'threads': 1,
+    'fds': 1,
+    'children': 1,
+    'disk_kb': 256,
+}
+WARMUP_FRACTION = 0.25 # Fração inicial das amostras ignorada (caches, imports tardios, backlog enchendo)
+
+# PNG 1x1 gravado como screenshot pelo navegador simulado.
+FAKE_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d4944415478da63f8ffff3f0005fe02fea7d6a4a50000000049454e44ae426082"
+)
+TREND_POOL = [f"#Trend{i}" for i in range(200)]
+SOAK_WORDS = [f"palavra{i}" for i in range(500)]
+
+
+class VirtualClock:
+    """
+    Relógio do agendador controlado pelo teste: só anda quando `advance` é chamado.
+    """
+    def __init__(self):
+        self._now = datetime.now()
+        self._lock = threading.Lock()
+
+    def now(self):
+        with self._lock:
+            return self._now
+
+    def advance(self, seconds):
+        with self._lock:
+            self._now += timedelta(seconds=seconds)
+
+
+class FakeDriver:
+    """
+    WebDriver simulado: um processo filho de verdade (acompanhado pelo watchdog) e screenshots em disco.
+    """
+    def __init__(self):
+        process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(3600)"])
+        self.service = SimpleNamespace(process=process)
+        self.current_url = "about:blank"
+
+    def save_screenshot(self, path):
+        with open(path, "wb") as f:
+            f.write(FAKE_PNG)
+        return True
+
+    def quit(self):
+        self.service.process.terminate()
+        self.service.process.wait(timeout=5)
+
+
+class FakeWorld:
+    """
+    Trends, Gemini e postagem simulados, com falhas aleatórias para exercitar os caminhos de erro.
+    """
+    def __init__(self, screenshot_dir, failure_rate=0.1, seed=0):
+        self.screenshot_dir = screenshot_dir
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _fails(self):
+        with self._lock:
+            return self.rng.random() < self.failure_rate
+
+    def _screenshot(self, driver, prefix):
+        driver.save_screenshot(os.path.join(self.screenshot_dir, f"{prefix}_{time.time_ns()}.png"))
+
+    def select_trends(self, driver):
+        driver.current_url = "https://x.com/explore/tabs/trending"
+        if self._fails():
+            self._screenshot(driver, "no_trends")
+            return []
+        self._screenshot(driver, "trends_success")
+        with self._lock:
+            return self.rng.sample(TREND_POOL, 20)
+
+    def generate(self, trend_topic, custom_prompt=None):
+        if self._fails():
+            return None
+        # Textos variados: o índice de conteúdo descarta os parecidos, como faria com o Gemini repetindo.
+        with self._lock:
+            words = self.rng.choices(SOAK_WORDS, k=25)
+        return f"Tweet simulado sobre {trend_topic}: " + " ".join(words)
+
+    def post(self, driver, tweet_content):
+        driver.current_url = "https://x.com/compose/post"
+        if self._fails():
+            self._screenshot(driver, "post_error")
+            raise RuntimeError("falha simulada na postagem")
+        self._screenshot(driver, "tweet_success")
+        return True
+
+
+def open_fds():
+    if psutil is not None and hasattr(psutil.Process, "num_fds"):
+        return psutil.Process().num_fds()
+    if os.path.isdir("/proc/self/fd"):
+        return len(os.listdir("/proc/self/fd"))
+    return None
+
+
+def child_processes():
+    if psutil is None:
+        return None
+    return len(psutil.Process().children(recursive=True))
+
+
+def disk_usage(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try: total += os.path.getsize(os.path.join(root, name))
+            except OSError: pass
+    return total
+
+
+def sample_metrics(workdir):
+    gc.collect()
+    return {
+        'heap_kb': tracemalloc.get_traced_memory()[0] / 1024,
+        'threads': threading.active_count(),
+        'fds': open_fds(),
+        'children': child_processes(),
+        'disk_kb': disk_usage(workdir) / 1024,
+    }
+
+
+def growth_per_1000(samples, metric):
+    """
+    Inclinação (mínimos quadrados) da métrica por 1000 ciclos, ignorando o aquecimento.
+    """
+    points = [(s['cycle'], s[metric]) for s in samples if s[metric] is not None]
+    points = points[int(len(points) * WARMUP_FRACTION):]
+    if len(points) < 3:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return None
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+    return slope * 1000
+
+
+def build_controller(bot_core, workdir, world, clock):
+    """
+    BotController com o navegador, as fontes e os backends substituídos pelos simulados e o estado em `workdir`.
+    """
+    import trend_selector
+    from content_index import ContentIndex
+    from trend_sources import TrendMerger, SeleniumTrendSource
+    from posters import build_poster
+    from circuit_breaker import BREAKERS, trends_breaker
+
+    bot_core.SCREENSHOT_DIR = world.screenshot_dir
+    bot_core.resource_watchdog.pids_dir = os.path.join(workdir, "browser_pids")
+    # Limites reduzidos para que históricos, amostras, screenshots e o diário atinjam o teto logo no aquecimento;
+    # com os limites de produção, estruturas limitadas ainda enchendo pareceriam vazamentos.
+    bot_core.STATS_HISTORY_LIMIT = 100
+    bot_core.SCREENSHOT_KEEP = 20
+    bot_core.RESOURCE_SAMPLES_LIMIT = 20
+    trend_selector.TREND_STATS_MAX_ENTRIES = 20
+    bot_core.init_driver = lambda profile_path_arg: FakeDriver()
+    bot_core.get_tweet_content_from_gemini = world.generate
+    for breaker in BREAKERS:
+        breaker.probe_interval = 0 # O relógio dos circuitos não é acelerado; testa de novo a cada ciclo
+
+    controller = bot_core.BotController(interval=bot_core.MIN_INTERVAL_MINUTES, state_dir=workdir)
+    controller.clock = clock.now
+    controller.scheduler_tick = 0.005
+    controller.content_index = ContentIndex(path=os.path.join(workdir, "content_index.json"), max_entries=50)
+    controller.journal.compact_bytes = 16 * 1024
+    controller.resume_state = None
+    controller.trend_merger = TrendMerger([SeleniumTrendSource(controller.get_current_driver, world.select_trends, trends_breaker)])
+    # Nunca posta de verdade, mesmo com credenciais da API no .env.
+    controller.api_poster = None
+    controller.selenium_poster.post_fn = world.post
+    controller.tweet_poster = build_poster({'selenium': controller.selenium_poster}, order="selenium")
+    return controller
+
+
+def run_soak(cycles, sample_every, failure_rate, seed=0):
+    tracemalloc.start()
+    import bot_core
+
+    with tempfile.TemporaryDirectory() as workdir:
+        screenshot_dir = os.path.join(workdir, "screenshots")
+        os.makedirs(screenshot_dir)
+        clock = VirtualClock()
+        world = FakeWorld(screenshot_dir, failure_rate, seed)
+        controller = build_controller(bot_core, workdir, world, clock)
+
+        cycle_done = threading.Event()
+        controller.listeners.append(cycle_done.set)
+        samples = []
+        started = time.monotonic()
+        controller.start()
+        try:
+            for cycle in range(1, cycles + 1):
+                if not cycle_done.wait(timeout=120):
+                    raise RuntimeError(f"Ciclo {cycle} não terminou em 120s")
+                cycle_done.clear()
+                if cycle % sample_every == 0:
+                    time.sleep(0.05) # Deixa a thread do ciclo terminar antes de medir
+                    sample = dict(sample_metrics(workdir), cycle=cycle)
+                    samples.append(sample)
+                    print(f"ciclo {cycle:6d} | heap {sample['heap_kb']:9.0f} KB | threads {sample['threads']:3d} | "
+                          f"fds {sample['fds'] if sample['fds'] is not None else '-':>4} | "
+                          f"filhos {sample['children'] if sample['children'] is not None else '-':>3} | "
+                          f"disco {sample['disk_kb']:8.0f} KB | {time.monotonic() - started:6.0f}s")
+                # Avança o relógio do agendador um intervalo inteiro: o próximo ciclo começa no próximo tick.
+                clock.advance(controller.interval * 60)
+        finally:
+            controller.stop()
+            controller.close_current_driver()
+            tracemalloc.stop()
+
+    print(f"\n{controller.stats.total_tweets} ciclos ({controller.stats.successful_tweets} sucessos) "
+          f"em {time.monotonic() - started:.0f}s. Crescimento por 1000 ciclos após o aquecimento:")
+    failed = []
+    for metric, limit in GROWTH_LIMITS.items():
+        growth = growth_per_1000(samples, metric)
+        if growth is None:
+            print(f"  {metric:9s} sem dados suficientes")
+            continue
+        ok = growth <= limit
+        print(f"  {metric:9s} {growth:+10.2f} (limite {limit}) {'ok' if ok else 'CRESCIMENTO SEM LIMITE'}")
+        if not ok: failed.append(metric)
+    if failed:
+        print(f"FALHOU: {', '.join(failed)}")
+        return 1
+    print("OK: nenhum crescimento sem limite detectado")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de longa duração (vazamentos) do ciclo do bot.")
+    parser.add_argument("--cycles", type=int, default=2000)
+    parser.add_argument("--sample-every", type=int, default=100, help="ciclos entre medições")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="probabilidade de falha em cada etapa simulada")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="mostra os logs do bot")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    return run_soak(args.cycles, args.sample_every, args.failure_rate, args.seed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Novas tentativas por etapa do ciclo, dentro da mesma sessão do navegador.
+
+Uma falha passageira (modal inesperado, overlay por cima de um botão, página
+que não terminou de carregar) não precisa custar o ciclo inteiro, com o
+navegador já aberto e o texto já gerado. Cada etapa roda sob uma política:
+quantas tentativas, a pausa entre elas (com backoff exponencial e dentro do
+prazo do ciclo) e quais erros valem uma nova tentativa. Entre as tentativas
+roda um passo de recuperação leve (ex.: fechar modais), na mesma sessão; o
+que a etapa recebeu (driver, texto gerado) é o mesmo em todas as tentativas.
+
+Configuração (.env):
+    STAGE_RETRY_ATTEMPTS          tentativas por etapa, contando a primeira (padrão 3)
+    STAGE_RETRY_BACKOFF_SECONDS   pausa antes da segunda tentativa; dobra a cada nova (padrão 2)
+"""
+
+import logging
+import os
+import threading
+
+from circuit_breaker import CircuitOpenError, RequestRejected
+from deadline import DeadlineExceeded, current_deadline, deadline_sleep
+
+logger = logging.getLogger(__name__)
+
+STAGE_RETRY_ATTEMPTS = int(os.getenv("STAGE_RETRY_ATTEMPTS", "3"))
+STAGE_RETRY_BACKOFF_SECONDS = float(os.getenv("STAGE_RETRY_BACKOFF_SECONDS", "2"))
+# Nunca repetidos: falta de tempo, circuito aberto e recusa explícita não mudam com outra tentativa.
+NEVER_RETRY = (DeadlineExceeded, CircuitOpenError, RequestRejected)
+
+
+class RetryPolicy:
+    """
+    Política de novas tentativas de uma etapa.
+
+    Args:
+        attempts (int): Tentativas, contando a primeira.
+        backoff_seconds (float): Pausa antes da segunda tentativa; multiplicada por `backoff_factor` a cada nova.
+        retry_on (tuple): Exceções que valem uma nova tentativa.
+        give_up_on (tuple): Exceções que encerram a etapa na hora (têm precedência sobre `retry_on`).
+        retry_empty (bool): Resultado vazio (ex.: nenhuma trend encontrada) também vale uma nova tentativa.
+    """
+    def __init__(self, attempts=STAGE_RETRY_ATTEMPTS, backoff_seconds=STAGE_RETRY_BACKOFF_SECONDS, backoff_factor=2.0,
+                 retry_on=(Exception,), give_up_on=(), retry_empty=False):
+        self.attempts = max(1, attempts)
+        self.backoff_seconds = backoff_seconds
+        self.backoff_factor = backoff_factor
+        self.retry_on = tuple(retry_on)
+        self.give_up_on = NEVER_RETRY + tuple(give_up_on)
+        self.retry_empty = retry_empty
+
+    def should_retry(self, error):
+        return isinstance(error, self.retry_on) and not isinstance(error, self.give_up_on)
+
+    def delay(self, attempt):
+        """Pausa depois da tentativa `attempt` (a partir de 1)."""
+        return self.backoff_seconds * self.backoff_factor ** (attempt - 1)
+
+
+class StageRunner:
+    """
+    Executa etapas sob uma política, com recuperação entre as tentativas, e conta o desfecho de cada etapa.
+    Seguro entre threads.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {} # etapa -> {'runs', 'retries', 'recovered', 'failed'}
+
+    def run(self, stage, fn, policy, recover=None):
+        """
+        Executa `fn()` até dar certo ou a política se esgotar; entre as tentativas chama `recover(erro)`.
+        Se `recover` levantar exceção (ex.: a sessão do navegador morreu), a etapa desiste.
+
+        Returns:
+            O resultado de `fn` (com `retry_empty`, o resultado vazio da última tentativa).
+        Raises:
+            O erro da última tentativa.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            error, result = None, None
+            try:
+                result = fn()
+            except Exception as e:
+                error = e
+            if error is None and (result or not policy.retry_empty):
+                self._count(stage, attempt, failed=False)
+                if attempt > 1:
+                    logger.info(f"✓ Etapa '{stage}' concluída na tentativa {attempt}/{policy.attempts}")
+                return result
+            if not self._prepare_retry(stage, attempt, policy, error, recover):
+                self._count(stage, attempt, failed=True)
+                if error is not None:
+                    raise error
+                return result
+
+    def _prepare_retry(self, stage, attempt, policy, error, recover):
+        """Decide se vale outra tentativa e, se sim, recupera a página e espera o backoff."""
+        reason = error or "resultado vazio"
+        if attempt >= policy.attempts or (error is not None and not policy.should_retry(error)):
+            return False
+        delay = policy.delay(attempt)
+        deadline = current_deadline()
+        if deadline and deadline.remaining() <= delay:
+            logger.warning(f"Etapa '{stage}' falhou ({reason}); sem tempo no ciclo para outra tentativa")
+            return False
+        logger.warning(f"Etapa '{stage}' falhou na tentativa {attempt}/{policy.attempts} ({reason}); "
+                       f"recuperando e tentando de novo em {delay:.0f}s")
+        if recover is not None:
+            try:
+                recover(error)
+            except Exception as e:
+                logger.warning(f"Recuperação da etapa '{stage}' falhou ({e}); desistindo da etapa")
+                return False
+        deadline_sleep(delay)
+        return True
+
+    def _count(self, stage, attempts, failed):
+        with self._lock:
+            counters = self._counters.setdefault(stage, {'runs': 0, 'retries': 0, 'recovered': 0, 'failed': 0})
+            counters['runs'] += 1
+            counters['retries'] += attempts - 1
+            if failed:
+                counters['failed'] += 1
+            elif attempts > 1:
+                counters['recovered'] += 1
+
+    def summary(self):
+        with self._lock:
+            return {stage: dict(counters) for stage, counters in self._counters.items()}
+
+
+# Compartilhado pelas etapas do navegador (trends e postagem), no ciclo e no lote.
+stage_runner = StageRunner()
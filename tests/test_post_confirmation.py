@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Confirmação de postagem pelos eventos de rede, com um driver falso que devolve o log de performance.
+"""
+
+import json
+import unittest
+
+from post_confirmation import wait_for_post_confirmation
+
+CREATE_URL = "https://x.com/i/api/graphql/abc/CreateTweet"
+
+
+def created(post_id):
+    return json.dumps({"data": {"create_tweet": {"tweet_results": {"result": {"rest_id": post_id}}}}})
+
+
+def create_post_events(request_id, webview, status=200):
+    """Eventos de uma requisição de criação de post, no formato do log de performance do chromedriver."""
+    messages = [
+        {"method": "Network.requestWillBeSent",
+         "params": {"requestId": request_id, "request": {"method": "POST", "url": CREATE_URL}}},
+        {"method": "Network.responseReceived", "params": {"requestId": request_id, "response": {"status": status}}},
+        {"method": "Network.loadingFinished", "params": {"requestId": request_id}},
+    ]
+    return [{"message": json.dumps({"message": m, "webview": webview})} for m in messages]
+
+
+class FakeDriver:
+    def __init__(self, entries, bodies, window_handle="OWN-TAB"):
+        self.batches = [entries]
+        self.bodies = bodies
+        self.current_window_handle = window_handle
+
+    def get_log(self, kind):
+        return self.batches.pop(0) if self.batches else []
+
+    def execute_cdp_cmd(self, command, params):
+        return {"body": self.bodies[params["requestId"]]}
+
+
+class WaitForPostConfirmationTest(unittest.TestCase):
+    def test_ignores_post_created_by_another_tab(self):
+        entries = create_post_events("foreign.1", "OTHER-TAB") + create_post_events("own.1", "OWN-TAB")
+        driver = FakeDriver(entries, {"foreign.1": created("111"), "own.1": created("222")})
+        result = wait_for_post_confirmation(driver, timeout=1, poll_interval=0.01)
+        self.assertTrue(result.confirmed)
+        self.assertEqual(result.post_id, "222")
+
+    def test_only_foreign_tab_post_is_not_a_confirmation(self):
+        driver = FakeDriver(create_post_events("foreign.1", "OTHER-TAB"), {"foreign.1": created("111")})
+        result = wait_for_post_confirmation(driver, timeout=0.2, poll_interval=0.01)
+        self.assertFalse(result.observed)
+        self.assertFalse(result.confirmed)
+        self.assertIsNone(result.post_id)
+
+    def test_events_without_webview_are_accepted(self):
+        driver = FakeDriver(create_post_events("own.1", None), {"own.1": created("222")})
+        result = wait_for_post_confirmation(driver, timeout=1, poll_interval=0.01)
+        self.assertEqual(result.post_id, "222")
+
+
+if __name__ == "__main__":
+    unittest.main()
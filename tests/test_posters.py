@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Backends de postagem contra um servidor stub local da API (X_API_BASE_URL).
+
+Rodar da raiz do projeto:
+    python -m pytest tests        (ou: python -m unittest discover tests)
+"""
+
+import json
+import socket
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from posters import ApiPoster, FailoverPoster, PostOutcomeUnknown, TweetPoster
+
+
+class StubApiHandler(BaseHTTPRequestHandler):
+    """Responde a POST /2/tweets conforme `server.mode`."""
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        text = json.loads(self.rfile.read(length) or b"{}").get("text")
+        self.server.received.append(text)
+        mode = self.server.mode
+        if mode == "hang":
+            time.sleep(1.5) # Mais que o timeout do cliente: a resposta nunca chega
+            return
+        if mode == "drop":
+            self.close_connection = True # Fecha a conexão sem responder (RemoteDisconnected no cliente)
+            return
+        status, body = {
+            "ok": (201, json.dumps({"data": {"id": "1001", "text": text}})),
+            "garbage": (201, "<html>ok</html>"),
+            "duplicate": (403, json.dumps({"detail": "You are not allowed to create a Tweet with duplicate content."})),
+            "unavailable": (503, json.dumps({"title": "Service Unavailable"})),
+        }[mode]
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RecordingPoster(TweetPoster):
+    """Backend de reserva que só anota o que recebeu."""
+    name = "selenium"
+
+    def __init__(self):
+        super().__init__()
+        self.texts = []
+
+    def _post(self, text):
+        self.texts.append(text)
+        return True
+
+
+def closed_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class ApiPosterStubServerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubApiHandler)
+        self.server.daemon_threads = True
+        self.server.block_on_close = False
+        self.server.mode = "ok"
+        self.server.received = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.api = self.make_api(f"http://127.0.0.1:{self.server.server_address[1]}")
+        self.fallback = RecordingPoster()
+        self.poster = FailoverPoster([self.api, self.fallback])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.api.close()
+
+    def make_api(self, base_url):
+        return ApiPoster("key", "secret", "token", "token-secret", base_url=base_url, timeout=0.5)
+
+    def test_success_returns_post_id(self):
+        self.assertTrue(self.poster.post("olá"))
+        self.assertEqual(self.poster.last_post_id, "1001")
+        self.assertEqual(self.poster.last_backend, "api")
+        self.assertEqual(self.server.received, ["olá"])
+        self.assertEqual(self.fallback.texts, [])
+
+    def test_sent_without_response_is_not_posted_again(self):
+        self.server.mode = "hang"
+        with self.assertRaises(PostOutcomeUnknown):
+            self.poster.post("olá")
+        self.assertEqual(self.server.received, ["olá"])
+        self.assertEqual(self.fallback.texts, [])
+
+    def test_connection_dropped_after_send_is_not_posted_again(self):
+        self.server.mode = "drop"
+        with self.assertRaises(PostOutcomeUnknown):
+            self.poster.post("olá")
+        self.assertEqual(self.fallback.texts, [])
+
+    def test_unreadable_success_response_is_not_posted_again(self):
+        self.server.mode = "garbage"
+        with self.assertRaises(PostOutcomeUnknown):
+            self.poster.post("olá")
+        self.assertEqual(self.fallback.texts, [])
+
+    def test_rejected_content_does_not_fail_over(self):
+        self.server.mode = "duplicate"
+        self.assertFalse(self.poster.post("olá"))
+        self.assertTrue(self.poster.last_rejected)
+        self.assertEqual(self.fallback.texts, [])
+
+    def test_service_error_fails_over(self):
+        self.server.mode = "unavailable"
+        self.assertTrue(self.poster.post("olá"))
+        self.assertEqual(self.poster.last_backend, "selenium")
+        self.assertEqual(self.fallback.texts, ["olá"])
+
+    def test_connection_refused_fails_over(self):
+        self.api.base_url = f"http://127.0.0.1:{closed_port()}"
+        self.assertTrue(self.poster.post("olá"))
+        self.assertEqual(self.fallback.texts, ["olá"])
+        self.assertEqual(self.api.failures, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
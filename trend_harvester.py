@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Coleta de trends de vários locales/regiões numa única sessão do navegador.
+
+Cada visão da página Explorar (um idioma via `?lang=`, ou uma URL própria) é
+aberta numa aba, e todas as navegações são disparadas sem esperar o
+carregamento, para que as páginas carreguem em paralelo. Depois uma única
+passada lê as trends de todas as abas: primeiro pelas respostas de rede
+(log de performance, separado por aba), e, para as abas que não tiveram a
+resposta capturada, por uma extração no DOM feita com um só script por aba.
+
+Configuração (TREND_LOCALES no .env), separada por vírgulas:
+    pt-BR,en,es                              idiomas da página Explorar
+    pt-BR,jp=https://x.com/explore/tabs/trending?lang=ja   nome=URL para visões próprias
+"""
+
+import json
+import logging
+import os
+import time
+
+from deadline import budget
+from network_trends import EXPLORE_RESPONSE_MARKERS, drain_network_events, parse_trends_from_payload, read_network_events
+
+logger = logging.getLogger(__name__)
+
+TREND_LOCALES = os.getenv("TREND_LOCALES", "")
+
+# Extração no DOM numa única chamada ao WebDriver por aba (mesmo critério das estratégias de bot_core:
+# textos que começam com '#', dentro das células de trend ou, sem elas, no conteúdo principal).
+_EXTRACT_TRENDS_JS = """
+const cells = document.querySelectorAll('[data-testid="trend"]');
+const spans = cells.length ? Array.from(cells).flatMap(c => Array.from(c.querySelectorAll('span')))
+                           : Array.from(document.querySelectorAll('main span'));
+const seen = new Set(), out = [];
+for (const span of spans) {
+  const text = (span.textContent || '').trim().split(/\\s/)[0];
+  if (text.length > 1 && text.startsWith('#') && !seen.has(text)) { seen.add(text); out.push(text); }
+}
+return out.slice(0, arguments[0]);
+"""
+
+
+def parse_locale_views(spec, trends_url):
+    """
+    Converte TREND_LOCALES em [(nome, url)]. Retorna lista vazia se não configurado.
+    """
+    views = []
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, url = item.partition("=")
+        if sep:
+            views.append((name.strip(), url.strip()))
+        else:
+            separator = "&" if "?" in trends_url else "?"
+            views.append((item, f"{trends_url}{separator}lang={item}"))
+    return views
+
+
+def interleave(trends_by_view, limit=20):
+    """
+    Junta as listas por visão alternando entre elas (1ª de cada, 2ª de cada...), sem repetir trends.
+    """
+    merged, seen = [], set()
+    lists = list(trends_by_view.values())
+    for position in range(max((len(l) for l in lists), default=0)):
+        for trends in lists:
+            if position < len(trends) and trends[position] not in seen:
+                seen.add(trends[position]); merged.append(trends[position])
+    return merged[:limit]
+
+
+def _open_tabs(driver, views):
+    """
+    Abre uma aba por visão (a primeira reutiliza a aba atual) e dispara as navegações sem esperar o carregamento.
+
+    Returns:
+        dict: handle da aba -> nome da visão, na ordem das visões.
+    """
+    tabs = {}
+    for index, (name, url) in enumerate(views):
+        if index:
+            driver.switch_to.new_window('tab')
+        driver.execute_script("window.location.href = arguments[0];", url)
+        tabs[driver.current_window_handle] = name
+    return tabs
+
+
+def _read_from_network(driver, tabs, results, timeout, poll_interval=0.25):
+    """
+    Lê as respostas de trends das abas a partir do log de performance, até todas terem trends ou o tempo acabar.
+    """
+    wait_until = time.monotonic() + budget(timeout)
+    pending = {}  # (aba, requestId) -> URL
+    while time.monotonic() < wait_until and len(results) < len(tabs):
+        for event in read_network_events(driver):
+            params = event.get("params", {})
+            handle = event.get("webview")
+            if handle not in tabs or tabs[handle] in results:
+                continue
+            key = (handle, params.get("requestId"))
+            if event.get("method") == "Network.responseReceived":
+                url = params.get("response", {}).get("url", "")
+                if any(marker in url for marker in EXPLORE_RESPONSE_MARKERS):
+                    pending[key] = url
+            elif event.get("method") == "Network.loadingFinished" and key in pending:
+                url = pending.pop(key)
+                try:
+                    # O corpo só pode ser lido pela sessão CDP da aba que fez a requisição.
+                    driver.switch_to.window(handle)
+                    body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": key[1]})
+                    trends = parse_trends_from_payload(json.loads(body.get("body", "")))
+                except Exception as e:
+                    logger.debug(f"Não foi possível ler a resposta de {tabs[handle]} ({url.split('?')[0]}): {e}")
+                    continue
+                if trends:
+                    results[tabs[handle]] = [t['name'] for t in trends]
+        time.sleep(poll_interval)
+
+
+def _read_from_dom(driver, tabs, results, timeout, limit, poll_interval=0.5):
+    """
+    Para as abas ainda sem trends, extrai do DOM (um script por aba a cada rodada) até o tempo acabar.
+    """
+    wait_until = time.monotonic() + budget(timeout)
+    while time.monotonic() < wait_until:
+        missing = [(h, n) for h, n in tabs.items() if n not in results]
+        if not missing:
+            return
+        for handle, name in missing:
+            try:
+                driver.switch_to.window(handle)
+                trends = driver.execute_script(_EXTRACT_TRENDS_JS, limit)
+            except Exception as e:
+                logger.debug(f"Erro ao extrair trends de {name} no DOM: {e}")
+                continue
+            if trends:
+                results[name] = trends
+        time.sleep(poll_interval)
+
+
+def harvest_trends(driver, views, timeout=30, limit=20):
+    """
+    Carrega as visões em abas paralelas e retorna as trends de cada uma.
+
+    Args:
+        driver: WebDriver do ciclo (ao final, fica de volta na primeira aba; as demais são fechadas).
+        views (list): [(nome, url)], ver parse_locale_views.
+        timeout (float): Tempo máximo total (limitado ao prazo do ciclo).
+
+    Returns:
+        dict: nome da visão -> lista de trends (visões sem trends ficam de fora), na ordem das visões.
+    """
+    if not views:
+        return {}
+    started = time.monotonic()
+    drain_network_events(driver)
+    tabs = _open_tabs(driver, views)
+    results = {}
+    try:
+        _read_from_network(driver, tabs, results, timeout / 2)
+        _read_from_dom(driver, tabs, results, max(0.0, timeout - (time.monotonic() - started)), limit)
+    finally:
+        handles = list(tabs)
+        for handle in handles[1:]:
+            try:
+                driver.switch_to.window(handle); driver.close()
+            except Exception as e:
+                logger.debug(f"Erro ao fechar a aba {tabs[handle]}: {e}")
+        try: driver.switch_to.window(handles[0])
+        except Exception as e: logger.debug(f"Erro ao voltar para a primeira aba: {e}")
+    ordered = {name: results[name][:limit] for name, _ in views if name in results}
+    logger.info(f"Trends de {len(ordered)}/{len(views)} locales em {time.monotonic() - started:.1f}s: "
+                + "; ".join(f"{name}: {len(trends)}" for name, trends in ordered.items()))
+    return ordered
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Escolha de trends guiada pelo histórico de resultados.
+
+Para cada trend são guardados sucessos e falhas causadas pela própria trend
+(prompt recusado pelo Gemini, texto repetido, post recusado pelo X; nunca
+falhas do navegador, da rede ou de circuitos abertos), com decaimento
+exponencial: um resultado de ontem pesa menos que um de agora e, com o
+tempo, uma trend volta à estimativa neutra. Trends com falhas
+seguidas ficam bloqueadas por um tempo; as demais são sorteadas com peso igual
+à chance estimada de sucesso, por uma tabela alias (montada uma vez por lista
+de trends, sorteio em O(1)).
+
+O histórico também alimenta o pool de trends de reserva (usado quando nenhuma
+fonte retorna trends): as trends com mais sucessos recentes, completadas pela
+lista fixa enquanto o histórico é pequeno.
+
+Configuração (.env):
+    TREND_HALF_LIFE_HOURS     meia-vida dos resultados registrados (padrão 72)
+    TREND_BLOCK_FAILURES      falhas seguidas que bloqueiam uma trend (padrão 3)
+    TREND_BLOCK_HOURS         duração do bloqueio (padrão 24)
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+TREND_STATS_FILE = "trend_stats.json"
+TREND_HALF_LIFE_HOURS = float(os.getenv("TREND_HALF_LIFE_HOURS", "72"))
+TREND_BLOCK_FAILURES = int(os.getenv("TREND_BLOCK_FAILURES", "3"))
+TREND_BLOCK_HOURS = float(os.getenv("TREND_BLOCK_HOURS", "24"))
+TREND_STATS_MAX_ENTRIES = 2000
+FALLBACK_POOL_SIZE = 20
+_FORGET_BELOW = 0.01 # Peso decaído abaixo do qual uma trend sem bloqueio é esquecida
+
+
+class AliasSampler:
+    """
+    Sorteio ponderado pelo método alias (Vose): montagem em O(n), cada sorteio em O(1).
+
+    Args:
+        items (list): Itens a sortear.
+        weights (list): Pesos não negativos, na mesma ordem (todos zero = sorteio uniforme).
+    """
+    def __init__(self, items, weights, rng=None):
+        self.items = list(items)
+        self.rng = rng or random.Random()
+        n = len(self.items)
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights] if total > 0 else [1.0] * n
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s], self.alias[s] = scaled[s], l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large: # Sobras por arredondamento ficam com probabilidade 1
+            self.prob[i] = 1.0
+
+    def sample(self):
+        i = self.rng.randrange(len(self.items))
+        return self.items[i] if self.rng.random() < self.prob[i] else self.items[self.alias[i]]
+
+    def sample_distinct(self, k):
+        """
+        Até `k` itens distintos, sorteados por peso (sorteia de novo ao repetir; completa na ordem se demorar).
+        """
+        k = min(k, len(self.items))
+        chosen = []
+        for _ in range(k * 20):
+            if len(chosen) >= k: break
+            item = self.sample()
+            if item not in chosen: chosen.append(item)
+        chosen.extend([i for i in self.items if i not in chosen][:k - len(chosen)])
+        return chosen
+
+
+class TrendSelector:
+    """
+    Estatísticas de resultado por trend (com decaimento), bloqueio de trends ruins e sorteio ponderado.
+    Persistido em JSON e seguro entre threads.
+    """
+    def __init__(self, path=TREND_STATS_FILE, half_life_hours=TREND_HALF_LIFE_HOURS,
+                 block_failures=TREND_BLOCK_FAILURES, block_hours=TREND_BLOCK_HOURS, rng=None):
+        self.path = path
+        self.half_life_seconds = half_life_hours * 3600
+        self.block_failures = block_failures
+        self.block_seconds = block_hours * 3600
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._stats = {}         # trend em minúsculas -> {'name', 'successes', 'failures', 'updated_at', 'streak', 'last_failure_at', 'last_error'}
+        self._version = 0        # Muda a cada resultado registrado: invalida o sorteador em cache
+        self._sampler_key = None # (trends candidatas, versão) do sorteador em cache
+        self._sampler = None
+        self._load()
+
+    # --- Persistência ---
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._stats = json.load(f).get('trends', {})
+            logger.info(f"Histórico de trends carregado: {len(self._stats)} trends")
+        except Exception as e:
+            logger.error(f"Erro ao carregar o histórico de trends ({self.path}): {e}")
+            self._stats = {}
+
+    def _save(self):
+        # Escrita atômica: um crash no meio não deixa o arquivo corrompido.
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'trends': self._stats}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Erro ao salvar o histórico de trends: {e}")
+
+    # --- Estatísticas ---
+    def _decay(self, entry, now):
+        return 0.5 ** (max(0.0, now - entry['updated_at']) / self.half_life_seconds)
+
+    def _decayed_locked(self, key, now):
+        """(sucessos, falhas) da trend trazidos para `now`."""
+        entry = self._stats.get(key)
+        if entry is None:
+            return 0.0, 0.0
+        factor = self._decay(entry, now)
+        return entry['successes'] * factor, entry['failures'] * factor
+
+    def _blocked_locked(self, key, now):
+        entry = self._stats.get(key)
+        return bool(entry and entry['streak'] >= self.block_failures
+                    and now - (entry.get('last_failure_at') or 0) < self.block_seconds)
+
+    def _record(self, trend, success, error=None):
+        now = time.time()
+        key = trend.casefold()
+        with self._lock:
+            successes, failures = self._decayed_locked(key, now)
+            entry = self._stats.get(key) or {'streak': 0, 'last_failure_at': None, 'last_error': None}
+            entry.update(name=trend, updated_at=now,
+                         successes=successes + (1 if success else 0), failures=failures + (0 if success else 1))
+            if success:
+                entry['streak'] = 0
+            else:
+                entry.update(streak=entry['streak'] + 1, last_failure_at=now, last_error=error)
+            self._stats[key] = entry
+            blocked = self._blocked_locked(key, now)
+            self._prune_locked(now)
+            self._version += 1
+            self._save()
+        if blocked and not success:
+            logger.warning(f"Trend '{trend}' bloqueada por {self.block_seconds / 3600:.0f}h após "
+                           f"{entry['streak']} falhas seguidas ({error})")
+
+    def record_success(self, trend):
+        if trend: self._record(trend, True)
+
+    def record_failure(self, trend, error=None):
+        """Registra uma falha atribuível à trend (ex.: prompt bloqueado, postagem recusada)."""
+        if trend: self._record(trend, False, error)
+
+    def _prune_locked(self, now):
+        for key in list(self._stats):
+            successes, failures = self._decayed_locked(key, now)
+            if successes + failures < _FORGET_BELOW and not self._blocked_locked(key, now):
+                del self._stats[key]
+        if len(self._stats) > TREND_STATS_MAX_ENTRIES:
+            oldest = sorted(self._stats, key=lambda k: self._stats[k]['updated_at'])
+            for key in oldest[:len(self._stats) - TREND_STATS_MAX_ENTRIES]:
+                del self._stats[key]
+
+    def weight(self, trend, now=None):
+        """
+        Chance estimada de sucesso (média da Beta(1+sucessos, 1+falhas)); 0.5 para trends sem histórico.
+        """
+        with self._lock:
+            successes, failures = self._decayed_locked(trend.casefold(), now or time.time())
+        return (successes + 1) / (successes + failures + 2)
+
+    def blocked_trends(self):
+        """Trends (em minúsculas) bloqueadas agora."""
+        now = time.time()
+        with self._lock:
+            return {key for key in self._stats if self._blocked_locked(key, now)}
+
+    # --- Escolha ---
+    def pick(self, trends, k=1, exclude=None):
+        """
+        Sorteia até `k` trends distintas, fora das bloqueadas e de `exclude` (em minúsculas), com peso
+        pela chance de sucesso. Se todas estiverem excluídas, sorteia entre todas as recebidas.
+        """
+        blocked = self.blocked_trends() | set(exclude or ())
+        candidates = [t for t in dict.fromkeys(trends) if t.casefold() not in blocked]
+        if not candidates:
+            if trends: logger.warning("Todas as trends estão bloqueadas ou em descanso; sorteando entre todas")
+            candidates = list(dict.fromkeys(trends))
+        if not candidates:
+            return []
+        key = (tuple(candidates), self._version)
+        if key != self._sampler_key:
+            now = time.time()
+            self._sampler = AliasSampler(candidates, [self.weight(t, now) for t in candidates], self.rng)
+            self._sampler_key = key
+        return self._sampler.sample_distinct(k)
+
+    def fallback_pool(self, seeds=(), limit=FALLBACK_POOL_SIZE):
+        """
+        Trends de reserva: as com mais sucessos recentes (não bloqueadas), completadas por `seeds`.
+        """
+        now = time.time()
+        with self._lock:
+            scored = []
+            for key, entry in self._stats.items():
+                successes, _ = self._decayed_locked(key, now)
+                if successes > 0 and not self._blocked_locked(key, now):
+                    scored.append((successes, entry['name']))
+            blocked = {key for key in self._stats if self._blocked_locked(key, now)}
+        pool = [name for _, name in sorted(scored, reverse=True)[:limit]]
+        known = {t.casefold() for t in pool} | blocked
+        pool.extend([t for t in seeds if t.casefold() not in known][:limit - len(pool)])
+        return pool
+
+    def summary(self, top=5):
+        now = time.time()
+        with self._lock:
+            weighted = []
+            for key, entry in self._stats.items():
+                successes, failures = self._decayed_locked(key, now)
+                weighted.append(((successes + 1) / (successes + failures + 2), entry['name']))
+            blocked = sorted(e['name'] for k, e in self._stats.items() if self._blocked_locked(k, now))
+        weighted.sort(reverse=True)
+        return {
+            'tracked': len(weighted),
+            'blocked': blocked,
+            'best': [{'trend': name, 'weight': round(w, 3)} for w, name in weighted[:top]],
+        }
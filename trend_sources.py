@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+Camada de fontes de trends.
+
+Cada fonte implementa `fetch()` e declara um custo relativo. O TrendMerger
+consulta as fontes mais baratas primeiro, em paralelo e com timeout por
+fonte, e só recorre às caras (como o scraping com o navegador) quando as
+baratas não trazem trends suficientes.
+"""
+
+import json
+import logging
+import os
+import time
+import unicodedata
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import requests
+
+from deadline import Deadline, bind_deadline, budget, current_deadline
+
+logger = logging.getLogger(__name__)
+
+# Fontes opcionais configuradas pelo .env
+TRENDS_HTTP_URL = os.getenv("TRENDS_HTTP_URL")  # Endpoint JSON com a lista de trends.
+TRENDS_HTTP_FIELD = os.getenv("TRENDS_HTTP_FIELD", "")  # Caminho até a lista, ex.: "data.trends".
+TRENDS_FILE = os.getenv("TRENDS_FILE")  # Arquivo local .txt, .json ou feed .xml/.rss.
+
+
+def normalize_trend(text):
+    """
+    Normaliza o texto da trend para exibição (Unicode NFC, sem espaços sobrando).
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def trend_key(text):
+    """
+    Chave de deduplicação: NFC + casefold, para que '#Copa' e '#COPA' sejam a mesma trend.
+    """
+    return normalize_trend(text).casefold()
+
+
+def extract_trend_names(items):
+    """
+    Converte uma lista de strings ou de objetos ({'name': ...}, {'trend': ...}) em nomes de trends.
+    """
+    names = []
+    for item in items or []:
+        if isinstance(item, str):
+            names.append(item)
+        elif isinstance(item, dict):
+            name = item.get('name') or item.get('trend') or item.get('title')
+            if isinstance(name, str):
+                names.append(name)
+    return names
+
+
+class TrendSource:
+    """
+    Interface de uma fonte de trends.
+
+    Attributes:
+        name (str): Nome usado nos logs.
+        cost (int): Custo relativo; fontes mais baratas são consultadas primeiro.
+        timeout (float): Tempo máximo em segundos que o merger espera por esta fonte.
+    """
+    name = "base"
+    cost = 0
+    timeout = 10
+
+    def is_available(self):
+        return True
+
+    def fetch(self):
+        raise NotImplementedError
+
+
+class SeleniumTrendSource(TrendSource):
+    """
+    Fonte baseada no navegador (scraping da página Explorar). É a mais cara.
+
+    Args:
+        driver_fn (callable): Retorna o WebDriver, inicializando-o sob demanda.
+        select_fn (callable): Função `select_fn(driver) -> list` que extrai as trends.
+        breaker (CircuitBreaker): Se informado, a fonte é pulada (sem abrir o navegador)
+                                  enquanto o circuito estiver aberto.
+    """
+    name = "selenium_dom"
+    cost = 100
+    timeout = 120
+
+    def __init__(self, driver_fn, select_fn, breaker=None):
+        self.driver_fn = driver_fn
+        self.select_fn = select_fn
+        self.breaker = breaker
+
+    def is_available(self):
+        return self.breaker is None or self.breaker.available()
+
+    def fetch(self):
+        # O timeout da fonte vira o prazo de tudo o que roda dentro dela (inclusive as novas tentativas da
+        # seleção): o navegador não continua em uso depois que o merger desistiu de esperar.
+        deadline = current_deadline()
+        seconds = min(self.timeout, deadline.remaining()) if deadline else self.timeout
+        with Deadline(seconds, cycle_id=deadline.cycle_id if deadline else None) as source_deadline:
+            source_deadline.check(deadline.stage if deadline else None)
+            if self.breaker is None:
+                return self.select_fn(self.driver_fn())
+            # O driver só é obtido depois que o breaker libera a chamada.
+            return self.breaker.call(lambda: self.select_fn(self.driver_fn()))
+
+
+class HttpJsonTrendSource(TrendSource):
+    """
+    Fonte HTTP leve que lê uma lista de trends de um endpoint JSON, sem navegador.
+
+    Args:
+        url (str): URL do endpoint.
+        field (str): Caminho separado por pontos até a lista dentro do JSON (vazio = raiz).
+        headers (dict): Cabeçalhos extras da requisição.
+    """
+    name = "http_json"
+    cost = 10
+    timeout = 10
+
+    def __init__(self, url, field="", headers=None):
+        self.url = url
+        self.field = field
+        self.headers = headers or {}
+        self.session = requests.Session()
+
+    def fetch(self):
+        response = self.session.get(self.url, headers=self.headers, timeout=budget(self.timeout))
+        response.raise_for_status()
+        data = response.json()
+        for part in [p for p in self.field.split(".") if p]:
+            data = data[int(part)] if isinstance(data, list) else data[part]
+        return extract_trend_names(data)
+
+
+class FileTrendSource(TrendSource):
+    """
+    Fonte local: arquivo texto (uma trend por linha), JSON (lista) ou feed RSS/Atom (títulos).
+    """
+    name = "file"
+    cost = 1
+    timeout = 5
+
+    def __init__(self, path):
+        self.path = path
+
+    def fetch(self):
+        if not os.path.exists(self.path):
+            return []
+        extension = os.path.splitext(self.path)[1].lower()
+        if extension == ".json":
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return extract_trend_names(json.load(f))
+        if extension in (".xml", ".rss", ".atom"):
+            root = ET.parse(self.path).getroot()
+            # Aceita RSS (<item><title>) e Atom (<entry><title>, com namespace).
+            titles = [el.text for el in root.iter() if el.tag.rsplit('}', 1)[-1] == 'title' and el.text]
+            # O primeiro título de um feed é o do próprio canal.
+            return titles[1:] if len(titles) > 1 else titles
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith('#!')]
+
+
+class TrendMerger:
+    """
+    Consulta as fontes por faixa de custo, em paralelo, e mescla os resultados.
+
+    Args:
+        sources (list): Fontes de trends.
+        min_trends (int): Quantidade que, se atingida, dispensa as fontes mais caras.
+        max_trends (int): Limite de trends retornadas.
+    """
+    def __init__(self, sources, min_trends=5, max_trends=20):
+        self.sources = [s for s in sources if s is not None]
+        self.min_trends = min_trends
+        self.max_trends = max_trends
+
+    def fetch(self):
+        merged, seen = [], set()
+        for cost in sorted({s.cost for s in self.sources}):
+            tier = [s for s in self.sources if s.cost == cost and s.is_available()]
+            if not tier:
+                continue
+            for source, trends in self._fetch_tier(tier):
+                added = 0
+                for trend in trends:
+                    if not isinstance(trend, str) or not trend.strip():
+                        continue
+                    key = trend_key(trend)
+                    if key not in seen:
+                        seen.add(key)
+                        merged.append(normalize_trend(trend))
+                        added += 1
+                logger.info(f"Fonte de trends '{source.name}': {len(trends)} trends ({added} novas)")
+            if len(merged) >= self.min_trends:
+                break
+        return merged[:self.max_trends]
+
+    def _fetch_tier(self, tier):
+        """
+        Executa as fontes de uma mesma faixa em paralelo, respeitando o timeout de cada uma.
+        """
+        executor = ThreadPoolExecutor(max_workers=len(tier), thread_name_prefix="trend-source")
+        started = time.monotonic()
+        # As fontes rodam em outras threads, mas herdam o prazo do ciclo.
+        futures = [(source, executor.submit(bind_deadline(source.fetch))) for source in tier]
+        deadline = current_deadline()
+        results = []
+        try:
+            for source, future in futures:
+                remaining = max(0.0, source.timeout - (time.monotonic() - started))
+                if deadline:
+                    remaining = min(remaining, deadline.remaining())
+                try:
+                    results.append((source, list(future.result(timeout=remaining) or [])))
+                except FutureTimeoutError:
+                    logger.warning(f"Fonte de trends '{source.name}' excedeu o timeout de {source.timeout}s")
+                except Exception as e:
+                    logger.warning(f"Fonte de trends '{source.name}' falhou: {e}")
+        finally:
+            # Não espera fontes que estouraram o timeout; elas terminam em segundo plano.
+            for _, future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+        return results
+
+
+def build_default_sources(driver_fn, select_fn, breaker=None):
+    """
+    Monta a lista de fontes a partir da configuração do .env; o navegador entra sempre como última opção.
+    """
+    sources = []
+    if TRENDS_FILE:
+        sources.append(FileTrendSource(TRENDS_FILE))
+    if TRENDS_HTTP_URL:
+        sources.append(HttpJsonTrendSource(TRENDS_HTTP_URL, TRENDS_HTTP_FIELD))
+    sources.append(SeleniumTrendSource(driver_fn, select_fn, breaker))
+    return sources
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Backlog persistente de tweets pré-gerados.
+
+Um produtor em segundo plano mantém, para cada trend, uma pequena fila de
+tweets prontos para postar, salva em disco. O ciclo de postagem apenas
+consome dessa fila; a chamada à IA Gemini sai do caminho crítico e uma
+indisponibilidade da API não custa mais o ciclo.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+BACKLOG_FILE = "tweet_backlog.json"
+BACKLOG_PER_TREND = 2             # Tweets prontos mantidos por trend.
+BACKLOG_MAX_TRENDS = 10           # Quantas trends o produtor tenta manter abastecidas.
+BACKLOG_MAX_AGE_SECONDS = 6 * 3600  # Textos mais velhos que isso ficam fora de contexto.
+BACKLOG_STALE_SECONDS = 3 * 3600    # Trend que não aparece há esse tempo é descartada.
+
+
+class TweetBacklog:
+    """
+    Fila de tweets por trend, persistida em JSON e segura entre threads.
+    """
+    def __init__(self, path=BACKLOG_FILE, per_trend=BACKLOG_PER_TREND,
+                 max_age_seconds=BACKLOG_MAX_AGE_SECONDS, stale_seconds=BACKLOG_STALE_SECONDS):
+        self.path = path
+        self.per_trend = per_trend
+        self.max_age_seconds = max_age_seconds
+        self.stale_seconds = stale_seconds
+        self._lock = threading.Lock()
+        self._queues = {}     # trend -> [{'text': ..., 'created_at': ...}, ...]
+        self._last_seen = {}  # trend -> timestamp da última vez que apareceu nas trends
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._queues = data.get('queues', {})
+            self._last_seen = data.get('last_seen', {})
+            logger.info(f"Backlog carregado: {self._count()} tweets prontos em {len(self._queues)} trends")
+        except Exception as e:
+            logger.error(f"Erro ao carregar backlog de tweets ({self.path}): {e}")
+            self._queues, self._last_seen = {}, {}
+
+    def _save(self):
+        # Escrita atômica: um crash no meio não deixa o arquivo corrompido.
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'queues': self._queues, 'last_seen': self._last_seen}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Erro ao salvar backlog de tweets: {e}")
+
+    def _count(self):
+        return sum(len(q) for q in self._queues.values())
+
+    def _evict_locked(self, now):
+        removed = 0
+        for trend in list(self._queues):
+            queue = self._queues[trend]
+            fresh = [entry for entry in queue if now - entry['created_at'] < self.max_age_seconds]
+            removed += len(queue) - len(fresh)
+            if now - self._last_seen.get(trend, 0) > self.stale_seconds:
+                removed += len(fresh)
+                fresh = []
+            if fresh:
+                self._queues[trend] = fresh
+            else:
+                del self._queues[trend]
+        for trend in list(self._last_seen):
+            if trend not in self._queues and now - self._last_seen[trend] > self.stale_seconds:
+                del self._last_seen[trend]
+        return removed
+
+    def mark_active(self, trends):
+        """
+        Registra as trends vistas agora e descarta entradas expiradas ou de trends que saíram de alta.
+        """
+        now = time.time()
+        with self._lock:
+            for trend in trends:
+                self._last_seen[trend] = now
+            removed = self._evict_locked(now)
+            self._save()
+        if removed:
+            logger.info(f"Backlog: {removed} tweets expirados/obsoletos descartados")
+
+    def push(self, trend, text):
+        now = time.time()
+        with self._lock:
+            self._queues.setdefault(trend, []).append({'text': text, 'created_at': now})
+            self._last_seen.setdefault(trend, now)
+            self._save()
+
+    def pop(self, preferred_trends=None, exclude=None):
+        """
+        Retira um tweet pronto, dando preferência às trends informadas (na ordem dada).
+
+        Args:
+            exclude (set): Trends (em minúsculas) que não devem ser usadas agora; seus tweets ficam no backlog.
+
+        Returns:
+            tuple or None: (trend, texto) ou None se o backlog estiver vazio.
+        """
+        exclude = exclude or set()
+        with self._lock:
+            self._evict_locked(time.time())
+            candidates = [t for t in (preferred_trends or []) if self._queues.get(t) and t.casefold() not in exclude]
+            if not candidates:
+                # Sem trend preferida disponível, usa o tweet mais antigo ainda válido.
+                candidates = sorted((t for t in self._queues if t.casefold() not in exclude),
+                                    key=lambda t: self._queues[t][0]['created_at'])
+            if not candidates:
+                return None
+            trend = candidates[0]
+            entry = self._queues[trend].pop(0)
+            if not self._queues[trend]:
+                del self._queues[trend]
+            self._save()
+            return trend, entry['text']
+
+    def missing_trends(self, trends):
+        """
+        Retorna as trends (na ordem dada) cuja fila está abaixo do alvo.
+        """
+        with self._lock:
+            return [t for t in trends if len(self._queues.get(t, [])) < self.per_trend]
+
+    def size(self):
+        with self._lock:
+            return self._count()
+
+    def clear(self):
+        """
+        Descarta todos os tweets prontos (ex.: o prompt mudou). Retorna quantos foram descartados.
+        """
+        with self._lock:
+            removed = self._count()
+            self._queues = {}
+            self._save()
+        return removed
+
+
+class BacklogProducer(threading.Thread):
+    """
+    Thread que abastece o backlog nos intervalos ociosos entre os ciclos agendados.
+
+    Args:
+        backlog (TweetBacklog): O backlog a ser abastecido.
+        generate_fn (callable): Recebe uma trend e retorna o texto gerado ou None.
+        trends_fn (callable): Retorna a lista atual de trends candidatas.
+        idle_event (threading.Event): Setado quando nenhum ciclo está em andamento.
+        poll_seconds (int): Intervalo entre verificações do backlog.
+        accept_fn (callable): Recebe (trend, texto) e retorna False para descartar o texto (ex.: duplicado).
+    """
+    def __init__(self, backlog, generate_fn, trends_fn, idle_event, poll_seconds=60, accept_fn=None):
+        super().__init__(daemon=True, name="BacklogProducer")
+        self.backlog = backlog
+        self.generate_fn = generate_fn
+        self.trends_fn = trends_fn
+        self.idle_event = idle_event
+        self.poll_seconds = poll_seconds
+        self.accept_fn = accept_fn
+        self._stop_event = threading.Event()
+        self._failures = 0
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        logger.info("Produtor do backlog de tweets iniciado.")
+        while not self._stop_event.is_set():
+            # Só gera quando não há ciclo rodando, para não competir com a postagem.
+            if self.idle_event.is_set():
+                self._top_up_once()
+            # Backoff exponencial simples quando a API Gemini está falhando.
+            delay = min(self.poll_seconds * (2 ** self._failures), 30 * 60)
+            self._stop_event.wait(timeout=delay)
+        logger.info("Produtor do backlog de tweets finalizado.")
+
+    def _top_up_once(self):
+        try:
+            trends = list(self.trends_fn() or [])[:BACKLOG_MAX_TRENDS]
+        except Exception as e:
+            logger.warning(f"Produtor do backlog: erro ao obter trends: {e}")
+            return
+        for trend in self.backlog.missing_trends(trends):
+            if self._stop_event.is_set() or not self.idle_event.is_set():
+                return
+            try:
+                text = self.generate_fn(trend)
+            except Exception as e:
+                logger.warning(f"Produtor do backlog: erro ao gerar tweet para '{trend}': {e}")
+                text = None
+            if not text:
+                self._failures = min(self._failures + 1, 5)
+                return
+            self._failures = 0
+            if self.accept_fn and not self.accept_fn(trend, text):
+                continue # A geração funcionou; só o texto foi recusado, sem backoff
+            self.backlog.push(trend, text)
+            logger.info(f"Backlog: tweet pré-gerado para '{trend}' (total: {self.backlog.size()})")